@@ -0,0 +1,79 @@
+"""
+Measure the memory used by a large synthetic trace of ITF nodes.
+
+Builds the same trace twice: with the ITF node classes, which have
+`__slots__`, and with subclasses that have an instance `__dict__`, like the
+node classes had before. Reports the memory allocated for each, measured
+with `tracemalloc`.
+
+    python -m benchmarks.itf_memory [--states 1000] [--entries 200]
+"""
+import argparse
+import gc
+import tracemalloc
+
+from modelator_py.util import informal_trace_format as itf
+
+
+class _DictNodes:
+    """ITF node classes with an instance `__dict__`."""
+
+    class ITFList(itf.ITFList):
+        pass
+
+    class ITFSet(itf.ITFSet):
+        pass
+
+    class ITFMap(itf.ITFMap):
+        pass
+
+    class ITFState(itf.ITFState):
+        pass
+
+    class ITFTrace(itf.ITFTrace):
+        pass
+
+
+def make_trace(nodes, n_states, n_entries):
+    """Return a trace of `n_states` states, each with maps of `n_entries`."""
+    states = []
+    for i in range(n_states):
+        balances = nodes.ITFMap(
+            [
+                [f"v{j}", nodes.ITFList([i, j, nodes.ITFSet([])])]
+                for j in range(n_entries)
+            ]
+        )
+        queue = nodes.ITFList(
+            [nodes.ITFMap([[1, j], [2, "d0"]]) for j in range(n_entries)]
+        )
+        states.append(nodes.ITFState({"step": i, "balances": balances, "queue": queue}))
+    return nodes.ITFTrace(["step", "balances", "queue"], states)
+
+
+def measure(nodes, n_states, n_entries):
+    """Return (bytes, number of nodes) of a trace made of `nodes`."""
+    gc.collect()
+    tracemalloc.start()
+    trace = make_trace(nodes, n_states, n_entries)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    n_nodes = 1 + n_states * (3 + 3 * n_entries)
+    del trace
+    return size, n_nodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--states", type=int, default=1000)
+    parser.add_argument("--entries", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'nodes':>10} {'classes':>10} {'MB':>8} {'B/node':>8}")
+    for name, nodes in [("__dict__", _DictNodes), ("__slots__", itf)]:
+        size, n_nodes = measure(nodes, args.states, args.entries)
+        print(f"{n_nodes:>10} {name:>10} {size / 2**20:>8.1f} {size / n_nodes:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Measure the time of TLC runs on a small model, with and without a JVM class data
+sharing archive (the `jvm_cache` field of the raw and pure json inputs).
+
+Checks `samples/Hello.tla` with `tlc_raw`, first starting the JVM cold, then with
+a `jvm_cache` directory: the first run with the directory writes the archive and
+is reported separately, the later runs map it. Requires `java` (13 or later) on
+the PATH and a TLC jar.
+
+    python -m benchmarks.jvm_startup --jar <tla2tools.jar> [--repeat 5]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from modelator_py.tlc.args import TlcArgs
+from modelator_py.tlc.raw import RawCmd, tlc_raw
+
+
+def time_run(cmd):
+    """Return seconds to run `cmd`."""
+    start = time.perf_counter()
+    result = tlc_raw(cmd=cmd)
+    elapsed = time.perf_counter() - start
+    if not 0 <= result.returncode < 126:
+        raise Exception(f"TLC failed: {result.args}\n{result.stdout.decode()}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jar", required=True)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    jar = os.path.abspath(args.jar)
+    with tempfile.TemporaryDirectory(prefix="modelator-py-jvm-startup-") as tmp:
+        model_dir = os.path.join(tmp, "model")
+        jvm_cache = os.path.join(tmp, "jvm")
+        os.mkdir(model_dir)
+        for name in ("Hello.tla", "Hello.cfg"):
+            shutil.copy(os.path.join("samples", name), model_dir)
+        tlc_args = TlcArgs(file="Hello.tla", config="Hello.cfg", cleanup=True)
+
+        def cmd(jvm_cache=None):
+            return RawCmd(cwd=model_dir, jar=jar, args=tlc_args, jvm_cache=jvm_cache)
+
+        cold = [time_run(cmd()) for _ in range(args.repeat)]
+        dump = time_run(cmd(jvm_cache))
+        archived = [time_run(cmd(jvm_cache)) for _ in range(args.repeat)]
+        archives = [name for name in os.listdir(jvm_cache) if name.endswith(".jsa")]
+        size = sum(os.path.getsize(os.path.join(jvm_cache, name)) for name in archives)
+
+    print(f"{args.repeat} runs of samples/Hello.tla with {jar}")
+    print(f"archive: {len(archives)} file(s), {size / 2 ** 20:.1f}MB")
+    print(f"{'start':>14} {'mean s':>8} {'min s':>8} {'speedup':>8}")
+    baseline = sum(cold) / len(cold)
+    for name, times in [
+        ("cold", cold),
+        ("writing", [dump]),
+        ("with archive", archived),
+    ]:
+        mean = sum(times) / len(times)
+        row = f"{name:>14} {mean:>8.3f} {min(times):>8.3f} {baseline / mean:>8.2f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
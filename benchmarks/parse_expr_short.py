@@ -0,0 +1,99 @@
+"""
+Measure the time of `parser.parse_expr` on a short expression.
+
+For short expressions, the time to parse is dominated by setting up the parser,
+so this compares:
+
+- `before`: generating the operator table and fixities, and building the
+  parsers of the grammar rules for each call, which is what `parse_expr` did
+  before the tables and parsers were memoized
+- `rules`: building the parsers of the grammar rules for each call, with
+  memoized tables
+- `parse_expr`: calling `parser.parse_expr` with the same syntax tree classes
+- `alternating`: calling `parser.parse_expr` with two families of syntax tree
+  classes in turn
+- `context`: reusing a `parser.ParserContext`
+
+    python -m benchmarks.parse_expr_short [--expr "x = 1"] [--repeat 2000]
+"""
+
+import argparse
+import gc
+import time
+
+from modelator_py.util.tla import _expr_parser, _optable, ast, parser, to_str
+
+
+class _RegeneratingContext(parser.ParserContext):
+    """Context that generates its tables, as before they were memoized."""
+
+    def __init__(self, nodes=None):
+        if nodes is None:
+            nodes = ast.Nodes
+        self.nodes = nodes
+        self.optable = _optable._generate_optable(nodes)
+        self.fixities = _expr_parser._generate_fixities(self.optable, nodes)
+        self.rules = None
+
+
+class _RebuildingContext(parser.ParserContext):
+    """Context that builds the parsers of the grammar rules at each use."""
+
+    def __init__(self, nodes=None):
+        super().__init__(nodes)
+        self.rules = None
+
+
+def time_calls(parse, expr, repeat, alternate=False):
+    """Return mean seconds per call of `parse(expr, nodes)`.
+
+    If `alternate`, then `nodes` alternates between two families.
+    """
+    families = [to_str.Nodes, ast.Nodes] if alternate else [to_str.Nodes]
+    for nodes in families:
+        parse(expr, nodes)
+    gc.collect()
+    gc.disable()
+    start = time.perf_counter()
+    for i in range(repeat):
+        parse(expr, families[i % len(families)])
+    elapsed = time.perf_counter() - start
+    gc.enable()
+    return elapsed / repeat
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--expr", default="x = 1")
+    arg_parser.add_argument("--repeat", type=int, default=2000)
+    args = arg_parser.parse_args()
+
+    context = parser.ParserContext(to_str.Nodes)
+
+    def before(expr, nodes):
+        return _RegeneratingContext(nodes).parse_expr(expr)
+
+    def rules(expr, nodes):
+        return _RebuildingContext(nodes).parse_expr(expr)
+
+    def parse_expr(expr, nodes):
+        return parser.parse_expr(expr, nodes=nodes)
+
+    def reused_context(expr, nodes):
+        return context.parse_expr(expr)
+
+    print(f"parse_expr({args.expr!r}), {args.repeat} calls")
+    print(f"{'mode':>14} {'us/call':>10}")
+    for name, parse, alternate in [
+        ("before", before, False),
+        ("rules", rules, False),
+        ("parse_expr", parse_expr, False),
+        ("alternating", parse_expr, True),
+        ("context", reused_context, False),
+    ]:
+        seconds = time_calls(parse, args.expr, args.repeat, alternate)
+        print(f"{name:>14} {seconds * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Measure the time to convert the states of TLC traces to the Informal Trace Format.
+
+Extracts the states from a file with the stdout of TLC (by default
+`samples/TlcTraces.out`), and compares the time of `state_parser.parse_state`
+with the time of parsing the states with the TLA+ parser.
+
+    python -m benchmarks.tlc_state_parser [--stdout samples/TlcTraces.out]
+"""
+import argparse
+import gc
+import time
+
+from modelator_py.util.tlc.state_parser import parse_state
+from modelator_py.util.tlc.state_to_informal_trace_format import (
+    state_to_informal_trace_format_state,
+    tla_state_to_informal_trace_format_state,
+)
+from modelator_py.util.tlc.stdout_to_informal_trace_format import extract_traces
+
+
+def time_states(convert, states):
+    """Return seconds to `convert` all `states`."""
+    gc.collect()
+    gc.disable()
+    start = time.perf_counter()
+    for state in states:
+        convert(state)
+    elapsed = time.perf_counter() - start
+    gc.enable()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stdout", default="samples/TlcTraces.out")
+    args = parser.parse_args()
+
+    with open(args.stdout) as fd:
+        stdout = fd.read()
+    states = [state for trace in extract_traces(stdout) for state in trace]
+    size = sum(len(state) for state in states)
+    print(f"{len(states)} states, {size} characters, from {args.stdout}")
+
+    results = [
+        ("tla parser", time_states(tla_state_to_informal_trace_format_state, states)),
+        ("parse_state", time_states(parse_state, states)),
+        ("with fallback", time_states(state_to_informal_trace_format_state, states)),
+    ]
+    slowest = results[0][1]
+    print(f"{'parser':>14} {'total ms':>10} {'us/state':>10} {'speedup':>8}")
+    for name, elapsed in results:
+        row = f"{name:>14} {elapsed * 1e3:>10.2f}"
+        row += f" {elapsed * 1e6 / len(states):>10.1f} {slowest / elapsed:>8.1f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Measure how `lex.tokenize` scales with the size of the input.
+
+Generates TLA+ modules of increasing size (up to 10MB) and reports the time to
+tokenize them. Two shapes of input are used: a module with short lines, and a
+module where each definition is on one long line, like the states that TLC
+prints for large values.
+
+For comparison, the location of each token is also computed by searching the
+input backwards for the beginning of its line (`lex.find_beginning_of_line`),
+which was the approach before `tokenize` used a line offset index.
+
+    python -m benchmarks.tokenize_scaling [--sizes 1,2,5,10] [--no-baseline]
+"""
+import argparse
+import gc
+import time
+
+from modelator_py.util.tla import lex
+
+MB = 1024 * 1024
+
+SHORT_LINES = """Op{i}(x) ==
+    /\\ x \\in {{1, 2, 3}}
+    /\\ y' = [y EXCEPT ![x] = "s{i}"]
+"""
+
+LONG_LINE = (
+    'Op{i} == [a |-> {{1, 2, 3}}, b |-> <<"s{i}", TRUE, FALSE>>, '
+    + ", ".join(f"f{j} |-> (1 :> {j} @@ 2 :> {j})" for j in range(30000))
+    + "]\n"
+)
+
+
+def make_module(size, template):
+    """Return a TLA+ module of about `size` characters."""
+    lines = ["---- MODULE Bench ----\n"]
+    n = len(lines[0])
+    i = 0
+    while n < size:
+        line = template.format(i=i)
+        lines.append(line)
+        n += len(line)
+        i += 1
+    lines.append("====\n")
+    return "".join(lines)
+
+
+def time_tokenize(data):
+    gc.collect()
+    start = time.perf_counter()
+    tokens = lex.tokenize(data, omit_preamble=True)
+    return time.perf_counter() - start, len(tokens)
+
+
+def time_baseline_locations(data):
+    """Time to compute token locations by searching for the beginning of line."""
+    lextokens = lex._lex(data)
+    gc.collect()
+    gc.disable()
+    start = time.perf_counter()
+    for token in lextokens:
+        lex._map_to_token(data, token, module_name="Bench")
+    elapsed = time.perf_counter() - start
+    gc.enable()
+    return elapsed
+
+
+def time_indexed_locations(data):
+    """Time to compute token locations with the line offset index."""
+    lextokens = lex._lex(data)
+    gc.collect()
+    gc.disable()
+    start = time.perf_counter()
+    line_starts = lex._line_starts(data)
+    for token in lextokens:
+        lex._map_to_token(data, token, module_name="Bench", line_starts=line_starts)
+    elapsed = time.perf_counter() - start
+    gc.enable()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1,2,5,10", help="input sizes in MB")
+    parser.add_argument(
+        "--no-baseline",
+        action="store_true",
+        help="skip timing the location computation without the index",
+    )
+    args = parser.parse_args()
+    sizes = [float(s) for s in args.sizes.split(",")]
+
+    for name, template in [("short lines", SHORT_LINES), ("long lines", LONG_LINE)]:
+        print(f"# {name}")
+        header = f"{'size MB':>8} {'tokens':>10} {'tokenize s':>11} {'us/KB':>8}"
+        header += f" {'loc index s':>12}"
+        if not args.no_baseline:
+            header += f" {'loc rfind s':>12}"
+        print(header)
+        for size in sizes:
+            data = make_module(int(size * MB), template)
+            elapsed, n_tokens = time_tokenize(data)
+            row = f"{size:>8} {n_tokens:>10} {elapsed:>11.2f}"
+            row += f" {elapsed * 1e6 / (len(data) / 1024):>8.1f}"
+            row += f" {time_indexed_locations(data):>12.2f}"
+            if not args.no_baseline:
+                row += f" {time_baseline_locations(data):>12.2f}"
+            print(row)
+
+
+if __name__ == "__main__":
+    main()
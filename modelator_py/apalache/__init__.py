@@ -2,7 +2,7 @@ from .args import ApalacheArgs
 from .pure import PureCmd as ApalachePureCmd
 from .pure import apalache_pure
 from .raw import RawCmd as ApalacheRawCmd
-from .raw import apalache_raw
+from .raw import apalache_raw, apalache_raw_async
 
 __all__ = [
     "ApalacheArgs",
@@ -10,4 +10,5 @@ __all__ = [
     "ApalacheRawCmd",
     "apalache_pure",
     "apalache_raw",
+    "apalache_raw_async",
 ]
@@ -1,5 +1,6 @@
 import json as stdjson
 
+from ..cache import ResultCache
 from .pure import apalache_pure
 from .raw import ApalacheArgs, RawCmd, apalache_raw
 
@@ -8,7 +9,7 @@ class Apalache:
     def __init__(self, stdin):
         self._stdin = stdin
 
-    def pure(self):
+    def pure(self, *, cache=None):
         """
         Run Apalache without side effects using json input data.
 
@@ -19,13 +20,18 @@ class Apalache:
         Writes the result to stdout in json.
 
         Requires json input data on stdin (`<command> < data.json`).
+
+        Arguments:
+            cache : Directory of a result cache, to reuse the result of a previous run with the same jar, args and files.
         """
         assert (
             self._stdin is not None
         ), "The pure interface requires json input in stdin"
         json_dict = stdjson.loads(self._stdin.read())
 
-        result = apalache_pure(json=json_dict)
+        if cache is not None:
+            cache = ResultCache(cache)
+        result = apalache_pure(json=json_dict, cache=cache)
         to_print = stdjson.dumps(result, indent=4, sort_keys=True)
         print(to_print)
 
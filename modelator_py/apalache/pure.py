@@ -6,7 +6,7 @@ from typing import Optional
 
 from ..helper import get_dirnames_in_dir, read_entire_dir_contents
 from .args import ApalacheArgs
-from .raw import RawCmd, apalache_raw
+from .raw import RawCmd, apalache_raw, raw_cmd_argv
 
 LOG = logging.getLogger(__name__)
 
@@ -20,6 +20,9 @@ class PureCmd:
     ] = None  # Location of Apalache jar (full path with suffix like apalache.jar)
     args: Optional[ApalacheArgs] = None  # Apalache args
     files: Optional[str] = None  # Current working directory for child shell process
+    jvm_cache: Optional[
+        str
+    ] = None  # Directory of JVM class data archives (see jvm.ClassDataArchive)
 
 
 # Used to overwrite Apalache's "--out-dir" flag
@@ -32,6 +35,7 @@ def json_to_cmd(json) -> PureCmd:
             "files": None,
             "jar": None,
             "args": None,
+            "jvm_cache": None,
         },
         **json,
     }
@@ -39,6 +43,7 @@ def json_to_cmd(json) -> PureCmd:
     cmd.jar = json["jar"]
     cmd.args = ApalacheArgs(**json["args"])
     cmd.files = json["files"]
+    cmd.jvm_cache = json["jvm_cache"]
     return cmd
 
 
@@ -97,7 +102,15 @@ def read_apalache_output_into_memory(full_dirname):
     return all_files
 
 
-def apalache_pure(*, cmd: PureCmd = None, json=None):  # type: ignore
+def is_deterministic(args: ApalacheArgs) -> bool:
+    """
+    Does Apalache give the same output for the same `args` and files? The
+    `simulate` command checks random runs.
+    """
+    return args.cmd != "simulate"
+
+
+def apalache_pure(*, cmd: PureCmd = None, json=None, cache=None):  # type: ignore
     """
     Run a Apalache command using either a PureCmd object, or build the PureCmd from json.
 
@@ -105,6 +118,10 @@ def apalache_pure(*, cmd: PureCmd = None, json=None):  # type: ignore
 
     Returns an ExecutionResult with .process and .files properties. Contains the
     subprocess result, and the list of filesystem files (and contents).
+
+    If `cache` (a `cache.ResultCache`) is given, returns the cached result of
+    a command with the same jar, args and files, if any, without running Apalache.
+    Runs whose output is random are not cached (see `is_deterministic`).
     """
 
     assert not (cmd is not None and json is not None)
@@ -115,6 +132,7 @@ def apalache_pure(*, cmd: PureCmd = None, json=None):  # type: ignore
     raw_cmd = RawCmd()
     raw_cmd.args = cmd.args
     raw_cmd.jar = cmd.jar
+    raw_cmd.jvm_cache = cmd.jvm_cache
 
     if raw_cmd.args.out_dir is not None:
         raise Exception(
@@ -123,6 +141,13 @@ this flag. Do not include a value for this flag."
         )
     raw_cmd.args.out_dir = "out"
 
+    key = None
+    if cache is not None and is_deterministic(raw_cmd.args):
+        key = cache.key("apalache", cmd.jar, raw_cmd_argv(raw_cmd), cmd.files)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
     ret = {}
 
     result = None
@@ -156,4 +181,7 @@ this flag. Do not include a value for this flag."
     ret["stdout"] = stdout_pretty
     ret["stderr"] = stderr_pretty
 
+    if key is not None:
+        cache.put(key, ret)
+
     return ret
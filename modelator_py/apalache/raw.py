@@ -1,9 +1,10 @@
 import os
-import subprocess
 import tempfile
-from dataclasses import asdict, dataclass
-from typing import Optional
+from dataclasses import dataclass
+from typing import List, Optional
 
+from ..helper import run_argv, run_argv_async
+from ..jvm import ClassDataArchive
 from .args import ApalacheArgs
 
 # mypy: ignore-errors
@@ -11,72 +12,111 @@ from .args import ApalacheArgs
 
 @dataclass
 class RawCmd:
-    cwd: Optional[str] = None  # Current working directory for child shell process
+    cwd: Optional[str] = None  # Current working directory for child process
     jar: Optional[
         str
     ] = None  # Location of Apalache jar (full path with suffix like apalache.jar)
     args: Optional[ApalacheArgs] = None  # Apalache args
-
-
-def stringify_raw_cmd(cmd: RawCmd, java_temp_dir: str = None):
-
-    jar = cmd.jar
+    jvm_cache: Optional[
+        str
+    ] = None  # Directory of JVM class data archives (see jvm.ClassDataArchive)
+
+
+# Options of Apalache itself, passed before the command
+_GLOBAL_OPTIONS = (
+    "config_file",
+    "debug",
+    "out_dir",
+    "profiling",
+    "run_dir",
+    "smtprof",
+    "write_intermediate",
+)
+
+# Options of the command, in the order in which they are passed
+_COMMAND_OPTIONS = (
+    "algo",
+    "cinit",
+    "config",
+    "discard_disabled",
+    "init",
+    "inv",
+    "length",
+    "max_error",
+    "max_run",
+    "no_deadlock",
+    "output_traces",
+    "nworkers",
+    "smt_encoding",
+    "tuning",
+    "tuning_options",
+    "view",
+    "enable_stats",
+    "before",
+    "action",
+    "assertion",
+    "next",
+    "infer_poly",
+    "output",
+    "features",
+)
+
+# Fields which are also passed as positional arguments after the file
+_POSITIONAL = ("before", "action", "assertion")
+
+
+def raw_cmd_argv(
+    cmd: RawCmd, java_temp_dir: str = None, java_options: List[str] = ()
+) -> List[str]:
+    """
+    Returns the arguments of the command which runs Apalache, to be executed
+    without a shell.
+    """
     args = cmd.args
 
-    if java_temp_dir is None:
-        tmpdir_setup = ""
-    else:
-        tmpdir_setup = " -Djava.io.tmpdir={}".format(java_temp_dir)
-
     def stringify(value):
         # Apalache will not accept capitalized bools
         if isinstance(value, bool):
             return str(value).lower()
-        return value
-
-    args = ApalacheArgs(**{k: stringify(v) for k, v in asdict(args).items()})
-
-    cmd_str = f"""java{tmpdir_setup}\
- -jar "{jar}"\
-{f" --config-file={args.config_file}" if args.config_file is not None else ""}\
-{f" --debug={args.debug}" if args.debug is not None else ""}\
-{f" --out-dir={args.out_dir}" if args.out_dir is not None else ""}\
-{f" --profiling={args.profiling}" if args.profiling is not None else ""}\
-{f" --run-dir={args.run_dir}" if args.run_dir is not None else ""}\
-{f" --smtprof={args.smtprof}" if args.smtprof is not None else ""}\
-{f" --write-intermediate={args.write_intermediate}" if args.write_intermediate is not None else ""}\
- {args.cmd}\
-{f" --algo={args.algo}" if args.algo is not None else ""}\
-{f" --cinit={args.cinit}" if args.cinit is not None else ""}\
-{f" --config={args.config}" if args.config is not None else ""}\
-{f" --discard-disabled={args.discard_disabled}" if args.discard_disabled is not None else ""}\
-{f" --init={args.init}" if args.init is not None else ""}\
-{f" --inv={args.inv}" if args.inv is not None else ""}\
-{f" --length={args.length}" if args.length is not None else ""}\
-{f" --max-error={args.max_error}" if args.max_error is not None else ""}\
-{f" --max-run={args.max_run}" if args.max_run is not None else ""}\
-{f" --no-deadlock={args.no_deadlock}" if args.no_deadlock is not None else ""}\
-{f" --output-traces={args.output_traces}" if args.output_traces is not None else ""}\
-{f" --nworkers={args.nworkers}" if args.nworkers is not None else ""}\
-{f" --smt-encoding={args.smt_encoding}" if args.smt_encoding is not None else ""}\
-{f" --tuning={args.tuning}" if args.tuning is not None else ""}\
-{f" --tuning-options={args.tuning_options}" if args.tuning_options is not None else ""}\
-{f" --view={args.view}" if args.view is not None else ""}\
-{f" --enable-stats={args.enable_stats}" if args.enable_stats is not None else ""}\
-{f" --before={args.before}" if args.before is not None else ""}\
-{f" --action={args.action}" if args.action is not None else ""}\
-{f" --assertion={args.assertion}" if args.assertion is not None else ""}\
-{f" --next={args.next}" if args.next is not None else ""}\
-{f" --infer-poly={args.infer_poly}" if args.infer_poly is not None else ""}\
-{f" --output={args.output}" if args.output is not None else ""}\
-{f" --features={args.features}" if args.features is not None else ""}\
-{f" {args.file}" if args.file is not None else ""}\
-{f" {args.before}" if args.before is not None else ""}\
-{f" {args.action}" if args.action is not None else ""}\
-{f" {args.assertion}" if args.assertion is not None else ""}\
-"""
-
-    return cmd_str
+        return str(value)
+
+    def options(names):
+        for name in names:
+            value = getattr(args, name)
+            if value is not None:
+                flag = name.replace("_", "-")
+                yield f"--{flag}={stringify(value)}"
+
+    argv = ["java"]
+    if java_temp_dir is not None:
+        argv.append(f"-Djava.io.tmpdir={java_temp_dir}")
+    argv.extend(java_options)
+    argv.extend(["-jar", cmd.jar])
+
+    argv.extend(options(_GLOBAL_OPTIONS))
+    if args.cmd is not None:
+        argv.append(args.cmd)
+    argv.extend(options(_COMMAND_OPTIONS))
+
+    for name in ("file",) + _POSITIONAL:
+        value = getattr(args, name)
+        if value is not None:
+            argv.append(stringify(value))
+    return argv
+
+
+def stringify_raw_cmd(
+    cmd: RawCmd, java_temp_dir: str = None, java_options: List[str] = ()
+) -> str:
+    """
+    Returns a string which can be passed to a shell to run Apalache, in which
+    the jar is quoted, and the other arguments are not.
+    """
+    return _cmd_str(cmd, raw_cmd_argv(cmd, java_temp_dir, java_options))
+
+
+def _cmd_str(cmd, argv):
+    return " ".join(f'"{arg}"' if arg == cmd.jar else arg for arg in argv)
 
 
 def json_to_cmd(json) -> RawCmd:
@@ -85,12 +125,14 @@ def json_to_cmd(json) -> RawCmd:
             "cwd": None,
             "jar": None,
             "args": None,
+            "jvm_cache": None,
         },
         **json,
     }
     cmd = RawCmd()
     cmd.cwd = json["cwd"]
     cmd.jar = json["jar"]
+    cmd.jvm_cache = json["jvm_cache"]
     cmd.args = ApalacheArgs(**json["args"])
     return cmd
 
@@ -103,6 +145,77 @@ def apalache_raw(*, cmd: RawCmd = None, json=None):
 
     Returns a subprocess call result object.
     """
+    cmd = _checked_cmd(cmd, json)
+
+    with tempfile.TemporaryDirectory(
+        prefix="modelator-py-apalache-java-temp-dir-"
+    ) as java_temp:
+        archive = ClassDataArchive.of(cmd.jar, cmd.jvm_cache)
+        if archive is not None:
+            argv = raw_cmd_argv(
+                cmd, java_temp_dir=java_temp, java_options=archive.options()
+            )
+            try:
+                result = run_argv(argv, cwd=cmd.cwd, cmd_str=_cmd_str(cmd, argv))
+            except BaseException:
+                archive.discard()
+                raise
+            if archive.finish(result):
+                return result
+
+        argv = raw_cmd_argv(cmd, java_temp_dir=java_temp)
+        return run_argv(argv, cwd=cmd.cwd, cmd_str=_cmd_str(cmd, argv))
+
+
+async def apalache_raw_async(
+    *, cmd: RawCmd = None, json=None, timeout=None, on_stdout=None
+):
+    """
+    Run an Apalache command like `apalache_raw`, in an asyncio subprocess, so that
+    many commands can run concurrently from one event loop.
+
+    `on_stdout` is called with each line of the stdout of Apalache (bytes) as soon
+    as it is printed. Apalache is killed if it runs longer than `timeout` seconds,
+    raising `subprocess.TimeoutExpired`, or if the awaiting task is cancelled.
+
+    Returns a subprocess call result object.
+    """
+    cmd = _checked_cmd(cmd, json)
+
+    with tempfile.TemporaryDirectory(
+        prefix="modelator-py-apalache-java-temp-dir-"
+    ) as java_temp:
+        archive = ClassDataArchive.of(cmd.jar, cmd.jvm_cache)
+        if archive is not None:
+            argv = raw_cmd_argv(
+                cmd, java_temp_dir=java_temp, java_options=archive.options()
+            )
+            try:
+                result = await run_argv_async(
+                    argv,
+                    cwd=cmd.cwd,
+                    timeout=timeout,
+                    on_stdout=on_stdout,
+                    cmd_str=_cmd_str(cmd, argv),
+                )
+            except BaseException:
+                # timed out or cancelled
+                archive.discard()
+                raise
+            if archive.finish(result):
+                return result
+
+        argv = raw_cmd_argv(cmd, java_temp_dir=java_temp)
+        return await run_argv_async(
+            argv,
+            cwd=cmd.cwd,
+            timeout=timeout,
+            on_stdout=on_stdout,
+            cmd_str=_cmd_str(cmd, argv),
+        )
+
+
+def _checked_cmd(cmd, json):
     assert cmd is not None or json is not None
     assert not (cmd is not None and json is not None)
 
@@ -121,11 +234,4 @@ def apalache_raw(*, cmd: RawCmd = None, json=None):
             raise Exception("Apalache jar path must be absolute (after expanding user)")
     if cmd.jar is None:
         raise Exception("Apalache jar path must be absolute (after expanding user)")
-
-    with tempfile.TemporaryDirectory(
-        prefix="modelator-py-apalache-java-temp-dir-"
-    ) as java_temp:
-        cmd_str = stringify_raw_cmd(cmd, java_temp_dir=java_temp)
-
-        # Semantics a bit complex here - see https://stackoverflow.com/a/15109975/8346628
-        return subprocess.run(cmd_str, shell=True, capture_output=True, cwd=cmd.cwd)
+    return cmd
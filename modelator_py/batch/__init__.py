@@ -0,0 +1,3 @@
+from .run import job_cost, run_batch
+
+__all__ = ["job_cost", "run_batch"]
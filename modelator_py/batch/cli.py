@@ -0,0 +1,34 @@
+import json as stdjson
+import sys
+
+from ..cache import ResultCache
+from .run import run_batch
+
+
+class Batch:
+    def __init__(self, stdin):
+        self._stdin = stdin
+
+    def run(self, *, budget=None, cache=None):
+        """
+        Run a list of TLC and Apalache pure jobs, with a global cpu budget.
+
+        Requires a json list of jobs on stdin (`<command> < jobs.json`). Each
+        job is the json input of `tlc pure` or `apalache pure`, with a "tool"
+        field, "tlc" or "apalache", and an optional "id" field.
+
+        Writes a line of json with the result of each job as soon as it
+        finishes, in order of completion.
+
+        Arguments:
+            budget : Number of cpus used by the running jobs, where TLC -workers and Apalache --nworkers count against the budget (default: number of cpus).
+            cache : Directory of a result cache, to reuse the results of previous runs of the same jobs.
+        """
+        assert self._stdin is not None, "The batch interface requires json on stdin"
+        jobs = stdjson.loads(self._stdin.read())
+
+        if cache is not None:
+            cache = ResultCache(cache)
+        for result in run_batch(jobs, budget=budget, cache=cache):
+            sys.stdout.write(stdjson.dumps(result, sort_keys=True) + "\n")
+            sys.stdout.flush()
@@ -0,0 +1,107 @@
+import concurrent.futures
+import os
+import typing
+
+from ..apalache.pure import apalache_pure
+from ..tlc.pure import tlc_pure
+
+# mypy: ignore-errors
+
+# The pure function of each value of the "tool" field of a job.
+RUNNERS = {
+    "tlc": tlc_pure,
+    "apalache": apalache_pure,
+}
+
+
+def job_cost(job: typing.Dict, budget: int) -> int:
+    """
+    Return the number of cpus used by `job`: the TLC `workers` or Apalache
+    `nworkers` argument, 1 if not given, and `budget` for TLC `-workers auto`.
+    The cost is at most `budget`, so that every job can run.
+    """
+    args = job.get("args") or {}
+    workers = args.get("workers" if job.get("tool") == "tlc" else "nworkers")
+    if workers is None:
+        cost = 1
+    elif workers == "auto":
+        cost = budget
+    else:
+        cost = int(workers)
+    return min(max(cost, 1), budget)
+
+
+def run_batch(
+    jobs: typing.List[typing.Dict],
+    *,
+    budget: typing.Optional[int] = None,
+    cache=None,
+) -> typing.Iterator[typing.Dict]:
+    """
+    Run the `jobs` and yield their results as each job finishes, in order of
+    completion.
+
+    Each job is the json of a `tlc_pure` or `apalache_pure` PureCmd with a
+    `"tool"` field, `"tlc"` or `"apalache"`, and an optional `"id"` field.
+    Jobs start in order, as long as the sum of the `job_cost` of the running
+    jobs is at most `budget` cpus (default: the number of cpus).
+
+    Results are looked up in and added to `cache` (a `cache.ResultCache`), if
+    given.
+
+    Yields `{"index": <index of the job>, "id": <id of the job>, "result":
+    <result of the pure function>}`, or `"error": <message>` instead of
+    `"result"` if the job raised an exception or is invalid, e.g. has an
+    unknown tool. Such jobs do not stop the other jobs.
+    """
+    if budget is None:
+        budget = os.cpu_count() or 1
+    if budget < 1:
+        raise Exception(f"budget should be at least 1 cpu, got {budget=}")
+    costs = []
+    errors = []
+    for job in jobs:
+        try:
+            if job.get("tool") not in RUNNERS:
+                raise Exception(
+                    f"job tool should be one of {list(RUNNERS)}, got {job=}"
+                )
+            costs.append(job_cost(job, budget))
+            errors.append(None)
+        except Exception as e:
+            costs.append(0)
+            errors.append(_error(e))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=budget) as executor:
+        running = dict()
+        used = 0
+        started = 0
+        while started < len(jobs) or running:
+            while started < len(jobs) and used + costs[started] <= budget:
+                i = started
+                started += 1
+                job = jobs[i]
+                if errors[i] is not None:
+                    yield {"index": i, "id": job.get("id"), "error": errors[i]}
+                    continue
+                future = executor.submit(RUNNERS[job["tool"]], json=job, cache=cache)
+                running[future] = i
+                used += costs[i]
+            if not running:
+                continue
+            done, _ = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                i = running.pop(future)
+                used -= costs[i]
+                ret = {"index": i, "id": jobs[i].get("id")}
+                try:
+                    ret["result"] = future.result()
+                except Exception as e:
+                    ret["error"] = _error(e)
+                yield ret
+
+
+def _error(e: Exception) -> str:
+    return f"{type(e).__name__}: {e}"
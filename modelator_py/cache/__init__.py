@@ -0,0 +1,3 @@
+from .result_cache import ResultCache
+
+__all__ = ["ResultCache"]
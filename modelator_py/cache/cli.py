@@ -0,0 +1,28 @@
+import json as stdjson
+
+from .result_cache import ResultCache
+
+
+class Cache:
+    def __init__(self, stdin):
+        self._stdin = stdin
+
+    def stats(self, *, path):
+        """
+        Print the number and total size of the results in a result cache.
+
+        Arguments:
+            path : Directory of the result cache.
+        """
+        stats = ResultCache(path).stats()
+        del stats["hits"], stats["misses"], stats["max_size"]
+        print(stdjson.dumps(stats, indent=4, sort_keys=True))
+
+    def clear(self, *, path):
+        """
+        Remove all the results of a result cache.
+
+        Arguments:
+            path : Directory of the result cache.
+        """
+        ResultCache(path).clear()
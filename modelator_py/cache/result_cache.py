@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import typing
+
+# mypy: ignore-errors
+
+# Results with these return codes are not cached: 126 and 127 are returned
+# for commands that could not run (see `helper.run_argv`), 128 + n by a JVM
+# that exits on signal n, TLC returns 150 to 153 for errors (parsing the spec
+# or the config, a state space too large, or a system error such as running
+# out of memory) and 255 for other errors. Commands killed by signal n return
+# -n, which is not cached either. The return codes of violations (10 to 14)
+# are cached.
+UNCACHED_RETURN_CODE = 126
+
+_jar_digests = dict()
+_jar_digests_lock = threading.Lock()
+
+
+def jar_digest(jar: str) -> str:
+    """
+    Return the sha256 of the contents of the file `jar`, computed once per
+    path, size and modification time, as jars are large.
+    """
+    stat = os.stat(jar)
+    memo_key = (os.path.abspath(jar), stat.st_size, stat.st_mtime_ns)
+    with _jar_digests_lock:
+        digest = _jar_digests.get(memo_key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(jar, "rb") as fd:
+            for chunk in iter(lambda: fd.read(1 << 20), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        with _jar_digests_lock:
+            _jar_digests[memo_key] = digest
+    return digest
+
+
+class ResultCache:
+    """
+    On-disk cache of the results of `tlc_pure` and `apalache_pure`, which are
+    a function of the jar, the command line and the files of the command.
+    Results are keyed by the hash of the contents of the jar, the command
+    line (see `raw_cmd_argv`) and the contents of the files.
+
+    Results are stored in the directory `path`, one json file per result.
+    When the files take more than `max_size` bytes, the least recently used
+    results are removed.
+
+    The counters `hits` and `misses` count the lookups of this object. Results
+    are not cached if their return code is negative or at least
+    `UNCACHED_RETURN_CODE`.
+    """
+
+    def __init__(self, path: str, max_size: int = 1 << 30):
+        self.path = os.path.expanduser(path)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+
+    def key(
+        self, tool: str, jar: str, argv: typing.List[str], files: typing.Dict[str, str]
+    ) -> str:
+        digest = jar_digest(jar)
+        inputs = {
+            "tool": tool,
+            # the same jar at another path gives the same results
+            "argv": [digest if arg == jar else arg for arg in argv],
+            "files": {
+                name: hashlib.sha256(content.encode()).hexdigest()
+                for name, content in files.items()
+            },
+        }
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key: str) -> typing.Optional[typing.Dict]:
+        """Return the result stored for `key`, or None."""
+        try:
+            with open(self._file(key), "r") as fd:
+                result = json.load(fd)
+            # mark the result as recently used
+            os.utime(self._file(key))
+        except (FileNotFoundError, json.JSONDecodeError):
+            result = None
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def put(self, key: str, result: typing.Dict):
+        if not 0 <= result["return_code"] < UNCACHED_RETURN_CODE:
+            return
+        # write to a temporary file first, so readers never see partial files
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(result, f)
+        os.replace(tmp, self._file(key))
+        self._evict()
+
+    def stats(self) -> typing.Dict[str, int]:
+        entries = self._entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "size": sum(size for _, size, _ in entries),
+            "max_size": self.max_size,
+        }
+
+    def clear(self):
+        """Remove all the results, and reset the counters."""
+        for path, _, _ in self._entries():
+            _remove(path)
+        self.hits = 0
+        self.misses = 0
+
+    def _evict(self):
+        entries = self._entries()
+        size = sum(size for _, size, _ in entries)
+        for path, entry_size, _ in sorted(entries, key=lambda e: e[2]):
+            if size <= self.max_size:
+                break
+            _remove(path)
+            size -= entry_size
+
+    def _entries(self):
+        """Return (path, size, last use time) of each result."""
+        entries = []
+        for entry in os.scandir(self.path):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((entry.path, stat.st_size, stat.st_mtime_ns))
+        return entries
+
+    def _file(self, key):
+        return os.path.join(self.path, f"{key}.json")
+
+
+def _remove(path):
+    # another process may have removed it
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -3,6 +3,8 @@ import sys
 import fire
 
 from .apalache.cli import Apalache
+from .batch.cli import Batch
+from .cache.cli import Cache
 from .tlc.cli import Tlc
 from .util.cli import Util
 
@@ -13,6 +15,8 @@ class App:
         self.tlc = Tlc(stdin)
         self.apalache = Apalache(stdin)
         self.util = Util(stdin)
+        self.batch = Batch(stdin)
+        self.cache = Cache(stdin)
 
     def easter(self, fizz, *, foo=True, bar=None, wiz):
         """
@@ -1,6 +1,13 @@
+import asyncio
+import atexit
+import functools
+import itertools
 import logging
 import os
+import shlex
 import shutil
+import signal
+import subprocess
 import typing
 
 import pathos.multiprocessing as multiprocessing
@@ -43,13 +50,236 @@ def delete_dir(path):
     shutil.rmtree(path)
 
 
-def parallel_map(function, data: typing.List):
-    cores = multiprocessing.cpu_count()
+class WorkerPool:
+    """
+    Pool of worker processes, reused by each call of `map` until `close`.
+
+    Inputs with fewer than `serial_threshold` items, or pools with a single
+    worker, are mapped in the calling process, without starting workers.
+    Use as a context manager to close the pool on exit:
+
+    ```python
+    with WorkerPool(workers=4) as pool:
+        for stdout in stdouts:
+            tlc_itf(json={"stdout": stdout}, pool=pool)
+    ```
+    """
 
     # Make chunk size smaller to fill up gaps
     # if processing time for different chunks differ
     HEURISTIC_PARAM = 2
-    chunksize = len(data) // (cores * HEURISTIC_PARAM)
+    SERIAL_THRESHOLD = 2
+
+    _ids = itertools.count()
+
+    def __init__(self, workers=None, serial_threshold=SERIAL_THRESHOLD):
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        if workers < 1:
+            raise Exception(f"A worker pool needs at least one worker, got {workers=}")
+        self.workers = workers
+        self.serial_threshold = serial_threshold
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def chunksize(self, n):
+        """Number of items sent to a worker at once, for `n` items."""
+        return max(1, n // (self.workers * self.HEURISTIC_PARAM))
+
+    def map(self, function, data: typing.List):
+        if self.workers == 1 or len(data) < self.serial_threshold:
+            return [function(e) for e in data]
+        if self._pool is None:
+            # a pool id of its own, as pathos shares pools with the same id
+            pool_id = f"{__name__}.WorkerPool-{next(self._ids)}"
+            self._pool = multiprocessing.ProcessPool(self.workers, id=pool_id)
+        return self._pool.map(function, data, chunksize=self.chunksize(len(data)))
+
+    def map_by_size(self, function, data: typing.List, size=len):
+        """
+        Like `map`, but sends the items to the workers in contiguous batches
+        of about the same total `size`, instead of the same number of items,
+        so that a few large items do not keep one worker busy while the
+        others are idle.
+        """
+        if self.workers == 1 or len(data) < self.serial_threshold:
+            return [function(e) for e in data]
+        n_batches = self.workers * self.HEURISTIC_PARAM
+        batches = batches_by_size(data, [size(e) for e in data], n_batches)
+        results = self.map(functools.partial(_map_batch, function), batches)
+        return [r for batch in results for r in batch]
+
+    def close(self):
+        """Stop the worker processes. A later `map` starts new workers."""
+        if self._pool is not None:
+            self._pool.clear()
+            self._pool = None
+
+
+def batches_by_size(data: typing.List, sizes: typing.List[int], n: int):
+    """
+    Split `data` into at most `n` contiguous batches with about the same
+    total of `sizes`, the size of each item of `data`.
+    """
+    target = sum(sizes) / n
+    batches = []
+    batch = []
+    batch_size = 0
+    for e, size in zip(data, sizes):
+        batch.append(e)
+        batch_size += size
+        if batch_size >= target and len(batches) < n - 1:
+            batches.append(batch)
+            batch = []
+            batch_size = 0
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _map_batch(function, batch):
+    return [function(e) for e in batch]
+
+
+_default_pool = None
+
+
+def default_pool() -> WorkerPool:
+    """
+    Return the pool used by `parallel_map` when no pool is given.
+
+    The pool has a worker per core and is closed when the interpreter exits.
+    """
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = WorkerPool()
+        atexit.register(_default_pool.close)
+    return _default_pool
+
+
+def parallel_map(function, data: typing.List, pool: typing.Optional[WorkerPool] = None):
+    if pool is None:
+        pool = default_pool()
+    return pool.map(function, data)
+
+
+def parallel_map_by_size(
+    function, data: typing.List, size=len, pool: typing.Optional[WorkerPool] = None
+):
+    if pool is None:
+        pool = default_pool()
+    return pool.map_by_size(function, data, size=size)
+
+
+def run_argv(
+    argv: typing.List[str], *, cwd: str, cmd_str: typing.Optional[str] = None
+) -> subprocess.CompletedProcess:
+    """
+    Run the command `argv` without a shell, capturing its stdout and stderr,
+    like `subprocess.run(argv, capture_output=True)`.
+
+    The `args` of the result is `cmd_str`, the command line as a string to
+    show to the user, by default `shlex.join(argv)`. As with a shell, a
+    missing program gives a result with return code 127.
+    """
+    if cmd_str is None:
+        cmd_str = shlex.join(argv)
+    try:
+        result = subprocess.run(argv, capture_output=True, cwd=cwd)
+    except FileNotFoundError as e:
+        if e.filename != argv[0]:
+            raise
+        return _not_found(argv, cmd_str)
+    result.args = cmd_str
+    return result
+
+
+def _not_found(argv, cmd_str):
+    stderr = f"{argv[0]}: not found\n".encode()
+    return subprocess.CompletedProcess(cmd_str, 127, b"", stderr)
+
+
+# Limit of the length of a line of stdout read by `run_argv_async`.
+STDOUT_LINE_LIMIT = 1 << 26
+
+
+async def run_argv_async(
+    argv: typing.List[str],
+    *,
+    cwd: str,
+    timeout: typing.Optional[float] = None,
+    on_stdout: typing.Optional[typing.Callable[[bytes], None]] = None,
+    cmd_str: typing.Optional[str] = None,
+) -> subprocess.CompletedProcess:
+    """
+    Run the command `argv` like `run_argv`, in an asyncio subprocess.
+
+    `on_stdout` is called with each line of stdout (bytes) as soon as it is
+    read. If the command runs longer than `timeout` seconds, it is killed and
+    `subprocess.TimeoutExpired` is raised. If the awaiting task is cancelled,
+    the command is killed.
+
+    The command runs in a new session, so that killing it also kills the
+    processes it started.
+    """
+    if cmd_str is None:
+        cmd_str = shlex.join(argv)
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *argv,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=cwd,
+            start_new_session=True,
+            limit=STDOUT_LINE_LIMIT,
+        )
+    except FileNotFoundError as e:
+        if e.filename != argv[0]:
+            raise
+        return _not_found(argv, cmd_str)
+    stdout = []
+
+    async def read_stdout():
+        async for line in process.stdout:
+            stdout.append(line)
+            if on_stdout is not None:
+                on_stdout(line)
+
+    async def communicate():
+        _, stderr = await asyncio.gather(read_stdout(), process.stderr.read())
+        await process.wait()
+        return stderr
+
+    try:
+        stderr = await asyncio.wait_for(communicate(), timeout)
+    except asyncio.TimeoutError:
+        _kill_session(process)
+        await process.wait()
+        raise subprocess.TimeoutExpired(
+            cmd_str, timeout, output=b"".join(stdout)
+        ) from None
+    except BaseException:
+        _kill_session(process)
+        # wait for the killed process, so its pipes are closed by this loop
+        await process.wait()
+        raise
+    return subprocess.CompletedProcess(
+        cmd_str, process.returncode, b"".join(stdout), stderr
+    )
+
 
-    with multiprocessing.ProcessPool(cores) as p:
-        return p.map(function, data, chunksize=chunksize)
+def _kill_session(process):
+    if process.returncode is not None:
+        return
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
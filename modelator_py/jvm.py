@@ -0,0 +1,110 @@
+import hashlib
+import os
+import shutil
+import typing
+
+# mypy: ignore-errors
+
+# The java binaries (see `_java_key`) that refused the class data sharing
+# options.
+_unsupported = set()
+
+
+class ClassDataArchive:
+    """
+    A class data sharing archive (AppCDS, JDK 13+) of the classes loaded by a
+    run of `jar`, stored in the directory `cache_dir`.
+
+    The first run with the archive dumps the classes it loaded into the
+    archive at exit, and the following runs map the archive instead of
+    loading and verifying the classes of the jar again, which takes most of
+    the startup time of TLC and Apalache on small models. The archive is
+    keyed by the path, size and modification time of the jar and of the java
+    binary, as a JVM ignores the archives of other JVMs.
+
+    Use `ClassDataArchive.of`, which returns None if the archives are
+    disabled.
+    """
+
+    def __init__(self, jar: str, cache_dir: str, java: str):
+        self.jar = jar
+        self.cache_dir = cache_dir
+        self.java = java
+        key = f"{_file_key(jar)}:{java}"
+        name = hashlib.sha256(key.encode()).hexdigest()[:32]
+        self.path = os.path.join(cache_dir, f"{name}.jsa")
+        # each run dumps to its own file, so concurrent runs never share one
+        self.dump_path = f"{self.path}.{os.getpid()}.{id(self)}.tmp"
+
+    @classmethod
+    def of(
+        cls, jar: str, cache_dir: typing.Optional[str]
+    ) -> typing.Optional["ClassDataArchive"]:
+        if cache_dir is None or not os.path.isfile(jar):
+            return None
+        java = _java_key()
+        if java is None or java in _unsupported:
+            return None
+        cache_dir = os.path.expanduser(cache_dir)
+        os.makedirs(cache_dir, exist_ok=True)
+        return cls(jar, cache_dir, java)
+
+    def options(self) -> typing.List[str]:
+        """Return the java options to add to the command line."""
+        if os.path.isfile(self.path):
+            archive = f"-XX:SharedArchiveFile={self.path}"
+        else:
+            archive = f"-XX:ArchiveClassesAtExit={self.dump_path}"
+        # JVM warnings (e.g. about an outdated archive) go to stderr, not to
+        # the stdout of TLC, which is parsed
+        return [archive, "-Xlog:disable", "-Xlog:all=warning:stderr"]
+
+    def finish(self, result) -> bool:
+        """
+        Store the archive dumped by the run with `result` (a subprocess
+        result). Returns False if the JVM does not support the options, in
+        which case the command should be run again without them.
+        """
+        if result.returncode != 0 and _refused(result):
+            _unsupported.add(self.java)
+            self.discard()
+            return False
+        if result.returncode < 0:
+            # killed by a signal, possibly while writing the archive
+            self.discard()
+        elif os.path.isfile(self.dump_path):
+            os.replace(self.dump_path, self.path)
+        return True
+
+    def discard(self):
+        """Remove the archive dumped by a run that did not finish."""
+        try:
+            os.remove(self.dump_path)
+        except FileNotFoundError:
+            pass
+
+
+def _file_key(path):
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _java_key() -> typing.Optional[str]:
+    """
+    Return the path, size and modification time of the java binary found in
+    the PATH, which change when the JDK is upgraded, or None if there is none.
+    """
+    java = shutil.which("java")
+    if java is None:
+        return None
+    return _file_key(os.path.realpath(java))
+
+
+def _refused(result) -> bool:
+    output = result.stdout + result.stderr
+    if isinstance(output, str):
+        output = output.encode()
+    return (
+        b"Unrecognized VM option" in output
+        or b"Could not create the Java Virtual Machine" in output
+    )
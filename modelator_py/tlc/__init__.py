@@ -2,6 +2,13 @@ from .args import TlcArgs
 from .pure import PureCmd as TlcPureCmd
 from .pure import tlc_pure
 from .raw import RawCmd as TlcRawCmd
-from .raw import tlc_raw
+from .raw import tlc_raw, tlc_raw_async
 
-__all__ = ["TlcArgs", "TlcPureCmd", "TlcRawCmd", "tlc_pure", "tlc_raw"]
+__all__ = [
+    "TlcArgs",
+    "TlcPureCmd",
+    "TlcRawCmd",
+    "tlc_pure",
+    "tlc_raw",
+    "tlc_raw_async",
+]
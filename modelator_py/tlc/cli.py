@@ -1,5 +1,6 @@
 import json as stdjson
 
+from ..cache import ResultCache
 from .pure import tlc_pure
 from .raw import RawCmd, TlcArgs, tlc_raw
 
@@ -8,7 +9,7 @@ class Tlc:
     def __init__(self, stdin):
         self._stdin = stdin
 
-    def pure(self):
+    def pure(self, *, cache=None):
         """
         Run TLC without side effects using json input data.
 
@@ -20,6 +21,9 @@ class Tlc:
 
         Requires json input data on stdin (`<command> < data.json`).
 
+        Arguments:
+            cache : Directory of a result cache, to reuse the result of a previous run with the same jar, args and files.
+
         WARNING: does not support all CLI arguments in TLC 2.18
         """
         assert (
@@ -27,7 +31,9 @@ class Tlc:
         ), "The pure interface requires json input in stdin"
         json_dict = stdjson.loads(self._stdin.read())
 
-        result = tlc_pure(json=json_dict)
+        if cache is not None:
+            cache = ResultCache(cache)
+        result = tlc_pure(json=json_dict, cache=cache)
         to_print = stdjson.dumps(result, indent=4, sort_keys=True)
         print(to_print)
 
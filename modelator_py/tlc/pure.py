@@ -6,7 +6,7 @@ from typing import Optional
 from modelator_py.tlc.args import TlcArgs
 
 from ..helper import read_entire_dir_contents
-from .raw import RawCmd, tlc_raw
+from .raw import RawCmd, raw_cmd_argv, tlc_raw
 
 # mypy: ignore-errors
 
@@ -18,6 +18,9 @@ class PureCmd:
         str
     ] = None  # Location of TLC jar (e.g. full path with suffix like tla2tools.jar)
     args: Optional[TlcArgs] = None  # TLC args
+    jvm_cache: Optional[
+        str
+    ] = None  # Directory of JVM class data archives (see jvm.ClassDataArchive)
 
 
 def json_to_cmd(json) -> PureCmd:
@@ -26,6 +29,7 @@ def json_to_cmd(json) -> PureCmd:
             "files": None,
             "jar": None,
             "args": None,
+            "jvm_cache": None,
         },
         **json,
     }
@@ -33,10 +37,25 @@ def json_to_cmd(json) -> PureCmd:
     cmd.jar = json["jar"]
     cmd.args = TlcArgs(**json["args"])
     cmd.files = json["files"]
+    cmd.jvm_cache = json["jvm_cache"]
     return cmd
 
 
-def tlc_pure(*, cmd: PureCmd = None, json=None):  # type: ignore
+def is_deterministic(args: TlcArgs) -> bool:
+    """
+    Does TLC give the same output for the same `args` and files? Without
+    `-fp`, TLC picks a random fingerprint function, with `-simulate` and
+    without `-seed` it checks random behaviors, and with more than one worker
+    the order in which states are explored, and so the traces, vary.
+    """
+    return (
+        args.fp is not None
+        and (args.simulate is None or args.seed is not None)
+        and args.workers in (None, 1, "1")
+    )
+
+
+def tlc_pure(*, cmd: PureCmd = None, json=None, cache=None):  # type: ignore
     """
     Run a TLC command using either a PureCmd object, or build the PureCmd from json.
 
@@ -44,6 +63,10 @@ def tlc_pure(*, cmd: PureCmd = None, json=None):  # type: ignore
 
     Returns an ExecutionResult with .process and .files properties. Contains the
     subprocess result, and the list of filesystem files (and contents).
+
+    If `cache` (a `cache.ResultCache`) is given, returns the cached result of
+    a command with the same jar, args and files, if any, without running TLC.
+    Runs whose output is random are not cached (see `is_deterministic`).
     """
     assert not (cmd is not None and json is not None)
     assert (cmd is not None) or (json is not None)
@@ -56,6 +79,14 @@ def tlc_pure(*, cmd: PureCmd = None, json=None):  # type: ignore
     # Always specify tlc '-cleanup'
     raw_cmd.args.cleanup = True
     raw_cmd.jar = cmd.jar
+    raw_cmd.jvm_cache = cmd.jvm_cache
+
+    key = None
+    if cache is not None and is_deterministic(raw_cmd.args):
+        key = cache.key("tlc", cmd.jar, raw_cmd_argv(raw_cmd), cmd.files)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
 
     ret = {}
 
@@ -86,4 +117,7 @@ def tlc_pure(*, cmd: PureCmd = None, json=None):  # type: ignore
     ret["stdout"] = stdout_pretty
     ret["stderr"] = stderr_pretty
 
+    if key is not None:
+        cache.put(key, ret)
+
     return ret
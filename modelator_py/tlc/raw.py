@@ -1,9 +1,10 @@
 import os
-import subprocess
 import tempfile
-from dataclasses import asdict, dataclass
-from typing import Optional
+from dataclasses import dataclass, fields
+from typing import List, Optional
 
+from ..helper import run_argv, run_argv_async
+from ..jvm import ClassDataArchive
 from .args import TlcArgs
 
 # mypy: ignore-errors
@@ -11,70 +12,87 @@ from .args import TlcArgs
 
 @dataclass
 class RawCmd:
-    cwd: Optional[str] = None  # Current working directory for child shell process
+    cwd: Optional[str] = None  # Current working directory for child process
     jar: Optional[
         str
     ] = None  # Location of TLC jar (full path with suffix like tla2tools.jar)
     args: Optional[TlcArgs] = None  # TLC args
-
-
-def stringify_raw_cmd(cmd: RawCmd, java_temp_dir: str = None) -> str:
+    jvm_cache: Optional[
+        str
+    ] = None  # Directory of JVM class data archives (see jvm.ClassDataArchive)
+
+
+# TLC flags which differ from the name of their TlcArgs field
+_FLAGS = {
+    "cont": "-continue",
+    "generate_spec_te": "-generateSpecTE",
+    "max_set_size": "-maxSetSize",
+    "userfile": "-userFile",
+}
+
+# TLC flags which take no value: they are passed if their field is not None
+_SWITCHES = {
+    "cleanup",
+    "cont",
+    "deadlock",
+    "debug",
+    "difftrace",
+    "generate_spec_te",
+    "gzip",
+    "h",
+    "nowarning",
+    "simulate",
+    "terse",
+    "tool",
+    "view",
+}
+
+
+def raw_cmd_argv(
+    cmd: RawCmd, java_temp_dir: str = None, java_options: List[str] = ()
+) -> List[str]:
     """
-    Returns a string which can be passed to a shell to run TLC.
+    Returns the arguments of the command which runs TLC, to be executed
+    without a shell.
     """
 
-    jar = cmd.jar
-    args = cmd.args
-
-    if java_temp_dir is None:
-        tmpdir_setup = ""
-    else:
-        tmpdir_setup = " -Djava.io.tmpdir={}".format(java_temp_dir)
-
     def stringify(value):
         # Tlc will not accept capitals
         if isinstance(value, bool):
             return str(value).lower()
-        return value
-
-    args = TlcArgs(**{k: stringify(v) for k, v in asdict(args).items()})
-
-    cmd_str = f"""java{tmpdir_setup}\
- -cp "{jar}"\
- tlc2.TLC\
-{f" -aril {args.aril}" if args.aril is not None else ""}\
-{f" -checkpoint {args.checkpoint}" if args.checkpoint is not None else ""}\
-{f" -cleanup" if args.cleanup is not None else ""}\
-{f" -config {args.config}" if args.config is not None else ""}\
-{f" -continue" if args.cont is not None else ""}\
-{f" -coverage {args.coverage}" if args.coverage is not None else ""}\
-{f" -deadlock" if args.deadlock is not None else ""}\
-{f" -debug" if args.debug is not None else ""}\
-{f" -depth {args.depth}" if args.depth is not None else ""}\
-{f" -dfid {args.dfid}" if args.dfid is not None else ""}\
-{f" -difftrace" if args.difftrace is not None else ""}\
-{f" -dump {args.dump}" if args.dump is not None else ""}\
-{f" -fp {args.fp}" if args.fp is not None else ""}\
-{f" -fpbits {args.fpbits}" if args.fpbits is not None else ""}\
-{f" -fpmem {args.fpmem}" if args.fpmem is not None else ""}\
-{f" -generateSpecTE" if args.generate_spec_te is not None else ""}\
-{f" -gzip" if args.gzip is not None else ""}\
-{f" -h" if args.h is not None else ""}\
-{f" -maxSetSize {args.max_set_size}" if args.max_set_size is not None else ""}\
-{f" -metadir {args.metadir}" if args.metadir is not None else ""}\
-{f" -nowarning" if args.nowarning is not args.nowarning else ""}\
-{f" -recover {args.recover}" if args.recover is not None else ""}\
-{f" -seed {args.seed}" if args.seed is not None else ""}\
-{f" -simulate" if args.simulate is not None else ""}\
-{f" -terse" if args.terse is not None else ""}\
-{f" -tool" if args.tool is not None else ""}\
-{f" -userFile {args.userfile}" if args.userfile is not None else ""}\
-{f" -view" if args.view is not None else ""}\
-{f" -workers {args.workers}" if args.workers is not None else ""}\
-{f" {args.file}" if args.file is not None else ""}\
-"""
-
-    return cmd_str
+        return str(value)
+
+    argv = ["java"]
+    if java_temp_dir is not None:
+        argv.append(f"-Djava.io.tmpdir={java_temp_dir}")
+    argv.extend(java_options)
+    argv.extend(["-cp", cmd.jar, "tlc2.TLC"])
+
+    for field in fields(TlcArgs):
+        value = getattr(cmd.args, field.name)
+        if value is None or field.name == "file":
+            continue
+        argv.append(_FLAGS.get(field.name, f"-{field.name}"))
+        if field.name not in _SWITCHES:
+            argv.append(stringify(value))
+
+    if cmd.args.file is not None:
+        argv.append(stringify(cmd.args.file))
+    return argv
+
+
+def stringify_raw_cmd(
+    cmd: RawCmd, java_temp_dir: str = None, java_options: List[str] = ()
+) -> str:
+    """
+    Returns a string which can be passed to a shell to run TLC, in which
+    the jar is quoted, and the other arguments are not.
+    """
+    return _cmd_str(cmd, raw_cmd_argv(cmd, java_temp_dir, java_options))
+
+
+def _cmd_str(cmd, argv):
+    return " ".join(f'"{arg}"' if arg == cmd.jar else arg for arg in argv)
 
 
 def json_to_cmd(json) -> RawCmd:
@@ -83,12 +101,14 @@ def json_to_cmd(json) -> RawCmd:
             "cwd": None,
             "jar": None,
             "args": None,
+            "jvm_cache": None,
         },
         **json,
     }
     cmd = RawCmd()
     cmd.cwd = json["cwd"]
     cmd.jar = json["jar"]
+    cmd.jvm_cache = json["jvm_cache"]
     cmd.args = TlcArgs(**json["args"])
     return cmd
 
@@ -101,6 +121,75 @@ def tlc_raw(*, cmd: RawCmd = None, json=None):
 
     Returns a subprocess call result object.
     """
+    cmd = _checked_cmd(cmd, json)
+
+    with tempfile.TemporaryDirectory(
+        prefix="modelator-py-tlc-java-temp-dir-"
+    ) as java_temp:
+        archive = ClassDataArchive.of(cmd.jar, cmd.jvm_cache)
+        if archive is not None:
+            argv = raw_cmd_argv(
+                cmd, java_temp_dir=java_temp, java_options=archive.options()
+            )
+            try:
+                result = run_argv(argv, cwd=cmd.cwd, cmd_str=_cmd_str(cmd, argv))
+            except BaseException:
+                archive.discard()
+                raise
+            if archive.finish(result):
+                return result
+
+        argv = raw_cmd_argv(cmd, java_temp_dir=java_temp)
+        return run_argv(argv, cwd=cmd.cwd, cmd_str=_cmd_str(cmd, argv))
+
+
+async def tlc_raw_async(*, cmd: RawCmd = None, json=None, timeout=None, on_stdout=None):
+    """
+    Run a TLC command like `tlc_raw`, in an asyncio subprocess, so that
+    many commands can run concurrently from one event loop.
+
+    `on_stdout` is called with each line of the stdout of TLC (bytes) as soon
+    as it is printed. TLC is killed if it runs longer than `timeout` seconds,
+    raising `subprocess.TimeoutExpired`, or if the awaiting task is cancelled.
+
+    Returns a subprocess call result object.
+    """
+    cmd = _checked_cmd(cmd, json)
+
+    with tempfile.TemporaryDirectory(
+        prefix="modelator-py-tlc-java-temp-dir-"
+    ) as java_temp:
+        archive = ClassDataArchive.of(cmd.jar, cmd.jvm_cache)
+        if archive is not None:
+            argv = raw_cmd_argv(
+                cmd, java_temp_dir=java_temp, java_options=archive.options()
+            )
+            try:
+                result = await run_argv_async(
+                    argv,
+                    cwd=cmd.cwd,
+                    timeout=timeout,
+                    on_stdout=on_stdout,
+                    cmd_str=_cmd_str(cmd, argv),
+                )
+            except BaseException:
+                # timed out or cancelled
+                archive.discard()
+                raise
+            if archive.finish(result):
+                return result
+
+        argv = raw_cmd_argv(cmd, java_temp_dir=java_temp)
+        return await run_argv_async(
+            argv,
+            cwd=cmd.cwd,
+            timeout=timeout,
+            on_stdout=on_stdout,
+            cmd_str=_cmd_str(cmd, argv),
+        )
+
+
+def _checked_cmd(cmd, json):
     assert cmd is not None or json is not None
     assert not (cmd is not None and json is not None)
 
@@ -119,11 +208,4 @@ def tlc_raw(*, cmd: RawCmd = None, json=None):
             raise Exception("TLC jar path must be absolute (after expanding user)")
     if cmd.jar is None:
         raise Exception("TLC jar path must be absolute (after expanding user)")
-
-    with tempfile.TemporaryDirectory(
-        prefix="modelator-py-tlc-java-temp-dir-"
-    ) as java_temp:
-        cmd_str = stringify_raw_cmd(cmd, java_temp_dir=java_temp)
-
-        # Semantics a bit complex here - see https://stackoverflow.com/a/15109975/8346628
-        return subprocess.run(cmd_str, shell=True, capture_output=True, cwd=cmd.cwd)
+    return cmd
@@ -1,3 +1,4 @@
+import hashlib
 from abc import ABCMeta
 
 """
@@ -6,64 +7,148 @@ In memory tree representing Informal Trace Format trace.
 
 
 class ITFNode(object):
+    """
+    Nodes are hashed by their structure, like the tuples of their elements.
+    The hash is an in-process hash, as the hash of strings differs between
+    processes; `digest` is a hash that is the same in every process.
+
+    Nodes returned by `Interner` must not be modified: they cache their hash,
+    so hashing them is O(1), and comparing interned nodes with different
+    hashes is O(1).
+
+    Subclasses defining `__eq__` must set `__hash__ = ITFNode.__hash__`, as
+    Python otherwise makes them unhashable.
+    """
+
     __metaclass__ = ABCMeta
+    # Nodes have no instance __dict__, as large traces have millions of them.
+    __slots__ = ("_hash",)
 
     def __repr__(self):
         assert False, """Not implemented as uses visitor pattern
         and I don't want to think about circular reference right now."""
 
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            return hash((type(self), self._hash_key()))
+
+    def digest(self) -> str:
+        """
+        Return the blake2b hash (hex) of the structure of the node, which is
+        the same in every process, e.g. to key stored results. Equal nodes
+        have the same digest, and `1` and `True` have different ones.
+        """
+        out = bytearray()
+        _canonical(self, out)
+        return hashlib.blake2b(out, digest_size=16).hexdigest()
+
+    def __getstate__(self):
+        # The hash of strings differs between processes, so it is not pickled.
+        return {
+            slot: getattr(self, slot)
+            for cls in type(self).__mro__
+            for slot in getattr(cls, "__slots__", ())
+            if slot != "_hash" and hasattr(self, slot)
+        }
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
+
+def _may_be_equal(a, b):
+    """Is it possible that a == b, going by the hashes cached by `Interner`?"""
+    try:
+        return a._hash == b._hash
+    except AttributeError:
+        return True
+
 
 class ITFRecord(ITFNode):
     """{ "field1": <expr>, ..., "fieldN": <expr> }"""
 
+    __slots__ = ("elements",)
+    __hash__ = ITFNode.__hash__
+
     def __init__(self, elements):
         self.elements = elements  # dict
 
     def __eq__(self, other):
         """Overrides the default implementation"""
+        if self is other:
+            return True
         if isinstance(other, ITFRecord):
-            return self.elements == other.elements
+            return _may_be_equal(self, other) and self.elements == other.elements
         return False
 
+    def _hash_key(self):
+        return frozenset(self.elements.items())
+
 
 class ITFList(ITFNode):
     """[ <expr>, ..., <expr> ]"""
 
+    __slots__ = ("elements",)
+    __hash__ = ITFNode.__hash__
+
     def __init__(self, elements):
         self.elements = elements
 
     def __eq__(self, other):
         """Overrides the default implementation"""
+        if self is other:
+            return True
         if isinstance(other, ITFList):
-            return self.elements == other.elements
+            return _may_be_equal(self, other) and self.elements == other.elements
         return False
 
+    def _hash_key(self):
+        return tuple(self.elements)
+
 
 class ITFSet(ITFNode):
     """{ "#set": [ <expr>, ..., <expr> ] }"""
 
+    __slots__ = ("elements",)
+    __hash__ = ITFNode.__hash__
+
     def __init__(self, elements):
         self.elements = elements
 
     def __eq__(self, other):
         """Overrides the default implementation"""
+        if self is other:
+            return True
         if isinstance(other, ITFSet):
-            return self.elements == other.elements
+            return _may_be_equal(self, other) and self.elements == other.elements
         return False
 
+    def _hash_key(self):
+        return tuple(self.elements)
+
 
 class ITFMap(ITFNode):
     """{ "#map": [ [ <expr>, <expr> ], ..., [ <expr>, <expr> ] ] }"""
 
+    __slots__ = ("elements",)
+    __hash__ = ITFNode.__hash__
+
     def __init__(self, elements):
         self.elements = elements
 
     def __eq__(self, other):
         """Overrides the default implementation"""
+        if self is other:
+            return True
         if isinstance(other, ITFMap):
-            return self.elements == other.elements
+            return _may_be_equal(self, other) and self.elements == other.elements
         return False
 
+    def _hash_key(self):
+        return tuple(tuple(p) for p in self.elements)
+
 
 class ITFState(ITFNode):
     """
@@ -75,15 +160,25 @@ class ITFState(ITFNode):
     }
     """
 
+    __slots__ = ("var_value_map",)
+    __hash__ = ITFNode.__hash__
+
     def __init__(self, var_value_map):
         self.var_value_map = var_value_map
 
     def __eq__(self, other):
         """Overrides the default implementation"""
+        if self is other:
+            return True
         if isinstance(other, ITFState):
-            return self.var_value_map == other.var_value_map
+            return (
+                _may_be_equal(self, other) and self.var_value_map == other.var_value_map
+            )
         return False
 
+    def _hash_key(self):
+        return frozenset(self.var_value_map.items())
+
 
 class ITFTrace(ITFNode):
     """
@@ -96,6 +191,9 @@ class ITFTrace(ITFNode):
     }
     """
 
+    __slots__ = ("meta", "vars", "states")
+    __hash__ = ITFNode.__hash__
+
     def __init__(self, vars_, states, meta=None):
         self.meta = meta
         self.vars = vars_
@@ -103,14 +201,59 @@ class ITFTrace(ITFNode):
 
     def __eq__(self, other):
         """Overrides the default implementation"""
-        if isinstance(other, ITFState):
+        if self is other:
+            return True
+        if isinstance(other, ITFTrace):
             return (
-                self.meta == other.meta
+                _may_be_equal(self, other)
+                and self.meta == other.meta
                 and self.vars == other.vars
                 and self.states == other.states
             )
         return False
 
+    def _hash_key(self):
+        return (tuple(self.vars or ()), tuple(self.states))
+
+
+def _canonical(value, out: bytearray):
+    """Append the encoding of `value` hashed by `ITFNode.digest` to `out`."""
+    t = type(value)
+    if value is None:
+        out += b"n"
+    elif t is bool:
+        out += b"t" if value else b"f"
+    elif t is int or t is str:
+        data = str(value).encode()
+        out += b"%s%d:%s" % (b"i" if t is int else b"s", len(data), data)
+    elif t is list or t is tuple:
+        out += b"l%d:" % len(value)
+        for e in value:
+            _canonical(e, out)
+    elif t is dict:
+        # the order of the keys does not matter, as in the equality of dicts
+        items = []
+        for k, v in value.items():
+            item = bytearray()
+            _canonical(k, item)
+            _canonical(v, item)
+            items.append(item)
+        out += b"d%d:" % len(items)
+        for item in sorted(items):
+            out += item
+    elif isinstance(value, ITFNode):
+        out += t.__name__.encode() + b":"
+        if t is ITFRecord:
+            _canonical(value.elements, out)
+        elif t is ITFState:
+            _canonical(value.var_value_map, out)
+        elif t is ITFTrace:
+            _canonical([value.meta, value.vars, value.states], out)
+        else:
+            _canonical(value.elements, out)
+    else:
+        raise Exception(f"cannot digest {t.__name__} values")
+
 
 class Visitor:
     def visit(self, node, *arg, **kw):
@@ -173,11 +316,67 @@ class JsonSerializer(Visitor):
         return {"#meta": node.meta, "vars": node.vars, "states": states}
 
 
+class Interner(Visitor):
+    """
+    Returns copies of nodes in which equal subtrees are the same object, also
+    across the nodes visited by the same Interner, e.g. the values of the
+    variables that do not change between the states of a trace. Subtrees are
+    only shared if their values also have the same types, so `1` and `True`
+    stay distinct.
+
+    The shared nodes must not be modified, as they cache their hash.
+    """
+
+    def __init__(self):
+        self.nodes = dict()
+
+    def visit_ITFRecord(self, node, *arg, **kw):
+        elements = {k: self.visit(v) for k, v in node.elements.items()}
+        key = tuple((k, self._key(v)) for k, v in elements.items())
+        return self._intern(ITFRecord, key, elements)
+
+    def visit_ITFList(self, node, *arg, **kw):
+        elements = [self.visit(e) for e in node.elements]
+        return self._intern(ITFList, tuple(map(self._key, elements)), elements)
+
+    def visit_ITFSet(self, node, *arg, **kw):
+        elements = [self.visit(e) for e in node.elements]
+        return self._intern(ITFSet, tuple(map(self._key, elements)), elements)
+
+    def visit_ITFMap(self, node, *arg, **kw):
+        elements = [[self.visit(e) for e in p] for p in node.elements]
+        key = tuple(tuple(map(self._key, p)) for p in elements)
+        return self._intern(ITFMap, key, elements)
+
+    def visit_ITFState(self, node, *arg, **kw):
+        var_value_map = {k: self.visit(v) for k, v in node.var_value_map.items()}
+        key = tuple((k, self._key(v)) for k, v in var_value_map.items())
+        return self._intern(ITFState, key, var_value_map)
+
+    @staticmethod
+    def _key(value):
+        # Interned nodes are kept alive by self.nodes, so their ids are unique.
+        if isinstance(value, ITFNode):
+            return id(value)
+        return (type(value), value)
+
+    def _intern(self, cls, key, elements):
+        key = (cls, key)
+        node = self.nodes.get(key)
+        if node is None:
+            node = cls(elements)
+            # the children are interned, with a cached hash, so this does not
+            # hash their whole subtrees again
+            node._hash = hash(node)
+            self.nodes[key] = node
+        return node
+
+
 class Listifier(Visitor):
     def visit_ITFMap(self, node, *arg, **kw):
         keys = [p[0] for p in node.elements]
         # Is this map has only integer keys and they are from a domain 1..n
-        if all(type(k) == int for k in keys):
+        if all(type(k) is int for k in keys):
             keys.sort()
             if keys == list(range(1, len(keys) + 1)):
                 elements = [self.visit(p[1]) for p in node.elements]
@@ -190,13 +389,150 @@ class Recordifier(Visitor):
     def visit_ITFMap(self, node, *arg, **kw):
         keys = [p[0] for p in node.elements]
         # Is this map has only integer keys and they are from a domain 1..n
-        if all(type(k) == str for k in keys):
+        if all(type(k) is str for k in keys):
             elements = {p[0]: self.visit(p[1]) for p in node.elements}
             return ITFRecord(elements)
         elements = [[self.visit(e) for e in p] for p in node.elements]
         return ITFMap(elements)
 
 
+class NormalizingJsonSerializer(JsonSerializer):
+    """
+    Serializes to Json as `JsonSerializer`, with the lists and records of
+    `with_lists` and `with_records` (when `lists` and `records` are set),
+    in a single traversal that builds no intermediate ITF nodes.
+    """
+
+    def __init__(self, lists=True, records=True):
+        self.lists = lists
+        self.records = records
+
+    def visit_ITFMap(self, node, *arg, **kw):
+        keys = [p[0] for p in node.elements]
+        # Is this map has only integer keys and they are from a domain 1..n
+        if self.lists and all(type(k) is int for k in keys):
+            keys.sort()
+            if keys == list(range(1, len(keys) + 1)):
+                return [self.visit(p[1]) for p in node.elements]
+        if self.records and all(type(k) is str for k in keys):
+            return {p[0]: self.visit(p[1]) for p in node.elements}
+        elements = [[self.visit(e) for e in p] for p in node.elements]
+        return {"#map": elements}
+
+
+def to_json(node: ITFNode, lists=True, records=True):
+    """
+    Return the Json object of `node`, as `JsonSerializer` returns it for
+    `with_records(with_lists(node))`, without building the intermediate trees.
+    """
+    return NormalizingJsonSerializer(lists=lists, records=records).visit(node)
+
+
+def from_json(value):
+    """
+    Return the ITF value of the Json object `value`, the inverse of
+    `JsonSerializer`.
+
+    Json arrays are ITFLists and objects without a `#`-prefixed key are
+    ITFRecords. Tuples (`#tup`) are ITFLists and big integers (`#bigint`)
+    are Python ints. Unserializable values (`#unserializable`) are kept
+    as their string.
+    """
+    if isinstance(value, list):
+        return ITFList([from_json(e) for e in value])
+    if not isinstance(value, dict):
+        return value
+    if len(value) == 1:
+        if "#set" in value:
+            return ITFSet([from_json(e) for e in value["#set"]])
+        if "#map" in value:
+            return ITFMap([[from_json(k), from_json(v)] for k, v in value["#map"]])
+        if "#tup" in value:
+            return ITFList([from_json(e) for e in value["#tup"]])
+        if "#bigint" in value:
+            return int(value["#bigint"])
+        if "#unserializable" in value:
+            return value["#unserializable"]
+    return ITFRecord({k: from_json(v) for k, v in value.items()})
+
+
+def state_from_json(obj) -> ITFState:
+    """Return the ITFState of the Json object of a state, without its #meta."""
+    return ITFState({k: from_json(v) for k, v in obj.items() if k != "#meta"})
+
+
+def delta_encode(trace):
+    """
+    Return the Json object of an ITFTrace in which each state after the first
+    has only the variables whose value differ from the previous state, and
+    the `#meta` of the trace has `"delta": true`. `delta_decode` restores it.
+
+    The states of the trace must all have the same variables.
+    """
+    meta = dict(trace.get("#meta") or {})
+    meta["delta"] = True
+    states = list(delta_states(trace["states"]))
+    return {**trace, "#meta": meta, "states": states}
+
+
+def delta_decode(trace):
+    """
+    Return the Json object of an ITFTrace returned by `delta_encode`, with
+    full states. Traces without `"delta": true` in their `#meta` are returned
+    as they are.
+    """
+    meta = trace.get("#meta")
+    if not (meta and meta.get("delta")):
+        return trace
+    meta = {k: v for k, v in meta.items() if k != "delta"} or None
+    states = list(undelta_states(trace["states"]))
+    return {**trace, "#meta": meta, "states": states}
+
+
+def delta_states(states):
+    """Yield the Json objects of `states`, with only their changed variables."""
+    previous = None
+    for state in states:
+        if previous is None:
+            yield state
+        else:
+            yield {
+                var: value
+                for var, value in state.items()
+                if var == "#meta" or not _same_json(previous.get(var, _MISSING), value)
+            }
+        previous = state
+
+
+def undelta_states(states):
+    """Yield the full Json objects of the states yielded by `delta_states`."""
+    previous = None
+    for state in states:
+        if previous is not None:
+            delta = state
+            state = {**previous, **delta}
+            if "#meta" not in delta:
+                state.pop("#meta", None)
+        previous = state
+        yield state
+
+
+_MISSING = object()
+
+
+def _same_json(a, b):
+    """Is `a == b`, also distinguishing `true` from `1` at any depth?"""
+    if a is b:
+        return True
+    if type(a) is not type(b):
+        return False
+    if type(a) is dict:
+        return a.keys() == b.keys() and all(_same_json(v, b[k]) for k, v in a.items())
+    if type(a) is list:
+        return len(a) == len(b) and all(map(_same_json, a, b))
+    return a == b
+
+
 def with_lists(trace: ITFTrace) -> ITFTrace:
     """
     Create a copy of the trace where lists take the place
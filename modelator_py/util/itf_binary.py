@@ -0,0 +1,370 @@
+"""
+Binary encoding of Informal Trace Format traces.
+
+Values are encoded as MessagePack (https://msgpack.org), with two extension
+types:
+
+    0: a reference to a string that was already written, the payload is the
+       big-endian index of the string, in order of appearance, among the
+       strings written in full
+    1: an int that does not fit in 64 bits, the payload is its decimal digits
+
+so repeated strings, such as variable names and record keys, are written once
+per encoded object. Objects can be concatenated, each with its own strings.
+"""
+import struct
+import typing
+
+from .informal_trace_format import (
+    ITFList,
+    ITFMap,
+    ITFRecord,
+    ITFSet,
+    ITFState,
+    ITFTrace,
+)
+
+# mypy: ignore-errors
+
+_STRING_REF = 0
+_BIGINT = 1
+
+
+def encode(value) -> bytes:
+    """
+    Return the binary encoding of `value`: the Json object of an ITF trace,
+    as returned by `JsonSerializer` or `tlc_itf`, or an ITF node, which is
+    encoded as its Json object.
+    """
+    encoder = _Encoder()
+    encoder.encode(value)
+    return bytes(encoder.out)
+
+
+def decode(data: bytes):
+    """Return the Json object of the binary encoded `data`."""
+    decoder = _Decoder(data)
+    value = decoder.decode()
+    if decoder.pos != len(data):
+        raise Exception(f"{len(data) - decoder.pos} bytes after the encoded value")
+    return value
+
+
+def decode_all(data: bytes) -> typing.Iterator:
+    """Yield the Json object of each of the concatenated encoded objects."""
+    pos = 0
+    while pos < len(data):
+        decoder = _Decoder(data, pos)
+        yield decoder.decode()
+        pos = decoder.pos
+
+
+class ITFBinaryWriter:
+    """
+    Writes the Json objects of ITF traces to the binary file object `fd`, as
+    `ITFJsonWriter` writes them as Json: with `lines=None`, `close` writes the
+    encoding of `{"traces": [...]}`; with `lines="trace"` or `lines="state"`,
+    each trace or state is encoded as soon as it is written, and the encoded
+    objects are concatenated (see `decode_all`). The `#meta` of the states
+    has the same keys as with `ITFJsonWriter`.
+    """
+
+    def __init__(self, fd, *, lines=None):
+        if lines not in {None, "trace", "state"}:
+            raise Exception(f"lines should be None, 'trace' or 'state', got {lines=}")
+        self.fd = fd
+        self.lines = lines
+        self._traces = []
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *args):
+        if exc_type is None:
+            self.close()
+
+    def write_trace(self, trace: typing.Dict):
+        if self.lines is None:
+            self._traces.append(trace)
+            return
+        if self.lines == "trace":
+            self.fd.write(encode(trace))
+        else:
+            trace_meta = trace.get("#meta")
+            for i, state in enumerate(trace["states"]):
+                meta = {"trace": len(self._traces), "index": i}
+                if trace_meta and trace_meta.get("delta"):
+                    meta["delta"] = True
+                self.fd.write(encode({"#meta": meta, **state}))
+            # only the number of traces is needed
+            self._traces.append(None)
+        self.fd.flush()
+
+    def close(self):
+        """Write the traces, if `lines` is None. Does not close `fd`."""
+        if self._closed:
+            return
+        self._closed = True
+        if self.lines is None:
+            self.fd.write(encode({"traces": self._traces}))
+            self.fd.flush()
+
+
+class _Encoder:
+    def __init__(self):
+        self.out = bytearray()
+        self.strings = dict()
+        self.written = 0
+        self.memo = dict()
+        self.methods = {
+            type(None): self.encode_none,
+            bool: self.encode_bool,
+            int: self.encode_int,
+            str: self.encode_str,
+            list: self.encode_list,
+            tuple: self.encode_list,
+            dict: self.encode_dict,
+            ITFRecord: self.encode_record,
+            ITFList: self.encode_itf_list,
+            ITFSet: self.encode_set,
+            ITFMap: self.encode_map,
+            ITFState: self.encode_state,
+            ITFTrace: self.encode_trace,
+        }
+
+    def encode(self, value):
+        method = self.methods.get(type(value))
+        if method is None:
+            raise Exception(f"cannot encode {type(value).__name__} values")
+        method(value)
+
+    def encode_none(self, value):
+        self.out.append(0xC0)
+
+    def encode_bool(self, value):
+        self.out.append(0xC3 if value else 0xC2)
+
+    def encode_int(self, value):
+        out = self.out
+        if 0 <= value < 0x80:
+            out.append(value)
+        elif -0x20 <= value < 0:
+            out.append(value & 0xFF)
+        elif 0 <= value < 1 << 64:
+            if value < 1 << 8:
+                out += struct.pack(">BB", 0xCC, value)
+            elif value < 1 << 16:
+                out += struct.pack(">BH", 0xCD, value)
+            elif value < 1 << 32:
+                out += struct.pack(">BI", 0xCE, value)
+            else:
+                out += struct.pack(">BQ", 0xCF, value)
+        elif -(1 << 63) <= value < 0:
+            if -(1 << 7) <= value:
+                out += struct.pack(">Bb", 0xD0, value)
+            elif -(1 << 15) <= value:
+                out += struct.pack(">Bh", 0xD1, value)
+            elif -(1 << 31) <= value:
+                out += struct.pack(">Bi", 0xD2, value)
+            else:
+                out += struct.pack(">Bq", 0xD3, value)
+        else:
+            self.encode_ext(_BIGINT, str(value).encode())
+
+    def encode_str(self, value):
+        data = value.encode()
+        n = len(data)
+        index = self.strings.get(value)
+        if index is not None:
+            # a reference takes 3 to 6 bytes, a string at least n + 1
+            size = 1 if index < 1 << 8 else 2 if index < 1 << 16 else 4
+            if size + 2 < n + 1:
+                self.encode_ext(_STRING_REF, index.to_bytes(size, "big"))
+                return
+        if index is None:
+            self.strings[value] = self.written
+        self.written += 1
+        out = self.out
+        if n < 32:
+            out.append(0xA0 | n)
+        elif n < 1 << 8:
+            out += struct.pack(">BB", 0xD9, n)
+        elif n < 1 << 16:
+            out += struct.pack(">BH", 0xDA, n)
+        else:
+            out += struct.pack(">BI", 0xDB, n)
+        out += data
+
+    def encode_ext(self, code, data):
+        out = self.out
+        n = len(data)
+        fixext = {1: 0xD4, 2: 0xD5, 4: 0xD6, 8: 0xD7, 16: 0xD8}.get(n)
+        if fixext is not None:
+            out += struct.pack(">BB", fixext, code)
+        elif n < 1 << 8:
+            out += struct.pack(">BBB", 0xC7, n, code)
+        elif n < 1 << 16:
+            out += struct.pack(">BHB", 0xC8, n, code)
+        else:
+            out += struct.pack(">BIB", 0xC9, n, code)
+        out += data
+
+    def encode_array_header(self, n):
+        if n < 16:
+            self.out.append(0x90 | n)
+        elif n < 1 << 16:
+            self.out += struct.pack(">BH", 0xDC, n)
+        else:
+            self.out += struct.pack(">BI", 0xDD, n)
+
+    def encode_map_header(self, n):
+        if n < 16:
+            self.out.append(0x80 | n)
+        elif n < 1 << 16:
+            self.out += struct.pack(">BH", 0xDE, n)
+        else:
+            self.out += struct.pack(">BI", 0xDF, n)
+
+    def encode_list(self, value):
+        self.encode_array_header(len(value))
+        for e in value:
+            self.encode(e)
+
+    def encode_dict(self, value):
+        # Json objects that occur more than once, such as the states shared by
+        # the traces of `tlc_itf`, are encoded once and their bytes copied.
+        memo = self.memo.get(id(value))
+        if memo is not None:
+            _, data, written = memo
+            self.out += data
+            self.written += written
+            return
+        start = len(self.out)
+        written = self.written
+        self.encode_map_header(len(value))
+        for k, v in value.items():
+            self.encode(k)
+            self.encode(v)
+        data = bytes(self.out[start:])
+        self.memo[id(value)] = (value, data, self.written - written)
+
+    def encode_record(self, node):
+        self.encode_dict(node.elements)
+
+    def encode_itf_list(self, node):
+        self.encode_list(node.elements)
+
+    def encode_set(self, node):
+        self.encode_map_header(1)
+        self.encode_str("#set")
+        self.encode_list(node.elements)
+
+    def encode_map(self, node):
+        self.encode_map_header(1)
+        self.encode_str("#map")
+        self.encode_list(node.elements)
+
+    def encode_state(self, node):
+        self.encode_dict(node.var_value_map)
+
+    def encode_trace(self, node):
+        self.encode_dict({"#meta": node.meta, "vars": node.vars, "states": node.states})
+
+
+class _Decoder:
+    def __init__(self, data, pos=0):
+        self.data = data
+        self.pos = pos
+        self.strings = []
+
+    def decode(self):
+        b = self.read_byte()
+        if b < 0x80:
+            return b
+        if b < 0x90:
+            return self.decode_map(b & 0x0F)
+        if b < 0xA0:
+            return self.decode_array(b & 0x0F)
+        if b < 0xC0:
+            return self.decode_str(b & 0x1F)
+        if 0xE0 <= b:
+            return b - 0x100
+        if b == 0xC0:
+            return None
+        if b == 0xC2:
+            return False
+        if b == 0xC3:
+            return True
+        if b in _FORMATS:
+            return _FORMATS[b](self)
+        raise Exception(f"unsupported type byte {b:#x} at {self.pos - 1}")
+
+    def read_byte(self):
+        try:
+            b = self.data[self.pos]
+        except IndexError:
+            raise Exception("unexpected end of the encoded data") from None
+        self.pos += 1
+        return b
+
+    def read(self, n):
+        if len(self.data) < self.pos + n:
+            raise Exception("unexpected end of the encoded data")
+        data = self.data[self.pos : self.pos + n]
+        self.pos += n
+        return data
+
+    def unpack(self, fmt):
+        return struct.unpack(fmt, self.read(struct.calcsize(fmt)))[0]
+
+    def decode_str(self, n):
+        value = self.read(n).decode()
+        self.strings.append(value)
+        return value
+
+    def decode_array(self, n):
+        return [self.decode() for _ in range(n)]
+
+    def decode_map(self, n):
+        value = dict()
+        for _ in range(n):
+            k = self.decode()
+            value[k] = self.decode()
+        return value
+
+    def decode_ext(self, n):
+        code = self.read_byte()
+        data = self.read(n)
+        if code == _STRING_REF:
+            return self.strings[int.from_bytes(data, "big")]
+        if code == _BIGINT:
+            return int(data.decode())
+        raise Exception(f"unsupported extension type {code}")
+
+
+_FORMATS = {
+    0xCC: lambda d: d.unpack(">B"),
+    0xCD: lambda d: d.unpack(">H"),
+    0xCE: lambda d: d.unpack(">I"),
+    0xCF: lambda d: d.unpack(">Q"),
+    0xD0: lambda d: d.unpack(">b"),
+    0xD1: lambda d: d.unpack(">h"),
+    0xD2: lambda d: d.unpack(">i"),
+    0xD3: lambda d: d.unpack(">q"),
+    0xD9: lambda d: d.decode_str(d.unpack(">B")),
+    0xDA: lambda d: d.decode_str(d.unpack(">H")),
+    0xDB: lambda d: d.decode_str(d.unpack(">I")),
+    0xDC: lambda d: d.decode_array(d.unpack(">H")),
+    0xDD: lambda d: d.decode_array(d.unpack(">I")),
+    0xDE: lambda d: d.decode_map(d.unpack(">H")),
+    0xDF: lambda d: d.decode_map(d.unpack(">I")),
+    0xD4: lambda d: d.decode_ext(1),
+    0xD5: lambda d: d.decode_ext(2),
+    0xD6: lambda d: d.decode_ext(4),
+    0xD7: lambda d: d.decode_ext(8),
+    0xD8: lambda d: d.decode_ext(16),
+    0xC7: lambda d: d.decode_ext(d.unpack(">B")),
+    0xC8: lambda d: d.decode_ext(d.unpack(">H")),
+    0xC9: lambda d: d.decode_ext(d.unpack(">I")),
+}
@@ -0,0 +1,161 @@
+"""
+Columnar view of Informal Trace Format traces.
+"""
+import array
+import itertools
+import operator
+import typing
+
+from .informal_trace_format import ITFState, ITFTrace
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional, see ITFColumns
+    numpy = None
+
+# mypy: ignore-errors
+
+# The NumPy dtype of the columns of each typecode.
+_DTYPES = {"b": "int8", "q": "int64"}
+
+_COMPARISONS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+def _column(values: typing.List):
+    """
+    Return the values of a variable as an array of typecode "b" if they are all
+    bools, of typecode "q" if they are all ints that fit in 64 bits, else as
+    the list `values`.
+    """
+    if not values:
+        return values
+    if all(type(v) is bool for v in values):
+        return array.array("b", values)
+    if all(type(v) is int for v in values):
+        try:
+            return array.array("q", values)
+        except OverflowError:
+            return values
+    return values
+
+
+class ITFColumns:
+    """
+    The states of an ITF trace as a column per variable: `columns[var][i]` is
+    the value of `var` in the i-th state.
+
+    Columns of bools and of ints are `array.array`s of typecode "b" and "q",
+    stored contiguously; they support the buffer protocol, so e.g.
+    `numpy.asarray(columns["x"])` views them without copying. Columns of other
+    values are lists of ITF values.
+
+    If NumPy is installed, `where` and `take` are vectorized on the columns of
+    bools and ints. Without NumPy, and for the other columns, they loop over
+    the values in Python.
+    """
+
+    __slots__ = ("meta", "vars", "columns", "length")
+
+    def __init__(self, vars_, columns, length, meta=None):
+        self.meta = meta
+        self.vars = vars_
+        self.columns = columns
+        self.length = length
+
+    @classmethod
+    def from_states(cls, states: typing.Iterable[ITFState], vars_=None, meta=None):
+        """
+        Return the columns of the ITFStates `states`, which may be an iterator,
+        such as `ITFReader.states()`. If `vars_` is None, the variables are
+        those of the first state.
+        """
+        values = None
+        length = 0
+        for state in states:
+            if values is None:
+                if vars_ is None:
+                    vars_ = list(state.var_value_map)
+                values = {var: [] for var in vars_}
+            for var, column in values.items():
+                column.append(state.var_value_map[var])
+            length += 1
+        if values is None:
+            values = {var: [] for var in vars_ or []}
+        columns = {var: _column(column) for var, column in values.items()}
+        return cls(list(values), columns, length, meta)
+
+    @classmethod
+    def from_trace(cls, trace: ITFTrace):
+        return cls.from_states(trace.states, trace.vars, trace.meta)
+
+    def to_trace(self) -> ITFTrace:
+        values = {var: self._values(var) for var in self.vars}
+        states = [
+            ITFState({var: values[var][i] for var in self.vars})
+            for i in range(self.length)
+        ]
+        return ITFTrace(self.vars, states, self.meta)
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, var: str):
+        return self.columns[var]
+
+    def where(self, var: str, op: str, value) -> typing.List[int]:
+        """
+        Return the indices of the states where `var <op> value` holds, where
+        `op` is one of `<`, `<=`, `==`, `!=`, `>`, `>=`; e.g.
+        `columns.where("x", ">", 5)`.
+        """
+        if op not in _COMPARISONS:
+            raise Exception(f"op should be one of {list(_COMPARISONS)}, got {op=}")
+        column = self.columns[var]
+        if _vectorized(column) and type(value) in (bool, int, float):
+            try:
+                holds = _COMPARISONS[op](_ndarray(column), value)
+            except OverflowError:
+                # an int that does not fit in 64 bits
+                pass
+            else:
+                return numpy.flatnonzero(holds).tolist()
+        holds = map(_COMPARISONS[op], column, itertools.repeat(value))
+        return list(itertools.compress(range(self.length), holds))
+
+    def take(self, indices: typing.Iterable[int]) -> "ITFColumns":
+        """Return the columns of the states at `indices`, e.g. of `where`."""
+        indices = list(indices)
+        columns = dict()
+        for var, column in self.columns.items():
+            if _vectorized(column):
+                taken = _ndarray(column)[indices]
+                columns[var] = array.array(column.typecode, taken.tobytes())
+            elif isinstance(column, array.array):
+                columns[var] = array.array(
+                    column.typecode, map(column.__getitem__, indices)
+                )
+            else:
+                columns[var] = [column[i] for i in indices]
+        return ITFColumns(self.vars, columns, len(indices), self.meta)
+
+    def _values(self, var):
+        column = self.columns[var]
+        if isinstance(column, array.array) and column.typecode == "b":
+            return [bool(v) for v in column]
+        return column
+
+
+def _vectorized(column) -> bool:
+    return numpy is not None and isinstance(column, array.array)
+
+
+def _ndarray(column):
+    """Return a NumPy array viewing the `array.array` `column`, without copy."""
+    return numpy.frombuffer(column, dtype=_DTYPES[column.typecode])
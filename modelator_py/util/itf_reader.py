@@ -0,0 +1,157 @@
+"""
+Incremental reader of Informal Trace Format Json files.
+"""
+import json
+import typing
+
+from .informal_trace_format import (
+    Interner,
+    ITFState,
+    ITFTrace,
+    from_json,
+    state_from_json,
+    undelta_states,
+)
+
+# mypy: ignore-errors
+
+_WHITESPACE = " \t\n\r"
+
+
+class ITFReader:
+    """
+    Reads the ITF trace in the Json file object `fd`, such as the `.itf.json`
+    files written by Apalache, reading `fd` in chunks of `chunk_size`
+    characters so that only one state is in memory at a time.
+
+    The states are iterated, once, with `raw_states` (Json objects), `states`
+    (ITFStates) or `values` (the ITF values of one variable). The `meta`,
+    `params`, `vars` and `loop` fields of the trace are set when they have
+    been read; Json files written with sorted keys have `vars` after `states`.
+
+    The states of delta encoded traces (see `delta_encode`) are decoded, if
+    the `#meta` of the trace is before its `states`, as with sorted keys.
+    """
+
+    def __init__(self, fd, chunk_size=1 << 16):
+        self.fd = fd
+        self.chunk_size = chunk_size
+        self.meta = None
+        self.params = None
+        self.vars = None
+        self.loop = None
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._started = False
+
+    def raw_states(self) -> typing.Iterator[typing.Dict]:
+        """Yield the Json object of each state of the trace."""
+        if self._started:
+            raise Exception("the states of an ITFReader can only be read once")
+        self._started = True
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._decode()
+            self._expect(":")
+            if key == "states":
+                if self.meta and self.meta.get("delta"):
+                    yield from undelta_states(self._array())
+                else:
+                    yield from self._array()
+            else:
+                self._field(key, self._decode())
+            if self._peek() == "}":
+                self._pos += 1
+                return
+            self._expect(",")
+
+    def states(self) -> typing.Iterator[ITFState]:
+        """Yield the ITFState of each state of the trace."""
+        for state in self.raw_states():
+            yield state_from_json(state)
+
+    def values(self, var: str) -> typing.Iterator:
+        """
+        Yield the ITF value of variable `var` in each state of the trace,
+        without building the values of the other variables.
+        """
+        for state in self.raw_states():
+            yield from_json(state[var])
+
+    def trace(self, intern=True) -> ITFTrace:
+        """
+        Read the whole trace. If `intern`, equal values are shared between the
+        states (see `Interner`), so values that do not change between states
+        are stored once.
+        """
+        states = self.states()
+        if intern:
+            states = map(Interner().visit, states)
+        states = list(states)
+        return ITFTrace(self.vars, states, self.meta)
+
+    def _field(self, key, value):
+        if key == "#meta":
+            self.meta = value
+        elif key in {"params", "vars", "loop"}:
+            setattr(self, key, value)
+
+    def _array(self):
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._decode()
+            if self._peek() == "]":
+                self._pos += 1
+                return
+            self._expect(",")
+
+    def _fill(self, size):
+        chunk = self.fd.read(size)
+        if not chunk:
+            self._eof = True
+        self._buf = self._buf[self._pos :] + chunk
+        self._pos = 0
+
+    def _peek(self):
+        """Skip whitespace, and return the next character ("" at the end)."""
+        while True:
+            buf = self._buf
+            pos = self._pos
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buf) or self._eof:
+                return buf[pos : pos + 1]
+            self._fill(self.chunk_size)
+
+    def _expect(self, char):
+        found = self._peek()
+        if found != char:
+            raise Exception(f"expected {char!r} in ITF Json, found {found!r}")
+        self._pos += 1
+
+    def _decode(self):
+        """Decode the next Json value, reading more of `fd` until it is whole."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            else:
+                # a number at the end of the buffer may continue in `fd`
+                if end < len(self._buf) or self._eof:
+                    self._pos = end
+                    return value
+            # grow the buffer geometrically, so large values are decoded
+            # a bounded number of times
+            self._fill(max(self.chunk_size, len(self._buf) - self._pos))
@@ -0,0 +1,132 @@
+"""
+Incremental writer of the Json objects of Informal Trace Format traces.
+"""
+import json
+import typing
+
+# mypy: ignore-errors
+
+
+class ITFJsonWriter:
+    """
+    Writes the Json objects of ITF traces (as returned by `JsonSerializer` or
+    `tlc_itf`) to the file object `fd` as they are produced, without holding
+    the whole output in memory.
+
+    With `lines=None`, writes the document `{"traces": [...]}`, indented by
+    `indent` spaces as `json.dumps(..., indent=indent, sort_keys=True)` would,
+    or compact, without whitespace, if `indent` is None. `close` ends the
+    document.
+
+    With `lines="trace"`, writes one trace per line (JSON Lines). With
+    `lines="state"`, writes one state per line, where the `#meta` of each state
+    is `{"trace": <index of the trace>, "index": <index of the state>}`, with
+    `"delta": true` if the trace is delta encoded (see
+    `informal_trace_format.delta_encode`); `undelta_states` restores the full
+    states of each trace.
+
+    Traces are written with `write_trace`, or state by state with
+    `begin_trace`, `write_state` and `end_trace`.
+    """
+
+    def __init__(self, fd, *, indent=4, lines=None):
+        if lines not in {None, "trace", "state"}:
+            raise Exception(f"lines should be None, 'trace' or 'state', got {lines=}")
+        self.fd = fd
+        self.indent = indent
+        self.lines = lines
+        self._started = False
+        self._closed = False
+        self._traces = 0
+        self._meta = None
+        self._states = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *args):
+        if exc_type is None:
+            self.close()
+
+    def write_trace(self, trace: typing.Dict):
+        self.begin_trace(trace.get("#meta"))
+        for state in trace["states"]:
+            self.write_state(state)
+        self.end_trace(trace["vars"])
+
+    def begin_trace(self, meta=None):
+        self._meta = meta
+        self._states = 0
+        if self.lines == "trace":
+            self._states = []
+        elif self.lines is None:
+            self._start()
+            if 0 < self._traces:
+                self.fd.write(",")
+            self.fd.write(self._newline(2) + "{" + self._newline(3))
+            self.fd.write(self._key("#meta") + self._dumps(meta, 3) + ",")
+            self.fd.write(self._newline(3) + self._key("states") + "[")
+
+    def write_state(self, state: typing.Dict):
+        if self.lines == "trace":
+            self._states.append(state)
+            return
+        if self.lines == "state":
+            meta = {"trace": self._traces, "index": self._states}
+            if self._meta and self._meta.get("delta"):
+                meta["delta"] = True
+            self.fd.write(self._dumps({"#meta": meta, **state}, 0) + "\n")
+            self.fd.flush()
+        else:
+            if 0 < self._states:
+                self.fd.write(",")
+            self.fd.write(self._newline(4) + self._dumps(state, 4))
+        self._states += 1
+
+    def end_trace(self, vars: typing.List[str]):
+        if self.lines == "trace":
+            trace = {"#meta": self._meta, "states": self._states, "vars": vars}
+            self.fd.write(self._dumps(trace, 0) + "\n")
+        elif self.lines is None:
+            if 0 < self._states:
+                self.fd.write(self._newline(3))
+            self.fd.write("]," + self._newline(3) + self._key("vars"))
+            self.fd.write(self._dumps(vars, 3) + self._newline(2) + "}")
+        self.fd.flush()
+        self._traces += 1
+        self._meta = None
+        self._states = None
+
+    def close(self):
+        """End the document. Does not close `fd`."""
+        if self._closed:
+            return
+        self._closed = True
+        if self.lines is None:
+            self._start()
+            if 0 < self._traces:
+                self.fd.write(self._newline(1))
+            self.fd.write("]" + self._newline(0) + "}\n")
+            self.fd.flush()
+
+    def _start(self):
+        if not self._started:
+            self._started = True
+            self.fd.write("{" + self._newline(1) + self._key("traces") + "[")
+
+    def _key(self, key):
+        return json.dumps(key) + (":" if self.indent is None else ": ")
+
+    def _newline(self, level):
+        if self.indent is None:
+            return ""
+        return "\n" + " " * (self.indent * level)
+
+    def _dumps(self, obj, level):
+        if self.lines is not None:
+            return json.dumps(obj, sort_keys=True)
+        if self.indent is None:
+            return json.dumps(obj, sort_keys=True, separators=(",", ":"))
+        return json.dumps(obj, indent=self.indent, sort_keys=True).replace(
+            "\n", self._newline(level)
+        )
@@ -1,4 +1,4 @@
 """TLA+ parser and syntax tree."""
-from .parser import parse, parse_expr
+from .parser import ParserContext, parse, parse_expr
 
-__all__ = ["parse", "parse_expr"]
+__all__ = ["ParserContext", "parse", "parse_expr"]
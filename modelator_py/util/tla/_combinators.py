@@ -10,6 +10,7 @@
 from __future__ import absolute_import, division
 
 import collections.abc
+import contextvars
 import copy
 import functools
 import logging
@@ -432,6 +433,45 @@ def thunk(apf):
     return Prs(f)
 
 
+# Parsers built by the functions decorated with `rule`,
+# keyed by function and arguments. `parser.ParserContext`
+# binds one `dict` for each family of syntax tree classes.
+current_rules = contextvars.ContextVar("rules", default=None)
+
+
+def rule(build):
+    """Decorate the generator function `build` of a grammar rule.
+
+    Like a `lazy` rule of the OCaml parser, the parser of the rule
+    is built when first used, by `next(build(*args))`. It is then
+    reused for the same `args` while the same `dict` is bound to
+    `current_rules`, instead of being built again at each use.
+
+    So the parsers that `build` returns must not contain values
+    that parsing modifies, such as syntax tree nodes: these are
+    to be created when parsing, e.g., with `apply`.
+    """
+
+    @functools.wraps(build)
+    def f(*args):
+        return functools.partial(f_rule, build, args)
+
+    return f
+
+
+def f_rule(build, args, pst):
+    rules = current_rules.get()
+    if rules is None:
+        ap = next(build(*args))
+    else:
+        key = (build, args)
+        ap = rules.get(key)
+        if ap is None:
+            ap = next(build(*args))
+            rules[key] = ap
+    return exec_(ap, pst)
+
+
 # table of translation
 #
 # >>+  shift_plus
@@ -850,9 +890,9 @@ parsers_memo = dict()  # type: ignore
 
 def f_choice_iter(alternatives, pst):
     at_least_one = False
-    for alt in alternatives():
-        if isinstance(alt, tuple):
-            start, fap = alt
+    for item in alternatives.items():
+        start, fap = item[0], item[1]
+        if start is not None:
             if len(pst.source) > 0 and (
                 (
                     not isinstance(start[0], intf.Token_)
@@ -864,9 +904,7 @@ def f_choice_iter(alternatives, pst):
                 )
             ):
                 continue
-            ap = fap()
-        else:
-            ap = alt
+        ap = alternatives.built(item)
         at_least_one = True
         arep = exec_(ap, pst)
         if not isinstance(arep.res, Failed) or not isinstance(
@@ -874,19 +912,62 @@ def f_choice_iter(alternatives, pst):
         ):
             break
     if not at_least_one:
-        ap = fap()
+        ap = alternatives.built(item)
         arep = exec_(ap, pst)
         # res = Failed(Unexpected(None), Backtrack(), None)
         # arep = Reply(res=res, loc=pst.lastpos)
     return arep
 
 
+class Alternatives:
+    """Alternatives of `choice_iter`, built when first tried.
+
+    The generator function `alternatives` yields parsers,
+    and pairs `(start, fap)` of a tuple `start` of token forms
+    or classes that the alternative starts with, and a function
+    `fap` that returns the parser of the alternative.
+    """
+
+    def __init__(self, alternatives):
+        self.alternatives = alternatives
+        self._items = None
+
+    def items(self):
+        """Return `list` of `[start, fap, ap]`.
+
+        `start` is `None` for parsers, and `ap` is
+        the parser, or `None` if not yet built.
+        """
+        items = self._items
+        if items is None:
+            items = list()
+            for alt in self.alternatives():
+                if isinstance(alt, tuple):
+                    start, fap = alt
+                    items.append([start, fap, None])
+                else:
+                    items.append([None, None, alt])
+            self._items = items
+        return items
+
+    def built(self, item):
+        """Return the parser of `item`, building it if needed."""
+        ap = item[2]
+        if ap is None:
+            ap = item[1]()
+            item[2] = ap
+        return ap
+
+
 # return Prs(f)
 
 
 def choice_iter(alternatives):
-    """Choice with lookahead 1 before building parser."""
-    return functools.partial(f_choice_iter, alternatives)
+    """Choice with lookahead 1 before building parser.
+
+    Each alternative is built when first tried, and reused.
+    """
+    return functools.partial(f_choice_iter, Alternatives(alternatives))
 
 
 #   let rec alt = function
@@ -1013,7 +1094,7 @@ def sep1(sp, ap):
 #     sep1 sp ap <|> succeed []
 def sep(sp, ap):
     """List of none or more `ap`, with separator `sp`."""
-    return sep1(sp, ap) << or_ >> succeed(list())
+    return sep1(sp, ap) << or_ >> (succeed(None) << apply >> (lambda _: list()))
 
 
 #   (* token parsers *)
@@ -0,0 +1,23 @@
+"""Syntax tree classes used by the parser modules."""
+# The parser modules create and inspect syntax tree nodes through `nodes`,
+# which looks up the classes bound to `current_nodes` in the current
+# `contextvars` context. Each thread has its own context, so threads
+# can parse at the same time with different syntax tree classes.
+import contextvars
+
+from .ast import Nodes
+
+current_nodes = contextvars.ContextVar("nodes", default=Nodes)
+
+
+class _CurrentNodes:
+    """Syntax tree classes of the current context."""
+
+    def __getattr__(self, name):
+        return getattr(current_nodes.get(), name)
+
+    def __repr__(self):
+        return f"_CurrentNodes({current_nodes.get()!r})"
+
+
+nodes = _CurrentNodes()
@@ -7,6 +7,7 @@
 #
 # <https://github.com/tlaplus/tlapm/blob/main/src/expr/e_parser.ml>
 #
+import contextvars
 import functools
 
 from . import _combinators as pco
@@ -29,6 +30,7 @@ from ._combinators import (
     lookahead,
     optional,
     return_,
+    rule,
     second,
     second_commit,
     sep,
@@ -43,7 +45,7 @@ from ._combinators import (
     use,
     using,
 )
-from .ast import Nodes as tla_ast
+from ._context import nodes as tla_ast
 
 
 # open Ext
@@ -159,13 +161,17 @@ def postfix(op, prec):
 #               end
 #         end
 #     end Op.optable ;
-def _generate_fixities():
+def _generate_fixities(optable=None, nodes=None):
+    if optable is None:
+        optable = _optable.optable
+    if nodes is None:
+        nodes = tla_ast
     fixities = dict()
-    for form, alternatives in _optable.optable.items():
+    for form, alternatives in optable.items():
         fixities.setdefault(form, list())
         for top in alternatives:
             if top.defn is None:
-                defn = tla_ast.Opaque(top.name)
+                defn = nodes.Opaque(top.name)
             else:
                 # defn = tla_ast.Internal(top.defn)
                 defn = top.defn
@@ -194,6 +200,25 @@ def _generate_fixities():
 #     Hashtbl.replace fixities "\\times" bin_prod ;
 #     fixities
 fixities = _generate_fixities()
+# the fixities that the parser uses, see `parser.ParserContext`
+current_fixities = contextvars.ContextVar("fixities", default=fixities)
+# fixities generated by `fixities_of`, keyed by syntax tree classes
+_fixities = {_optable.nodes: fixities}
+
+
+def fixities_of(nodes):
+    """Return fixities of the operators, using the classes of `nodes`.
+
+    The fixities are generated once for each `nodes`,
+    and must not be modified.
+    """
+    fixities_ = _fixities.get(nodes)
+    if fixities_ is None:
+        fixities_ = _generate_fixities(_optable.optable_of(nodes), nodes)
+        _fixities[nodes] = fixities_
+    return fixities_
+
+
 #
 # let distinct =
 #   let module S = Set.Make (String) in
@@ -215,6 +240,7 @@ def hint():
 # let rec expr b = lazy begin
 #   resolve (expr_or_op b);
 # end
+@rule
 def expr(b):
     while True:
         f = functools.partial(expr_or_op, b)
@@ -244,7 +270,7 @@ def expr(b):
 #             in
 #               choice (List.map non_test ops @ [return ops pts])
 def choice_fix_operators(b, p, pts):
-    ops = fixities[p]
+    ops = current_fixities.get()[p]
     assert isinstance(ops, list), ops
     if not ops:
         return fail(f"unknown operator {p}")
@@ -432,6 +458,7 @@ def nonfix_operators(b, is_start):
 
 
 # and expr_or_op b is_start =
+@rule
 def expr_or_op(b, is_start):
     def choices():
         #   choice [
@@ -696,6 +723,7 @@ def expr_or_op(b, is_start):
 #     <$> (fun (l, ns) -> Nlabel (l, ns))
 #   end
 # end
+@rule
 def label():
     while True:
         yield intf.locate(
@@ -709,7 +737,7 @@ def label():
                     >> sep1(intf.punct(","), intf.locate(intf.anyident()))
                     << first
                     >> intf.punct(")"),
-                    succeed(list()),
+                    succeed(None) << apply >> (lambda _: list()),
                 ]
             )
             << first
@@ -724,6 +752,7 @@ def label():
 #       <<< punct ")"
 #   end <$> Option.default []
 # end
+@rule
 def opargs(b):
     while True:
         yield optional(
@@ -738,6 +767,7 @@ def opargs(b):
 # and subref b = lazy begin
 #   punct "!" >*> sep1 (punct "!") (use (sel b))
 # end
+@rule
 def subref(b):
     while True:
         yield (intf.punct("!") << second_commit >> sep1(intf.punct("!"), use(sel(b))))
@@ -779,6 +809,7 @@ def apply_sel(l_args):
 #     punct "@" <!> Sel_at ;
 #   ]
 # end
+@rule
 def sel(b):
     def choices():
         # RULE: (anyident | anyop) ('(' oparg (',' oparg)* ')')?
@@ -823,19 +854,20 @@ def sel(b):
         yield intf.nat() << apply >> (lambda n: tla_ast.SelNum(n))
 
         # RULE: '<<'
-        yield intf.punct("<<") << bang >> tla_ast.SelLeft()
+        yield intf.punct("<<") << apply >> (lambda _: tla_ast.SelLeft())
         # RULE: '>>'
-        yield intf.punct(">>") << bang >> tla_ast.SelRight()
+        yield intf.punct(">>") << apply >> (lambda _: tla_ast.SelRight())
         # RULE: ':'
-        yield intf.punct(":") << bang >> tla_ast.SelDown()
+        yield intf.punct(":") << apply >> (lambda _: tla_ast.SelDown())
         # RULE: '@'
-        yield intf.punct("@") << bang >> tla_ast.SelAt()
+        yield intf.punct("@") << apply >> (lambda _: tla_ast.SelAt())
 
     while True:
         yield choice_iter(choices)
 
 
 # and complex_expr b = lazy begin
+@rule
 def complex_expr(b):
     def choices():
         #   choice [
@@ -912,8 +944,8 @@ def complex_expr(b):
                 intf.locate(
                     choice(
                         [
-                            intf.punct("\\A") << bang >> tla_ast.Forall(),
-                            intf.punct("\\E") << bang >> tla_ast.Exists(),
+                            intf.punct("\\A") << apply >> (lambda _: tla_ast.Forall()),
+                            intf.punct("\\E") << apply >> (lambda _: tla_ast.Exists()),
                         ]
                     )
                     << times2
@@ -953,8 +985,8 @@ def complex_expr(b):
                 intf.locate(
                     choice(
                         [
-                            intf.punct("\\AA") << bang >> tla_ast.Forall(),
-                            intf.punct("\\EE") << bang >> tla_ast.Exists(),
+                            intf.punct("\\AA") << apply >> (lambda _: tla_ast.Forall()),
+                            intf.punct("\\EE") << apply >> (lambda _: tla_ast.Exists()),
                         ]
                     )
                     << times2
@@ -1111,6 +1143,7 @@ def complex_expr(b):
 #   punct "!" >>> use (trail b) <<< infix "=" <*> (use (expr true))
 #   (* choice [ attempt (punct "@" <!> At true);  use expr ] *)
 # end
+@rule
 def exspec(b):
     while True:
         yield (
@@ -1136,6 +1169,7 @@ def exspec(b):
 #                   <$> (fun e -> Except_apply e) ;
 #                 ]
 #               end
+@rule
 def trail(b):
     while True:
         yield star1(
@@ -1179,11 +1213,11 @@ def apply_tuple(b, es):
                 >> use(sub_expr(b))
                 << apply
                 >> (lambda v: tla_ast.Sub(tla_ast.DiamondOp(), es[0], v)),
-                intf.punct(">>") << bang >> tla_ast.Tuple(es),
+                intf.punct(">>") << apply >> (lambda _: tla_ast.Tuple(es)),
             ]
         )
     else:
-        return intf.punct(">>") << bang >> tla_ast.Tuple(es)
+        return intf.punct(">>") << apply >> (lambda _: tla_ast.Tuple(es))
 
 
 #       <$> (fun (v, e) ->
@@ -1272,6 +1306,7 @@ def apply_strong_fair(v_e):
 
 
 # and atomic_expr b = lazy begin
+@rule
 def atomic_expr(b):
     def choices():
         #   choice [
@@ -1579,7 +1614,7 @@ def atomic_expr(b):
         #       punct "@" <!> (At b)
         #     end ;
         # '@'
-        yield intf.locate(intf.punct("@") << bang >> tla_ast.At(b))
+        yield intf.locate(intf.punct("@") << apply >> (lambda _: tla_ast.At(b)))
 
         #     use (reduced_expr b) ;
         yield use(reduced_expr(b))
@@ -1638,6 +1673,7 @@ def number_scan(form):
 #     (* locate (punct "@" <!> At) ; *)
 #   ]
 # end
+@rule
 def reduced_expr(b):
     def choices():
         # '(' expr ')'
@@ -1659,19 +1695,25 @@ def reduced_expr(b):
         yield intf.locate(intf.scan(number_scan))
         # 'TRUE'
         yield intf.locate(
-            intf.kwd("TRUE") << bang >> tla_ast.TRUE()  # tla_ast.Internal(
+            intf.kwd("TRUE") << apply >> (lambda _: tla_ast.TRUE())  # tla_ast.Internal(
         )
         # 'FALSE'
         yield intf.locate(
-            intf.kwd("FALSE") << bang >> tla_ast.FALSE()  # tla_ast.Internal(
+            intf.kwd("FALSE")
+            << apply
+            >> (lambda _: tla_ast.FALSE())  # tla_ast.Internal(
         )
         # 'BOOLEAN'
         yield intf.locate(
-            intf.kwd("BOOLEAN") << bang >> tla_ast.BOOLEAN()  # tla_ast.Internal(
+            intf.kwd("BOOLEAN")
+            << apply
+            >> (lambda _: tla_ast.BOOLEAN())  # tla_ast.Internal(
         )
         # 'STRING'
         yield intf.locate(
-            intf.kwd("STRING") << bang >> tla_ast.STRING()  # tla_ast.Internal(
+            intf.kwd("STRING")
+            << apply
+            >> (lambda _: tla_ast.STRING())  # tla_ast.Internal(
         )
 
     while True:
@@ -1703,6 +1745,7 @@ def apply_sub_expr(prs):
 #     use (atomic_expr b) ;
 #   ]
 # end
+@rule
 def sub_expr(b):
     while True:
         yield choice(
@@ -1756,6 +1799,7 @@ def bull_at(bull, where):
 #                | "\\/" -> List (Or, es)
 #                | _     -> List (And, es))
 # end
+@rule
 def bulleted_list(b):
     def f(op):
         if isinstance(op, tokens.OP) and op.string == "/\\":
@@ -1808,6 +1852,7 @@ def bulleted_list(b):
 #     punct "(" >>> use (operator b) <<< punct ")" ;
 #   ]
 # end
+@rule
 def operator(b):
     # <$> (fun (vs, e) -> Lambda (
     #                     List.map (fun v -> (v, Shape_expr)) vs,
@@ -1940,6 +1985,7 @@ def apply_bounds(bss):
 #       List.concat vss
 #   end
 # end
+@rule
 def bounds(b):
     # RULE: hint (',' hint)* '\\in' expr
     #           (hint (',' hint)* '\\in' expr)*
@@ -1977,6 +2023,7 @@ def apply_boundeds(bss):
 #       List.concat vss
 #   end
 # end
+@rule
 def boundeds(b):
     while True:
         yield sep1(
@@ -1993,6 +2040,7 @@ def boundeds(b):
 # and float =
 #   number <$> (fun (m, n) ->
 #                 float_of_string (Printf.sprintf "%s.%s0" m n))
+@rule
 def float_():
     while True:
         yield (
@@ -2005,6 +2053,7 @@ def float_():
 # and read_method_by = lazy begin
 #   ident "by" >>> use read_method_args <$> (fun l -> l)
 # end
+@rule
 def read_method_by():
     while True:
         yield (intf.ident("by") << second >> use(read_method_args()))
@@ -2018,6 +2067,7 @@ def read_method_by():
 # and read_new_method = lazy begin
 #   pragma (star (choice [use read_method_by; use read_method_set]))
 # end
+@rule
 def read_new_method():
     while True:
         yield intf.pragma(star(use(read_method_by())))
@@ -2026,6 +2076,7 @@ def read_new_method():
 # and read_method_args = lazy begin
 #     punct "(" >*> sep1 (punct ";") (use (read_method_arg)) <<< punct ")"
 # end
+@rule
 def read_method_args():
     while True:
         yield (
@@ -2040,6 +2091,7 @@ def read_method_args():
 # and read_method_arg = lazy begin
 #       hint <*> (punct ":" >*> use string_or_float_of_expr)
 # end
+@rule
 def read_method_arg():
     while True:
         yield (
@@ -2052,6 +2104,7 @@ def read_method_arg():
 # and string_val = lazy begin
 #   str <$> fun s -> Bstring s
 # end
+@rule
 def string_val():
     while True:
         yield (intf.str_() << apply >> (lambda s: tla_ast.Bstring(s)))
@@ -2060,6 +2113,7 @@ def string_val():
 # and float_val = lazy begin
 #   float <$> fun s -> Bfloat s
 # end
+@rule
 def float_val():
     while True:
         yield (float_() << apply >> (lambda s: tla_ast.Bfloat(s)))
@@ -2068,9 +2122,10 @@ def float_val():
 # and expr_def = lazy begin
 #    punct "@" <!> Bdef
 # end
+@rule
 def expr_def():
     while True:
-        yield intf.punct("@") << bang >> tla_ast.Bdef()
+        yield intf.punct("@") << apply >> (lambda _: tla_ast.Bdef())
 
 
 # and string_or_float_of_expr = lazy begin
@@ -2079,6 +2134,7 @@ def expr_def():
 #            use float_val;
 #          ]
 # end
+@rule
 def string_or_float_of_expr():
     while True:
         yield choice([use(string_val()), use(expr_def()), use(float_val())])
@@ -2099,6 +2155,7 @@ class Fun:
 # (* definitions *)
 #
 # and defn b = lazy begin
+@rule
 def defn(b):
     # <$?> (fun i ->
     #         match head with
@@ -2311,6 +2368,7 @@ def defn(b):
 #       ] ;
 #   ]
 # end
+@rule
 def ophead(b):
     def apply_ophead(u):
         return choice(
@@ -2406,6 +2464,7 @@ def ophead(b):
 #     end ;
 #   ]
 # end
+@rule
 def opdecl():
     def apply_op_param(h_args):
         h, args = h_args
@@ -2510,10 +2569,12 @@ def opdecl():
 #            else { op with core = Opaque op.core }) ;
 #   ]
 # end
+@rule
 def oparg(b):
     def f(op):
-        if op in _optable.optable:
-            top, *_ = _optable.optable[op]
+        optable = _optable.current_optable.get()
+        if op in optable:
+            top, *_ = optable[op]
             if top.defn is None:
                 return tla_ast.Opaque(op)
             else:
@@ -2535,6 +2596,7 @@ def oparg(b):
 #            inst_mod = m ;
 #            inst_sub = Option.default [] sub })
 # end
+@rule
 def instance(b):
     def apply_instance(m_sub):
         m, sub = m_sub
@@ -2567,6 +2629,7 @@ def instance(b):
 #           )
 #     )
 # end
+@rule
 def subst(b):
     def exprify(op):
         return return_(tla_ast.Opaque(op))
@@ -2622,6 +2685,7 @@ def subst(b):
 #     end ;
 #   ]
 # end end
+@rule
 def hyp(b):
     def apply_decl(nk):
         # (fun (lev, (v, shp, ran)) -> (Fresh (v, shp, lev, ran))) ;
@@ -2729,6 +2793,7 @@ def hyp(b):
 #   <**> (kwd "PROVE" >>> use (expr b))
 #   <$> (fun (hs, e) -> { context = Deque.of_list hs ; active = e }) ;
 # end
+@rule
 def sequent(b):
     while True:
         yield (
@@ -2749,6 +2814,7 @@ def sequent(b):
 #     <$> (fun sq -> { sq with core = Sequent sq.core }) ;
 #   ]
 # end
+@rule
 def expr_or_sequent(b):
     while True:
         yield (
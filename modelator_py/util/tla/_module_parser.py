@@ -13,13 +13,13 @@ from . import _tla_combinators as intf  # avoid shadowing by `_combinators`
 from . import tokens
 from ._combinators import (
     apply,
-    bang,
     choice,
     choice_iter,
     enabled,
     first,
     optional,
     or_,
+    rule,
     second,
     second_commit,
     sep1,
@@ -29,8 +29,8 @@ from ._combinators import (
     times2,
     use,
 )
+from ._context import nodes
 from ._tla_combinators import kwd, locate, punct
-from .ast import Nodes as nodes
 
 
 #
@@ -56,6 +56,7 @@ def with_meth(e, meth):
 
 
 # let rec modunit = lazy begin
+@rule
 def modunit():
     def apply_def(local):
         # let ex = if Option.is_some l then Local else Export in
@@ -292,7 +293,7 @@ def modunit():
         )
         #
         #     punct "----" <!> [] ;
-        yield intf.punct("----") << bang >> list()
+        yield intf.punct("----") << apply >> (lambda _: list())
 
     #   ]
     while True:
@@ -312,6 +313,7 @@ def modunit():
 #     succeed [] ;
 #   ]
 # end
+@rule
 def modunits():
     # while True: yield choice([
     #     use(modunit()) <<cons>> use(modunits()),
@@ -324,6 +326,7 @@ def modunits():
 # and parse = lazy begin
 #   locate (use parse_)
 # end
+@rule
 def parse():
     while True:
         yield intf.locate(use(parse_()))
@@ -344,6 +347,7 @@ def parse():
 #     ; body = List.concat mus
 #     ; stage = Parsed }
 #   end
+@rule
 def parse_():
     def apply_module(nm_exs_mus):
         (name, extends), modunits = nm_exs_mus
@@ -8,6 +8,8 @@
 # <https://github.com/tlaplus/tlapm/blob/main/src/optable.ml>
 #
 
+import contextvars
+
 from .ast import Nodes as nodes
 
 # open Builtin
@@ -192,7 +194,7 @@ def withdef(tuple_):
 #     '\\propto',      ( 5, 5), Infix(Non()),   [] ;
 #   ] ;
 # ]
-def _generate_tlaops():
+def _generate_tlaops(nodes=nodes):
     tlaops = [
         (
             "Logic",
@@ -358,8 +360,8 @@ class TLAOP:
 #         end ops
 #     end tlaops ;
 #     tab
-def _generate_optable():
-    tlaops = _generate_tlaops()
+def _generate_optable(nodes=nodes):
+    tlaops = _generate_tlaops(nodes)
     optable = dict()
     for dom, ops in tlaops:
         for name, prec, fixity, alternatives, defn in ops:
@@ -373,6 +375,25 @@ def _generate_optable():
 
 
 optable = _generate_optable()
+# the table that the parser uses, see `parser.ParserContext`
+current_optable = contextvars.ContextVar("optable", default=optable)
+# tables generated by `optable_of`, keyed by syntax tree classes
+_optables = {nodes: optable}
+
+
+def optable_of(nodes):
+    """Return operator table with definitions from the classes of `nodes`.
+
+    The table is generated once for each `nodes`,
+    and must not be modified.
+    """
+    table = _optables.get(nodes)
+    if table is None:
+        table = _generate_optable(nodes)
+        _optables[nodes] = table
+    return table
+
+
 # pprint.pprint(optable)
 
 
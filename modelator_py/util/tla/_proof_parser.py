@@ -19,6 +19,7 @@ from ._combinators import (
     choice,
     optional,
     or_,
+    rule,
     second,
     second_commit,
     sep,
@@ -30,8 +31,8 @@ from ._combinators import (
     times2,
     use,
 )
+from ._context import nodes as tla_ast
 from ._tla_combinators import kwd, punct
-from .ast import Nodes as tla_ast
 
 
 # open Ext
@@ -467,12 +468,14 @@ def toplevel(ps):
 #   open Tla_parser
 
 
+@rule
 def method_prs_read_method():
     while True:
         yield use(ep.read_new_method())
 
 
 #   let read_method = optional (use Method_prs.read_method)
+@rule
 def read_method():
     # TODO: method parser
     while True:
@@ -485,14 +488,15 @@ def read_method():
 #       succeed Emit ;
 #     ]
 #   end
+@rule
 def suppress():
     while True:
         yield choice(
             [
                 intf.pragma(punct("_") << or_ >> intf.ident("suppress"))
-                << bang
-                >> tla_ast.Suppress(),
-                succeed(tla_ast.Emit()),
+                << apply
+                >> (lambda _: tla_ast.Suppress()),
+                succeed(None) << apply >> (lambda _: tla_ast.Emit()),
             ]
         )
 
@@ -532,16 +536,21 @@ def preno():
 #   let only =
 #     choice [ kwd "ONLY" <!> Only ;
 #              succeed Default ]
+@rule
 def only():
     while True:
         yield choice(
-            [kwd("ONLY") << bang >> tla_ast.Only(), succeed(tla_ast.Default())]
+            [
+                kwd("ONLY") << apply >> (lambda _: tla_ast.Only()),
+                succeed(None) << apply >> (lambda _: tla_ast.Default()),
+            ]
         )
 
 
 #   let proof_kwd =
 #     choice [ kwd "PROOF" <!> true ;
 #              succeed false ]
+@rule
 def proof_kwd():
     while True:
         yield choice([kwd("PROOF") << bang >> True, succeed(False)])
@@ -554,6 +563,7 @@ def proof_kwd():
 #       <$> (fun e -> { context = Deque.empty ; active = e })
 #     ]
 #   end
+@rule
 def sequent():
     while True:
         yield choice(
@@ -591,6 +601,7 @@ def sequent():
 #         end ;
 #       ]
 #   end
+@rule
 def preproof():
     while True:
         yield (
@@ -630,8 +641,8 @@ def preproof():
                         # locate (kwd "OMITTED" <!> (PreOmitted Explicit)) ;
                         intf.locate(
                             kwd("OMITTED")
-                            << bang
-                            >> tla_ast.PreOmitted(tla_ast.Explicit())
+                            << apply
+                            >> (lambda _: tla_ast.PreOmitted(tla_ast.Explicit()))
                         ),
                         #  locate begin
                         #           preno <**> use prestep
@@ -654,13 +665,14 @@ def preproof():
 
 
 #   and prestep = lazy begin
+@rule
 def prestep():
     while True:
         yield choice(
             [
                 #     choice [
                 #       kwd "QED" <!> PreQed ;
-                kwd("QED") << bang >> tla_ast.PreQed(),
+                kwd("QED") << apply >> (lambda _: tla_ast.PreQed()),
                 #
                 #       kwd "HIDE"
                 #       >*> use usebody
@@ -821,6 +833,7 @@ def filter_usebody_fact(f):
 
 
 #   and usebody = lazy begin
+@rule
 def usebody():
     #     let defs =
     #       (kwd "DEF" <|> kwd "DEFS")
@@ -868,6 +881,7 @@ def usebody():
 #       <$> (fun ids -> Dvar (String.concat "!" ids))
 #     end
 #   end
+@rule
 def definable():
     while True:
         yield intf.locate(
@@ -895,12 +909,17 @@ def definable():
 #       <$> (fun pp -> [pp])
 #     ] <$> toplevel
 #   end
+@rule
 def proof():
     while True:
         yield choice(
             [
                 star1(use(preproof())),
-                intf.locate(succeed(tla_ast.PreOmitted(tla_ast.Implicit())))
+                intf.locate(
+                    succeed(None)
+                    << apply
+                    >> (lambda _: tla_ast.PreOmitted(tla_ast.Implicit()))
+                )
                 << apply
                 >> (lambda pp: [pp]),
             ]
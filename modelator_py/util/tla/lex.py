@@ -7,8 +7,11 @@
 #
 # <https://github.com/tlaplus/tlapm/blob/main/src/alexer.mll>
 #
+import bisect
+import copy
 import logging
 import re
+import threading
 
 import ply.lex
 
@@ -139,9 +142,9 @@ class Lexer:
     tab = "\t"
     newline = r"\r|\n|\r\n"
 
-    def __init__(self, debug=False):
+    def __init__(self, debug=False, **kwargs):
         self.tokens = self.delimiters + self.operators + self.misc + list(self.reserved)
-        self.build(debug=debug)
+        self.build(debug=debug, **kwargs)
         self._initialize_state()
 
     def build(self, debug=False, debuglog=None, **kwargs):
@@ -156,6 +159,19 @@ class Lexer:
             debuglog = logger
         self._lexer = ply.lex.lex(module=self, debug=debug, debuglog=debuglog, **kwargs)
 
+    def clone(self):
+        """Return a new lexer that shares the compiled tables of this one.
+
+        Cloning avoids validating the token rules and compiling
+        the master regular expressions again, so it is much cheaper
+        than constructing a new `Lexer`. The clone has its own state,
+        so clones can be used concurrently.
+        """
+        other = copy.copy(self)
+        other._lexer = self._lexer.clone(object=other)
+        other._initialize_state()
+        return other
+
     def input(self, string):
         """Set data to `string` and reset state."""
         self._lexer.input(string)
@@ -163,6 +179,9 @@ class Lexer:
 
     def _initialize_state(self):
         """Reset the lexer's state."""
+        # `ply` keeps the rules of the current state in `lexre`,
+        # and a clone keeps those of the lexer it was copied from
+        self._lexer.begin("INITIAL")
         self._lexer.lineno = 1
         self._string_start = None
 
@@ -482,8 +501,10 @@ def tokenize(data, omit_preamble=True):
         module_name = lextokens[2].value
     else:
         module_name = "unknown module"
+    line_starts = _line_starts(data)
     tokens = [
-        _map_to_token(data, token, module_name=module_name) for token in lextokens
+        _map_to_token(data, token, module_name=module_name, line_starts=line_starts)
+        for token in lextokens
     ]
     return tokens
 
@@ -493,8 +514,49 @@ def lex(data):
     return _lex(data)
 
 
+_shared_lexer = None
+_shared_lexer_lock = threading.Lock()
+
+
+def build_lexer(debug=False, **kwargs):
+    """Build the process-wide lexer that `tokenize` copies.
+
+    Calling this function is optional: the lexer is built
+    with default arguments the first time that it is needed.
+    Call this function to pass arguments to `ply.lex.lex`,
+    for example to write the tables to the module
+    `lextab` in directory `outputdir`, and read them
+    from there in later processes
+    (`ply` imports `lextab`, so `outputdir`
+    needs to be in `sys.path` for reading):
+
+    ```python
+    build_lexer(optimize=True, lextab="tla_lextab", outputdir=path)
+    ```
+
+    @param kwargs: Same arguments as `Lexer.build`
+    @return: the process-wide lexer
+    @rtype: `Lexer`
+    """
+    global _shared_lexer
+    lexer = Lexer(debug=debug, **kwargs)
+    with _shared_lexer_lock:
+        _shared_lexer = lexer
+    return lexer
+
+
+def _new_lexer():
+    """Return a copy of the process-wide lexer, ready for input."""
+    global _shared_lexer
+    with _shared_lexer_lock:
+        if _shared_lexer is None:
+            _shared_lexer = Lexer()
+        lexer = _shared_lexer
+    return lexer.clone()
+
+
 def _lex(data):
-    lexer = Lexer()
+    lexer = _new_lexer()
     lexer.input(data)
     output = list()
     for token in lexer:
@@ -510,7 +572,7 @@ def _omit_preamble(data):
     return data[n:]
 
 
-def _map_to_token(data, token, module_name="dummy_file"):
+def _map_to_token(data, token, module_name="dummy_file", line_starts=None):
     # `data` is needed to find
     # the beginning of line
     token_ = _map_to_token_(token)
@@ -518,22 +580,20 @@ def _map_to_token(data, token, module_name="dummy_file"):
     # _print_lextoken_info(token)
     # print('\n')
     line_number = token.lineno
-    bol = find_beginning_of_line(data, token)
-    start_column_offset = token.lexpos
-    start_loc = _location.locus_of_position(
-        module_name, line_number, bol, start_column_offset
-    )
+    if line_starts is None:
+        bol = find_beginning_of_line(data, token)
+    else:
+        bol = _find_beginning_of_line(line_starts, token)
     if "\n" in token.value:
         raise AssertionError(token.type, token.value)
+    start_column_offset = token.lexpos
     stop_column_offset = token.lexpos + len(token.value)
-    stop_loc = _location.locus_of_position(
-        module_name, line_number, bol, stop_column_offset
-    )
-    if data[start_column_offset:stop_column_offset] != token.value:
+    if not data.startswith(token.value, start_column_offset):
         raise AssertionError(data[start_column_offset:stop_column_offset], token.value)
-    loc = start_loc.merge(stop_loc)
-    if len(token.value) != loc.stop.column - loc.start.column:
-        raise AssertionError(token.value, loc.stop.column, loc.start.column)
+    # same as merging the loci of the start and stop positions
+    start = _location.Pt(line=line_number, bol=bol, col=start_column_offset - bol + 1)
+    stop = _location.Pt(line=line_number, bol=bol, col=stop_column_offset - bol + 1)
+    loc = _location.Locus(start, stop, module_name)
     return intf.Token(token_, None, loc)
 
 
@@ -632,6 +692,40 @@ def find_beginning_of_line(input, token):
     return line_start
 
 
+def _line_starts(input):
+    """Return `list` of offsets where the lines of `input` start.
+
+    Computed in one pass, for finding the beginning
+    of line of each token with a binary search.
+    """
+    line_starts = [0]
+    find = input.find
+    append = line_starts.append
+    i = find("\n")
+    while i != -1:
+        append(i + 1)
+        i = find("\n", i + 1)
+    return line_starts
+
+
+def _find_beginning_of_line(line_starts, token):
+    """Return offset of the beginning of the line of `token`.
+
+    @param line_starts: as returned by `_line_starts`
+    """
+    lexpos = token.lexpos
+    # the lexer counts the newlines that it consumes,
+    # so `lineno` is normally the index of the line
+    i = token.lineno
+    if 0 < i < len(line_starts):
+        if line_starts[i - 1] <= lexpos < line_starts[i]:
+            return line_starts[i - 1]
+    elif i == len(line_starts) and line_starts[i - 1] <= lexpos:
+        return line_starts[i - 1]
+    i = bisect.bisect_right(line_starts, lexpos) - 1
+    return line_starts[i]
+
+
 def find_column(input, token):
     r"""Return start column of `token`.
 
@@ -3,11 +3,75 @@
 # All rights reserved. Licensed under 3-clause BSD.
 #
 from . import _combinators as pco
+from . import _context
 from . import _expr_parser as ep
 from . import _module_parser as mp
-from . import _optable
-from . import _proof_parser as pfp
-from . import _tla_combinators, lex
+from . import _optable, _tla_combinators, ast, lex
+
+
+class ParserContext:
+    """Parser that builds syntax trees from the classes of `nodes`.
+
+    The operator table, fixities and parsers for `nodes`
+    are built once per `nodes`, and shared by the contexts
+    for `nodes`.
+    A context can be reused for any number of inputs,
+    and shared by threads that parse at the same time.
+    For example:
+
+    ```python
+    from concurrent.futures import ThreadPoolExecutor
+
+    from . import parser
+    from .to_str import Nodes
+
+    context = parser.ParserContext(Nodes)
+    with ThreadPoolExecutor() as executor:
+        trees = list(executor.map(context.parse_expr, exprs))
+    ```
+    """
+
+    def __init__(self, nodes=None):
+        if nodes is None:
+            nodes = ast.Nodes
+        self.nodes = nodes
+        self.optable = _optable.optable_of(nodes)
+        self.fixities = ep.fixities_of(nodes)
+        self.rules = _rules_of(nodes)
+
+    def parse(self, module_text):
+        """Return abstract syntax tree for `str`ing `module_text`.
+
+        `module_text` is a module specification.
+        """
+        parser = mp.parse()
+        tokens = lex.tokenize(module_text, omit_preamble=True)
+        return self._run(parser, tokens)
+
+    def parse_expr(self, expr):
+        """Return abstract syntax tree for `str`ing `expr`.
+
+        `expr` is an expression string.
+        """
+        parser = ep.expr(False)
+        tokens = lex.tokenize(expr, omit_preamble=False)
+        return self._run(parser, tokens)
+
+    def _run(self, parser, tokens):
+        """Apply `parser` to `tokens`, with the classes of this context."""
+        nodes_token = _context.current_nodes.set(self.nodes)
+        rules_token = pco.current_rules.set(self.rules)
+        optable_token = _optable.current_optable.set(self.optable)
+        fixities_token = ep.current_fixities.set(self.fixities)
+        try:
+            init = _tla_combinators.init
+            tree, pst = pco.run(parser, init=init, source=tokens)
+        finally:
+            ep.current_fixities.reset(fixities_token)
+            _optable.current_optable.reset(optable_token)
+            pco.current_rules.reset(rules_token)
+            _context.current_nodes.reset(nodes_token)
+        return tree
 
 
 def parse(module_text, nodes=None):
@@ -30,13 +94,7 @@ def parse(module_text, nodes=None):
     tree = parser.parse(module_text, nodes=Nodes)
     ```
     """
-    memo = _save(nodes)
-    parser = mp.parse()
-    init = _tla_combinators.init
-    tokens = lex.tokenize(module_text, omit_preamble=True)
-    tree, pst = pco.run(parser, init=init, source=tokens)
-    _restore(memo)
-    return tree
+    return ParserContext(nodes).parse(module_text)
 
 
 def parse_expr(expr, nodes=None):
@@ -55,39 +113,20 @@ def parse_expr(expr, nodes=None):
     tree = parser.parse_expr(expr, nodes=Nodes)
     ```
     """
-    memo = _save(nodes)
-    parser = ep.expr(False)
-    init = _tla_combinators.init
-    tokens = lex.tokenize(expr, omit_preamble=False)
-    tree, pst = pco.run(parser, init=init, source=tokens)
-    _restore(memo)
-    return tree
+    return ParserContext(nodes).parse_expr(expr)
 
 
-def _save(nodes):
-    """Store the `tla_ast` attribute of parser modules.
+# Parsers of the grammar rules (see `_combinators.rule`),
+# keyed by the syntax tree classes that they use. The rules
+# read the operator table and fixities of these classes,
+# so there is one `dict` of parsers for each `nodes`.
+_rules = dict()
 
-    Set the AST nodes that are used by parser modules
-    to the classes of `nodes`.
-    """
-    if nodes is None:
-        return None
-    assert nodes is not None
-    memo = (ep.tla_ast, mp.nodes, pfp.tla_ast, _optable.nodes)
-    ep.tla_ast = nodes
-    mp.nodes = nodes
-    pfp.tla_ast = nodes
-    _optable.nodes = nodes
-    _optable.optable = _optable._generate_optable()
-    ep.fixities = ep._generate_fixities()
-    return memo
-
-
-def _restore(memo):
-    """Set the `tla_ast` attribute of parser modules."""
-    if memo is None:
-        return
-    assert memo is not None
-    (ep.tla_ast, mp.nodes, pfp.tla_ast, _optable.nodes) = memo
-    _optable.optable = _optable._generate_optable()
-    ep.fixities = ep._generate_fixities()
+
+def _rules_of(nodes):
+    """Return `dict` of the parsers of grammar rules for `nodes`."""
+    rules = _rules.get(nodes)
+    if rules is None:
+        rules = dict()
+        _rules[nodes] = rules
+    return rules
@@ -1,3 +1,4 @@
-from .itf import TlcITFCmd, tlc_itf
+from .itf import TlcITFCmd, tlc_itf, tlc_itf_stream
+from .state_cache import StateCache
 
-__all__ = ["TlcITFCmd", "tlc_itf"]
+__all__ = ["StateCache", "TlcITFCmd", "tlc_itf", "tlc_itf_stream"]
@@ -1,6 +1,9 @@
 import json as stdjson
+import sys
 
-from .itf import TlcITFCmd, tlc_itf
+from ..itf_binary import ITFBinaryWriter
+from ..itf_writer import ITFJsonWriter
+from .itf import TlcITFCmd, tlc_itf, tlc_itf_stream
 
 
 class Tlc:
@@ -13,6 +16,11 @@ class Tlc:
         lists=True,
         records=True,
         json=False,  # Read parameters from Json?
+        stream=False,  # Print each trace as soon as it is read?
+        compact=False,  # Print json without indentation?
+        lines=None,  # Print a line of json per "trace" or per "state"?
+        delta=False,  # Print only the variables that change in each state?
+        format="json",  # Print "json" or "binary"?
     ):
         """
         Extract a list of Informal Trace Format traces from the stdout of TLC.
@@ -24,11 +32,36 @@ class Tlc:
             lists : Convert 1-indexed functions (TLA+ sequences) to ITF lists?
             records : Convert string-indexed functions (TLA+ records) to ITF records?
             json : Read arguments from json instead of cli?
+            stream : Read stdin incrementally and print each trace as a line of json as soon as it is read?
+            compact : Print json without indentation?
+            lines : Print json lines, one line per "trace" or per "state"? (default: "trace" if stream)
+            delta : Print only the variables that change in each state after the first?
+            format : Print "json", or "binary" (MessagePack, see util.itf_binary)?
         """
+        if stream and lines is None:
+            lines = "trace"
+        if format == "binary":
+            writer = ITFBinaryWriter(sys.stdout.buffer, lines=lines)
+        elif format == "json":
+            indent = None if compact else 4
+            writer = ITFJsonWriter(sys.stdout, indent=indent, lines=lines)
+        else:
+            raise Exception(f"format should be 'json' or 'binary', got {format=}")
+
+        if stream:
+            assert not json, "--stream reads TLC's stdout on stdin, not json"
+            traces = tlc_itf_stream(
+                self._stdin, lists=lists, records=records, delta=delta
+            )
+            for trace in traces:
+                writer.write_trace(trace)
+            writer.close()
+            return
+
         result = None
         if json:
             json_dict = stdjson.loads(self._stdin.read())
-            result = tlc_itf(json=json_dict)
+            result = tlc_itf(json={"delta": delta} | json_dict)
         else:
 
             assert (
@@ -39,6 +72,7 @@ class Tlc:
             cmd.stdout = self._stdin.read()
             cmd.lists = lists
             cmd.records = records
+            cmd.delta = delta
 
             assert (
                 cmd.stdout is not None
@@ -46,8 +80,7 @@ class Tlc:
 
             result = tlc_itf(cmd=cmd)
 
-        obj_to_print = {}
-        obj_to_print["traces"] = result
-
-        to_print = stdjson.dumps(obj_to_print, indent=4, sort_keys=True)
-        print(to_print)
+        # write each trace in turn, so the output is never held as one string
+        for trace in result:
+            writer.write_trace(trace)
+        writer.close()
@@ -1,13 +1,12 @@
+import functools
 from dataclasses import dataclass
 from typing import Optional
 
-from modelator_py.helper import parallel_map
+from modelator_py.helper import parallel_map_by_size
 
-from ..informal_trace_format import JsonSerializer, with_lists, with_records
-from .stdout_to_informal_trace_format import (
-    extract_traces,
-    tlc_trace_to_informal_trace_format_trace,
-)
+from ..informal_trace_format import ITFTrace, JsonSerializer, delta_encode, to_json
+from .state_to_informal_trace_format import state_to_informal_trace_format_state
+from .stdout_to_informal_trace_format import extract_traces, iter_traces
 
 # mypy: ignore-errors
 
@@ -17,18 +16,20 @@ class TlcITFCmd:
     stdout: Optional[str] = None  # Captured stdout from TLC execution
     lists: Optional[str] = None  # Transform 1-indexed TLA+ functions into lists
     records: Optional[str] = None  # Transform string indexed functions into records
+    delta: Optional[bool] = None  # Only write the variables that change in each state
 
 
 def json_to_cmd(json) -> TlcITFCmd:
-    json = {"stdout": None, "lists": True, "records": True} | json
+    json = {"stdout": None, "lists": True, "records": True, "delta": False} | json
     cmd = TlcITFCmd()
     cmd.stdout = json["stdout"]
     cmd.lists = json["lists"]
     cmd.records = json["records"]
+    cmd.delta = json["delta"]
     return cmd
 
 
-def tlc_itf(*, cmd=None, json=None):  # types: ignore
+def tlc_itf(*, cmd=None, json=None, pool=None, cache=None):  # types: ignore
     """
     Extract a list of execution traces in the Informal Trace Format from the
     stdout of a TLC execution.
@@ -36,6 +37,20 @@ def tlc_itf(*, cmd=None, json=None):  # types: ignore
     Returns a list of ITFTrace objects.
 
     Benefits from multiple cpu cores as parallelizes TLA+ raw text to AST parsing.
+    The states of all traces are converted by the workers of `pool` (a
+    `helper.WorkerPool`), or of `helper.default_pool()` if `pool` is None.
+    The work is split by the size of the states, so that a single long trace
+    also uses all the workers.
+
+    If `cache` (a `state_cache.StateCache`) is given, only the states that are
+    not in the cache are parsed, by the workers, and added to the cache.
+
+    Each distinct state is converted once, and traces with equal states
+    share their Json objects, so modifying a state of one trace may modify
+    other traces.
+
+    If `cmd.delta`, the traces are delta encoded (see
+    `informal_trace_format.delta_encode`).
     """
 
     if json is not None:
@@ -45,13 +60,93 @@ def tlc_itf(*, cmd=None, json=None):  # types: ignore
 
     tlc_traces = extract_traces(cmd.stdout)
 
-    itf_traces = parallel_map(tlc_trace_to_informal_trace_format_trace, tlc_traces)
+    # Traces from TLC -continue share long prefixes of states, so each
+    # distinct state is converted once, and its Json object is shared
+    # by all the traces that contain it.
+    states = list(dict.fromkeys(state for trace in tlc_traces for state in trace))
+    if cache is None:
+        convert = functools.partial(
+            tlc_state_to_itf_json, lists=cmd.lists, records=cmd.records
+        )
+        state_objects = parallel_map_by_size(convert, states, size=len, pool=pool)
+    else:
+        parse = functools.partial(
+            parallel_map_by_size,
+            state_to_informal_trace_format_state,
+            size=len,
+            pool=pool,
+        )
+        state_objects = [
+            to_json(itf_state, lists=cmd.lists, records=cmd.records)
+            for itf_state in cache.states(states, parse=parse)
+        ]
+    state_table = dict(zip(states, state_objects))
+
+    itf_traces_objects = [
+        _itf_trace_json([state_table[state] for state in trace], delta=cmd.delta)
+        for trace in tlc_traces
+    ]
+
+    return itf_traces_objects
 
-    if cmd.lists:
-        itf_traces = parallel_map(with_lists, itf_traces)
-    if cmd.records:
-        itf_traces = parallel_map(with_records, itf_traces)
 
-    itf_traces_objects = parallel_map(lambda t: JsonSerializer().visit(t), itf_traces)
+def tlc_itf_stream(stdout, *, lists=True, records=True, delta=False, cache=None):
+    """
+    Extract execution traces in the Informal Trace Format from the stdout of
+    a TLC execution, reading it incrementally.
+
+    `stdout` is an iterable of lines, e.g. a file object or the stdout pipe
+    of a running TLC process. Yields the Json object of each ITFTrace as soon
+    as the trace has been read, so traces are available while TLC runs.
+    States are looked up in `cache` (a `state_cache.StateCache`), if given.
+    Traces are delta encoded if `delta`.
+    """
+    for tlc_trace in iter_traces(stdout):
+        yield tlc_trace_to_itf_json(
+            tlc_trace, lists=lists, records=records, delta=delta, cache=cache
+        )
 
-    return itf_traces_objects
+
+def tlc_trace_to_itf_json(
+    tlc_trace, *, lists=True, records=True, delta=False, cache=None
+):
+    """
+    Convert a trace extracted from the stdout of TLC to the Json object of
+    an ITFTrace, delta encoded if `delta`.
+
+    States are looked up in `cache` (a `state_cache.StateCache`), if given.
+    """
+    if cache is None:
+        states = [
+            tlc_state_to_itf_json(state, lists=lists, records=records)
+            for state in tlc_trace
+        ]
+    else:
+        states = [
+            to_json(itf_state, lists=lists, records=records)
+            for itf_state in cache.states(tlc_trace)
+        ]
+    return _itf_trace_json(states, delta=delta)
+
+
+def tlc_state_to_itf_json(state, *, lists=True, records=True):
+    """
+    Convert a state of a trace extracted from the stdout of TLC to the Json
+    object of an ITFState.
+
+    All the steps of the conversion run in one call, so that a worker process
+    returns only the Json object of the state.
+    """
+    itf_state = state_to_informal_trace_format_state(state)
+    return to_json(itf_state, lists=lists, records=records)
+
+
+def _itf_trace_json(state_objects, delta=False):
+    """Return the Json object of the ITFTrace with the Json `state_objects`."""
+    vars = []
+    if 0 < len(state_objects):
+        vars = list(state_objects[0].keys())
+    trace = JsonSerializer().visit(ITFTrace(vars, state_objects))
+    if delta:
+        trace = delta_encode(trace)
+    return trace
@@ -0,0 +1,205 @@
+import collections
+import hashlib
+import os
+import pickle
+import tempfile
+import typing
+
+from modelator_py.util.informal_trace_format import ITFState, Visitor
+
+from .state_to_informal_trace_format import state_to_informal_trace_format_state
+
+# mypy: ignore-errors
+
+
+class StateCache:
+    """
+    Cache of the ITFStates parsed from the state strings in the stdout of TLC,
+    keyed by the hash of the state string.
+
+    Keeps the `maxsize` most recently used states in memory. If `path` is
+    given, states are also stored in that directory, one pickle file per state,
+    so they survive the process and can be shared by processes. The files are
+    in a subdirectory per `FORMAT_VERSION`, and files that cannot be read are
+    treated as misses and removed. When the files take more than
+    `max_disk_size` bytes, the least recently used states are removed until
+    they take 90% of it. The directory must only be shared with trusted
+    processes.
+
+    The counters `hits` and `misses` count the lookups of state strings,
+    `disk_hits` counts the hits that were read from `path`.
+    """
+
+    # Version of the pickled states, to increase when the ITF classes or the
+    # parsing of states change, so that older files are not read.
+    FORMAT_VERSION = 1
+
+    def __init__(self, maxsize=100000, path=None, max_disk_size=1 << 30):
+        self.maxsize = maxsize
+        self.path = path
+        self.max_disk_size = max_disk_size
+        # size of the files, computed on the first store, then updated by the
+        # stores of this object and by evictions
+        self._disk_size = None
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._states = collections.OrderedDict()
+        if path is not None:
+            os.makedirs(self._dir(), exist_ok=True)
+
+    @staticmethod
+    def key(state_expr_str: str) -> str:
+        return hashlib.sha256(state_expr_str.encode()).hexdigest()
+
+    def state(self, state_expr_str: str) -> ITFState:
+        """Return the ITFState of `state_expr_str`, parsing it on a miss."""
+        return self.states([state_expr_str])[0]
+
+    def states(
+        self,
+        state_expr_strs: typing.List[str],
+        parse: typing.Optional[typing.Callable] = None,
+    ) -> typing.List[ITFState]:
+        """
+        Return list of the ITFStates of `state_expr_strs`.
+
+        The distinct strings that are not in the cache are parsed by calling
+        `parse` once, with the list of them, e.g. to parse them in parallel.
+        By default, they are parsed by `state_to_informal_trace_format_state`.
+
+        The returned states are copies, and can be modified by the caller.
+        """
+        keys = [self.key(s) for s in state_expr_strs]
+        found = dict()
+        missing = dict()
+        for key, state_expr_str in zip(keys, state_expr_strs):
+            if key in found or key in missing:
+                self.hits += 1
+                continue
+            state = self._lookup(key)
+            if state is None:
+                self.misses += 1
+                missing[key] = state_expr_str
+            else:
+                self.hits += 1
+                found[key] = state
+        if missing:
+            if parse is None:
+                parsed = [
+                    state_to_informal_trace_format_state(s) for s in missing.values()
+                ]
+            else:
+                parsed = parse(list(missing.values()))
+            for key, state in zip(missing, parsed):
+                self._store(key, state)
+                found[key] = state
+        return [Visitor().visit(found[key]) for key in keys]
+
+    def stats(self) -> typing.Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "size": len(self._states),
+            "maxsize": self.maxsize,
+        }
+
+    def clear(self):
+        """Remove the states in memory, and reset the counters."""
+        self._states.clear()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+    def _lookup(self, key):
+        state = self._states.get(key)
+        if state is not None:
+            self._states.move_to_end(key)
+            return state
+        if self.path is None:
+            return None
+        try:
+            with open(self._file(key), "rb") as fd:
+                state = pickle.load(fd)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # truncated or corrupt file
+            state = None
+        if not isinstance(state, ITFState):
+            _remove(self._file(key))
+            return None
+        # mark the state as recently used
+        try:
+            os.utime(self._file(key))
+        except FileNotFoundError:
+            pass
+        self.disk_hits += 1
+        self._remember(key, state)
+        return state
+
+    def _store(self, key, state):
+        self._remember(key, state)
+        if self.path is None:
+            return
+        # write to a temporary file first, so readers never see partial files
+        fd, tmp = tempfile.mkstemp(dir=self._dir(), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(state, f)
+                size = f.tell()
+            os.replace(tmp, self._file(key))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        if self._disk_size is None:
+            self._disk_size = sum(size for _, size, _ in self._entries())
+        else:
+            self._disk_size += size
+        if self._disk_size > self.max_disk_size:
+            self._evict()
+
+    def _evict(self):
+        entries = self._entries()
+        size = sum(size for _, size, _ in entries)
+        target = self.max_disk_size * 9 // 10
+        for path, entry_size, _ in sorted(entries, key=lambda e: e[2]):
+            if size <= target:
+                break
+            _remove(path)
+            size -= entry_size
+        self._disk_size = size
+
+    def _entries(self):
+        """Return (path, size, last use time) of each stored state."""
+        entries = []
+        for entry in os.scandir(self._dir()):
+            if not entry.name.endswith(".pickle"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((entry.path, stat.st_size, stat.st_mtime_ns))
+        return entries
+
+    def _remember(self, key, state):
+        self._states[key] = state
+        self._states.move_to_end(key)
+        while len(self._states) > self.maxsize:
+            self._states.popitem(last=False)
+
+    def _dir(self):
+        return os.path.join(self.path, f"v{self.FORMAT_VERSION}")
+
+    def _file(self, key):
+        return os.path.join(self._dir(), f"{key}.pickle")
+
+
+def _remove(path):
+    # another process may have removed it
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,203 @@
+"""
+Parser for the values in the states that TLC prints.
+
+TLC prints a state as a conjunction list of `var = value` equalities,
+where the values are built from integers, strings, booleans, model values,
+sets, tuples, records and functions written with `:>` and `@@`. This parser
+reads only that syntax, directly into the Informal Trace Format, which is much
+faster than parsing the state with the TLA+ parser in `modelator_py.util.tla`.
+
+On any other syntax, `parse_state` raises `UnsupportedSyntax`, so that the
+caller can use the TLA+ parser instead.
+"""
+import re
+
+from modelator_py.util.informal_trace_format import ITFMap, ITFSet, ITFState
+from modelator_py.util.tla.lex import RESERVED
+
+# mypy: ignore-errors
+
+
+class UnsupportedSyntax(Exception):
+    """The state is not in the syntax that `parse_state` reads."""
+
+
+_TOKEN = re.compile(
+    r"""
+    (?P<space>\s+)
+    | (?P<number>\d+\b(?!\.))
+    | (?P<string>"(?:[^"\\\n]|\\["tnfr\\])*")
+    | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+    | (?P<op>/\\|\|->|:>|@@|<<|>>|[-=,()\[\]{}])
+    """,
+    re.VERBOSE,
+)
+
+# names that TLC never prints as model values
+_KEYWORDS = RESERVED | {"DOMAIN", "ENABLED", "SUBSET", "UNCHANGED", "UNION"}
+
+
+def _tokenize(text):
+    """Return list of `(kind, value)` pairs of the tokens in `text`.
+
+    The list ends with the pair `(None, None)`.
+    """
+    tokens = []
+    append = tokens.append
+    pos = 0
+    end = len(text)
+    match = _TOKEN.match
+    while pos < end:
+        m = match(text, pos)
+        if m is None:
+            raise UnsupportedSyntax(f"unexpected character at {pos}: {text[pos]!r}")
+        kind = m.lastgroup
+        if kind == "space":
+            pass
+        elif kind == "op":
+            value = m.group()
+            append((value, value))
+        elif kind == "name":
+            value = m.group()
+            if value == "TRUE":
+                append(("value", True))
+            elif value == "FALSE":
+                append(("value", False))
+            elif value in _KEYWORDS or value.startswith(("WF_", "SF_")):
+                raise UnsupportedSyntax(f"unexpected keyword {value}")
+            else:
+                append(("name", value))
+        elif kind == "number":
+            append(("value", int(m.group())))
+        else:
+            # the string without the quotes, as `Visitor.visit_String`
+            append(("value", m.group()[1:-1]))
+        pos = m.end()
+    append((None, None))
+    return tokens
+
+
+class _Parser:
+    """Recursive descent parser over the tokens of a TLC state.
+
+    ```
+    state ::= ("/\\" name "=" expr)+ | name "=" expr
+    expr ::= fn ("@@" fn)*
+    fn ::= value (":>" value)?
+    value ::= number | "-" number | string | "TRUE" | "FALSE" | name
+        | "{" [expr ("," expr)*] "}"
+        | "<<" [expr ("," expr)*] ">>"
+        | "[" name "|->" expr ("," name "|->" expr)* "]"
+        | "(" expr ")"
+    ```
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.i = 0
+
+    def expect(self, kind):
+        token_kind, value = self.tokens[self.i]
+        if token_kind != kind:
+            raise UnsupportedSyntax(f"expected {kind}, found {token_kind}")
+        self.i += 1
+        return value
+
+    def state(self):
+        tokens = self.tokens
+        var_value_map = dict()
+        if tokens[self.i][0] == "/\\":
+            while tokens[self.i][0] == "/\\":
+                self.i += 1
+                self.equality(var_value_map)
+        else:
+            self.equality(var_value_map)
+        self.expect(None)
+        return ITFState(var_value_map)
+
+    def equality(self, var_value_map):
+        name = self.expect("name")
+        self.expect("=")
+        var_value_map[name] = self.expr()
+
+    def expr(self):
+        f = self.fn()
+        if self.tokens[self.i][0] != "@@":
+            return f
+        elements = self.map_elements(f)
+        while self.tokens[self.i][0] == "@@":
+            self.i += 1
+            elements.extend(self.map_elements(self.fn()))
+        return ITFMap(elements)
+
+    def map_elements(self, f):
+        if not isinstance(f, ITFMap):
+            raise UnsupportedSyntax("operand of @@ is not a function")
+        return f.elements
+
+    def fn(self):
+        key = self.value()
+        if self.tokens[self.i][0] != ":>":
+            return key
+        self.i += 1
+        return ITFMap([[key, self.value()]])
+
+    def value(self):
+        kind, value = self.tokens[self.i]
+        self.i += 1
+        if kind == "value" or kind == "name":
+            return value
+        if kind == "-":
+            number = self.expect("value")
+            if type(number) is not int:
+                raise UnsupportedSyntax("operand of - is not a number")
+            return -number
+        if kind == "{":
+            return ITFSet(self.exprs("}"))
+        if kind == "<<":
+            exprs = self.exprs(">>")
+            return ITFMap([[i, e] for i, e in enumerate(exprs, start=1)])
+        if kind == "[":
+            return self.record()
+        if kind == "(":
+            expr = self.expr()
+            self.expect(")")
+            return expr
+        raise UnsupportedSyntax(f"unexpected token {kind}")
+
+    def exprs(self, closing):
+        """Return list of comma separated expressions up to `closing`."""
+        exprs = []
+        if self.tokens[self.i][0] == closing:
+            self.i += 1
+            return exprs
+        exprs.append(self.expr())
+        while self.tokens[self.i][0] == ",":
+            self.i += 1
+            exprs.append(self.expr())
+        self.expect(closing)
+        return exprs
+
+    def record(self):
+        pairs = []
+        while True:
+            name = self.expect("name")
+            self.expect("|->")
+            pairs.append([name, self.expr()])
+            if self.tokens[self.i][0] != ",":
+                break
+            self.i += 1
+        self.expect("]")
+        return ITFMap(pairs)
+
+
+def parse_state(state_expr_str: str) -> ITFState:
+    """
+    Converts a state expression string as found in the stdout of TLC
+    into an ITFState, without the TLA+ parser.
+
+    Raises `UnsupportedSyntax` if the state contains syntax that
+    TLC does not print for values.
+    """
+    tokens = _tokenize(state_expr_str)
+    return _Parser(tokens).state()
@@ -2,6 +2,8 @@ from modelator_py.util.informal_trace_format import ITFMap, ITFSet, ITFState
 from modelator_py.util.tla import parser, visit
 from modelator_py.util.tla.to_str import Nodes
 
+from .state_parser import UnsupportedSyntax, parse_state
+
 
 def merge_itf_maps(f, g):
     """
@@ -126,12 +128,12 @@ class Visitor(visit.NodeTransformer):
 
         self.visit(node.op, *arg, **kw)
 
-        if type(node.op) == Nodes.Eq:
+        if type(node.op) is Nodes.Eq:
             assert len(node.operands) == 2
             variable_name = node.operands[0].name
             variable_value = self.visit(node.operands[1], *arg, **kw)
             return [variable_name, variable_value]
-        if type(node.op) == Nodes.Opaque:
+        if type(node.op) is Nodes.Opaque:
             assert node.op.name in {":>", "@@", "-."}
             if node.op.name == ":>":
                 assert len(node.operands) == 2
@@ -142,8 +144,8 @@ class Visitor(visit.NodeTransformer):
                 assert len(node.operands) == 2
                 f = self.visit(node.operands[0], *arg, **kw)
                 g = self.visit(node.operands[1], *arg, **kw)
-                assert type(f) == ITFMap
-                assert type(g) == ITFMap
+                assert type(f) is ITFMap
+                assert type(g) is ITFMap
                 return merge_itf_maps(f, g)
             if node.op.name == "-.":
                 assert len(node.operands) == 1
@@ -164,6 +166,21 @@ def state_to_informal_trace_format_state(state_expr_str: str):
     Converts a state expression string as found in the stdout of TLC
     into an in memory AST representation.
 
+    The state is read by `state_parser.parse_state`, and only parsed
+    with the TLA+ parser if it contains syntax that `parse_state`
+    does not support.
+    """
+    try:
+        return parse_state(state_expr_str)
+    except UnsupportedSyntax:
+        return tla_state_to_informal_trace_format_state(state_expr_str)
+
+
+def tla_state_to_informal_trace_format_state(state_expr_str: str):
+    """
+    Converts a state expression string as found in the stdout of TLC
+    into an in memory AST representation, using the TLA+ parser.
+
     Note: this is a slow operation.
     """
     tree = parser.parse_expr(state_expr_str, nodes=Nodes)
@@ -1,3 +1,4 @@
+import itertools
 import typing
 
 from modelator_py.util.informal_trace_format import ITFTrace
@@ -5,104 +6,122 @@ from modelator_py.util.informal_trace_format import ITFTrace
 from .state_to_informal_trace_format import state_to_informal_trace_format_state
 
 
-def trace_lines_model_checking_mode(stdout) -> typing.List[typing.List[str]]:
-    """
-    Returns list of lists. Each sublist is a list of lines
-    that make a trace.
+def _is_model_checking_header(line):
+    """One line before the beginning of the trace."""
+    single_state_trace_header = "is violated by the initial state" in line
+    mult_state_trace_header = line == "Error: The behavior up to this point is:"
+    return single_state_trace_header or mult_state_trace_header
 
-    Args:
-        stdout : stdout of TLC execution run in model checking mode
-    """
-    ret = []
-    lines = stdout.split("\n")
-    header_open = False
 
-    def is_header(line):
-        """One line before the beginning of the trace."""
-        single_state_trace_header = "is violated by the initial state" in line
-        mult_state_trace_header = line == "Error: The behavior up to this point is:"
-        return single_state_trace_header or mult_state_trace_header
+def _is_start_of_new_trace(line):
+    """When there are multiple traces, closes the previous trace"""
 
-    def is_start_of_new_trace(line):
-        """When there are multiple traces, closes the previous trace"""
+    # when there are multiple violations, a new trace report starts with:
+    continue_case = line.startswith("Error: Invariant")
 
-        # when there are multiple violations, a new trace report starts with:
-        continue_case = line.startswith("Error: Invariant")
+    # when the first violation was in the init state, the second one starts with:
+    init_state_continue_case = line.startswith("Finished computing initial states")
+    return continue_case or init_state_continue_case
 
-        # when the first violation was in the init state, the second one starts with:
-        init_state_continue_case = line.startswith("Finished computing initial states")
-        return continue_case or init_state_continue_case
 
-    def is_footer(line):
-        multi_state_footer = (
-            ("states generated" in line)
-            and ("distinct states found" in line)
-            and ("states left on queue" in line)
-            and (not line.startswith("Progress"))
-        ) or ("Model checking completed" in line)
+def _is_model_checking_footer(line):
+    multi_state_footer = (
+        ("states generated" in line)
+        and ("distinct states found" in line)
+        and ("states left on queue" in line)
+        and (not line.startswith("Progress"))
+    ) or ("Model checking completed" in line)
 
-        single_state_footer = "Finished in" in line
+    single_state_footer = "Finished in" in line
 
-        return single_state_footer or multi_state_footer
+    return single_state_footer or multi_state_footer
 
-    header_cnt = 0
-    header_ix = -1
-    for i, line in enumerate(lines):
-        if is_start_of_new_trace(line):
+
+def _is_simulation_header(line):
+    """Begins a trace and may also end a previous trace"""
+    HEADER = "State 1:"
+    return line.startswith(HEADER)
+
+
+def _is_simulation_footer(line):
+    """Ends the list of traces"""
+    return line.startswith("Finished in")
+
+
+def iter_trace_lines_model_checking_mode(
+    lines: typing.Iterable[str],
+) -> typing.Iterator[typing.List[str]]:
+    """
+    Yields each trace in the lines of the stdout of TLC run in model checking
+    mode, as a list of lines, as soon as the end of the trace is read.
+
+    Only the lines of the trace being read are kept in memory.
+    """
+    # lines after the last header, None until the first header
+    trace = None
+    header_open = False
+    for line in lines:
+        if _is_start_of_new_trace(line):
             header_open = True
-            if 0 < header_cnt:
-                trace = lines[header_ix + 1 : i]
-                ret.append(trace)
+            if trace is not None:
+                yield list(trace)
 
-        if is_header(line):
-            header_cnt += 1
-            header_ix = i
+        if _is_model_checking_header(line):
+            trace = []
+        elif trace is not None:
+            trace.append(line)
 
         # we need boolean header_open because the footer the conditions for the footer
         # of a single state trace will be met also in the line after the footer of a multi-state trace
-        if header_open and is_footer(line):
+        if header_open and _is_model_checking_footer(line):
             header_open = False
-            if 0 < header_cnt:
-                trace = lines[header_ix + 1 : i]
-                ret.append(trace)
+            if trace is not None:
+                yield trace[:-1]
             break
 
-    return ret
 
+def iter_trace_lines_simulation_mode(
+    lines: typing.Iterable[str],
+) -> typing.Iterator[typing.List[str]]:
+    """
+    Yields each trace in the lines of the stdout of TLC run in simulation mode,
+    as a list of lines, as soon as the end of the trace is read.
 
-def trace_lines_simulation_mode(stdout) -> typing.List[typing.List[str]]:
+    Only the lines of the trace being read are kept in memory.
+    """
+    # lines from the last header, None until the first header
+    trace = None
+    for line in lines:
+        if _is_simulation_header(line):
+            if trace is not None:
+                yield trace[:-4]
+            trace = []
+        if _is_simulation_footer(line) and trace is not None:
+            yield trace[:-4]
+        if trace is not None:
+            trace.append(line)
+
+
+def trace_lines_model_checking_mode(stdout) -> typing.List[typing.List[str]]:
     """
     Returns list of lists. Each sublist is a list of lines
     that make a trace.
 
     Args:
-        stdout : stdout of TLC execution run in simulation mode
+        stdout : stdout of TLC execution run in model checking mode
     """
-    ret = []
-    lines = stdout.split("\n")
+    return list(iter_trace_lines_model_checking_mode(stdout.split("\n")))
 
-    def is_header(line):
-        """Begins a trace and may also end a previous trace"""
-        HEADER = "State 1:"
-        return line.startswith(HEADER)
 
-    def is_footer(line):
-        """Ends the list of traces"""
-        return line.startswith("Finished in")
-
-    header_cnt = 0
-    header_ix = -1
-    for i, line in enumerate(lines):
-        if is_header(line):
-            if 0 < header_cnt:
-                trace = lines[header_ix : i - 4]
-                ret.append(trace)
-            header_cnt += 1
-            header_ix = i
-        if is_footer(line) and 0 < header_cnt:
-            ret.append(lines[header_ix : i - 4])
+def trace_lines_simulation_mode(stdout) -> typing.List[typing.List[str]]:
+    """
+    Returns list of lists. Each sublist is a list of lines
+    that make a trace.
 
-    return ret
+    Args:
+        stdout : stdout of TLC execution run in simulation mode
+    """
+    return list(iter_trace_lines_simulation_mode(stdout.split("\n")))
 
 
 def split_into_states(lines: typing.List[str]) -> typing.List[typing.List[str]]:
@@ -150,9 +169,40 @@ def extract_traces(stdout: str):
         traces = trace_lines_simulation_mode(stdout)
     else:
         traces = trace_lines_model_checking_mode(stdout)
-    traces = [split_into_states(t) for t in traces]  # type:ignore
-    traces = [["\n".join(lines) for lines in t] for t in traces]
-    return traces
+    return [_trace_states(t) for t in traces]
+
+
+def iter_traces(lines: typing.Iterable[str]) -> typing.Iterator[typing.List[str]]:
+    """
+    Extract zero, one or more traces from the lines of the stdout of TLC,
+    reading the lines incrementally, e.g. from a file object or a pipe.
+
+    Yields each trace as soon as it ends, as `extract_traces` returns it.
+    Only the lines of the trace being read are kept in memory.
+
+    WARNING: Does not support lasso traces
+    """
+    lines = (line[:-1] if line.endswith("\n") else line for line in lines)
+    # TLC reports the mode before any traces, in the line "Running ..."
+    preamble = []
+    simulation = False
+    for line in lines:
+        preamble.append(line)
+        if line.startswith("Running ") or _is_start_of_new_trace(line):
+            simulation = "Running Random Simulation" in line
+            break
+    lines = itertools.chain(preamble, lines)
+    if simulation:
+        traces = iter_trace_lines_simulation_mode(lines)
+    else:
+        traces = iter_trace_lines_model_checking_mode(lines)
+    for t in traces:
+        yield _trace_states(t)
+
+
+def _trace_states(lines: typing.List[str]) -> typing.List[str]:
+    """Return list of the states in the `lines` of a trace."""
+    return ["\n".join(state_lines) for state_lines in split_into_states(lines)]
 
 
 def tlc_trace_to_informal_trace_format_trace(trace: typing.List[str]):
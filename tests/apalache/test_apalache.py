@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 import os
@@ -8,7 +9,13 @@ from io import StringIO
 import pytest
 
 from modelator_py.apalache.cli import Apalache
-from modelator_py.apalache.raw import ApalacheArgs, RawCmd, stringify_raw_cmd
+from modelator_py.apalache.raw import (
+    ApalacheArgs,
+    RawCmd,
+    apalache_raw_async,
+    raw_cmd_argv,
+    stringify_raw_cmd,
+)
 
 from ..helper import get_apalache_path, get_resource_dir
 
@@ -20,18 +27,48 @@ def test_stringify_raw_cmd():
     Use for debugging - ensure that the shell command generated is sensible.
     """
     cmd = RawCmd()
-    cmd.jar = get_apalache_path()
+    cmd.jar = "/path/to/apalache.jar"
     args = ApalacheArgs()
     args.cmd = "check"
     args.out_dir = "foo"
     args.nworkers = 8
+    args.output_traces = True
+    args.no_deadlock = True
     args.config = "HelloWorldTyped.cfg"
     args.file = "HelloWorldTyped.tla"
     cmd.args = args
     cmd_str = stringify_raw_cmd(cmd)
-    assert cmd_str.endswith(
-        "--out-dir=foo check --config=HelloWorldTyped.cfg --nworkers=8 HelloWorldTyped.tla"
+    assert cmd_str == (
+        'java -jar "/path/to/apalache.jar" --out-dir=foo check'
+        " --config=HelloWorldTyped.cfg --no-deadlock=true --output-traces=true"
+        " --nworkers=8 HelloWorldTyped.tla"
+    )
+
+
+def test_raw_cmd_argv():
+    cmd = RawCmd(jar="/path/to/apalache.jar")
+    cmd.args = ApalacheArgs(
+        cmd="test",
+        debug=True,
+        file="My Spec.tla",
+        before="Before",
+        action="Action",
+        assertion="Assertion",
     )
+    assert raw_cmd_argv(cmd) == [
+        "java",
+        "-jar",
+        "/path/to/apalache.jar",
+        "--debug=true",
+        "test",
+        "--before=Before",
+        "--action=Action",
+        "--assertion=Assertion",
+        "My Spec.tla",
+        "Before",
+        "Action",
+        "Assertion",
+    ]
 
 
 def test_pure_with_json_write_intermediate_false():
@@ -154,3 +191,9 @@ def test_raw_with_json():
     stdin.read = lambda: json.dumps(data)
     app = Apalache(stdin)
     app.raw(json=True)
+
+
+def test_raw_async_checks_cmd():
+    json = {"cwd": "relative/dir", "jar": "/abs/path.jar", "args": {}}
+    with pytest.raises(Exception, match="cwd must be absolute"):
+        asyncio.run(apalache_raw_async(json=json))
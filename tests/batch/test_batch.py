@@ -0,0 +1,109 @@
+import json
+import threading
+import time
+import unittest.mock
+from contextlib import redirect_stdout
+from io import StringIO
+
+import pytest
+
+from modelator_py.batch import job_cost, run
+from modelator_py.batch.cli import Batch
+
+
+class FakeRunner:
+    """Records the cpus used by the running jobs, as counted by job_cost."""
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.lock = threading.Lock()
+        self.used = 0
+        self.max_used = 0
+
+    def __call__(self, *, json, cache=None):
+        cost = job_cost(json, self.budget)
+        with self.lock:
+            self.used += cost
+            self.max_used = max(self.max_used, self.used)
+        time.sleep(json["sleep"])
+        with self.lock:
+            self.used -= cost
+        if json.get("fail"):
+            raise Exception("failed")
+        return {"return_code": 0, "stdout": json["id"]}
+
+
+@pytest.fixture
+def runner(monkeypatch):
+    runner = FakeRunner(budget=4)
+    monkeypatch.setitem(run.RUNNERS, "tlc", runner)
+    monkeypatch.setitem(run.RUNNERS, "apalache", runner)
+    return runner
+
+
+def test_job_cost():
+    assert job_cost({"tool": "tlc", "args": {}}, 4) == 1
+    assert job_cost({"tool": "tlc", "args": {"workers": "2"}}, 4) == 2
+    assert job_cost({"tool": "tlc", "args": {"workers": "auto"}}, 4) == 4
+    assert job_cost({"tool": "tlc", "args": {"workers": 8}}, 4) == 4
+    assert job_cost({"tool": "apalache", "args": {"nworkers": 3}}, 4) == 3
+    assert job_cost({"tool": "apalache", "args": {"workers": 3}}, 4) == 1
+
+
+def test_run_batch_budget(runner):
+    jobs = [
+        {"tool": "tlc", "id": "a", "sleep": 0.2, "args": {"workers": "auto"}},
+        {"tool": "apalache", "id": "b", "sleep": 0.2, "args": {"nworkers": 2}},
+        {"tool": "tlc", "id": "c", "sleep": 0.2, "args": {"workers": 2}},
+        {"tool": "tlc", "id": "d", "sleep": 0.2, "args": {}},
+    ]
+    results = list(run.run_batch(jobs, budget=4))
+    assert runner.max_used == 4
+    assert sorted(r["id"] for r in results) == ["a", "b", "c", "d"]
+    assert results[0]["id"] == "a"
+
+
+def test_run_batch_completion_order(runner):
+    jobs = [
+        {"tool": "tlc", "id": str(i), "sleep": sleep, "args": {}}
+        for i, sleep in enumerate([0.6, 0.2, 0.4])
+    ]
+    results = list(run.run_batch(jobs, budget=4))
+    assert [r["index"] for r in results] == [1, 2, 0]
+    assert results[0]["result"]["stdout"] == "1"
+
+
+def test_run_batch_errors(runner):
+    jobs = [
+        {"tool": "tlc", "id": "a", "sleep": 0, "fail": True, "args": {}},
+        {"tool": "tlc", "id": "b", "sleep": 0.1, "args": {}},
+    ]
+    results = list(run.run_batch(jobs, budget=1))
+    assert results[0] == {"index": 0, "id": "a", "error": "Exception: failed"}
+    assert results[1]["result"]["stdout"] == "b"
+    # invalid jobs are reported, and do not stop the others
+    jobs = [
+        {"tool": "spin", "id": "a"},
+        {"tool": "tlc", "id": "b", "sleep": 0, "args": {"workers": "many"}},
+        {"tool": "tlc", "id": "c", "sleep": 0, "args": {}},
+    ]
+    results = sorted(run.run_batch(jobs, budget=1), key=lambda r: r["index"])
+    assert results[0]["error"].startswith("Exception: job tool should be one of")
+    assert results[1]["error"].startswith("ValueError:")
+    assert results[2]["result"]["stdout"] == "c"
+    with pytest.raises(Exception):
+        list(run.run_batch(jobs, budget=0))
+
+
+def test_cli(runner):
+    jobs = [
+        {"tool": "tlc", "id": str(i), "sleep": 0.1 * (3 - i), "args": {}}
+        for i in range(3)
+    ]
+    stdin = unittest.mock.Mock()
+    stdin.read = lambda: json.dumps(jobs)
+    s = StringIO()
+    with redirect_stdout(s):
+        Batch(stdin).run(budget=3)
+    lines = [json.loads(line) for line in s.getvalue().splitlines()]
+    assert [line["id"] for line in lines] == ["2", "1", "0"]
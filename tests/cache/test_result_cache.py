@@ -0,0 +1,143 @@
+import json
+import os
+import shutil
+import subprocess
+import time
+import unittest.mock
+from contextlib import redirect_stdout
+from io import StringIO
+
+import pytest
+
+from modelator_py.cache import ResultCache
+from modelator_py.cache.cli import Cache
+from modelator_py.tlc import pure
+from modelator_py.tlc.args import TlcArgs
+
+
+@pytest.fixture
+def jar(tmp_path):
+    jar = tmp_path / "tla2tools.jar"
+    jar.write_bytes(b"jar")
+    return str(jar)
+
+
+def result(return_code=0, stdout="out"):
+    return {"files": {}, "return_code": return_code, "stdout": stdout}
+
+
+def test_key(tmp_path, jar):
+    cache = ResultCache(str(tmp_path / "cache"))
+    files = {"A.tla": "---- MODULE A ----"}
+    argv = ["java", "-cp", jar, "tlc2.TLC", "A.tla"]
+    key = cache.key("tlc", jar, argv, files)
+    assert key == cache.key("tlc", jar, list(argv), dict(files))
+    assert key != cache.key("apalache", jar, argv, files)
+    assert key != cache.key("tlc", jar, argv[:-1] + ["-workers", "2", "A.tla"], files)
+    assert key != cache.key("tlc", jar, argv, {"A.tla": ""})
+    # the same jar at another path
+    other = os.path.join(tmp_path, "other.jar")
+    shutil.copyfile(jar, other)
+    assert key == cache.key(
+        "tlc", other, [other if a == jar else a for a in argv], files
+    )
+    # jar digests are memoized by modification time
+    time.sleep(0.01)
+    with open(jar, "wb") as fd:
+        fd.write(b"other jar")
+    assert key != cache.key("tlc", jar, argv, files)
+
+
+def test_get_put(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    assert cache.get("k") is None
+    cache.put("k", result())
+    assert cache.get("k") == result()
+    cache.put("killed", result(return_code=137))
+    assert cache.get("killed") is None
+    cache.put("killed", result(return_code=-9))
+    assert cache.get("killed") is None
+    cache.put("tlc error", result(return_code=153))
+    assert cache.get("tlc error") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 4, 1)
+    # results are shared by the caches of the same directory
+    assert ResultCache(cache.path).get("k") == result()
+    cache.clear()
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_eviction(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    cache.put("a", result(stdout="a" * 100))
+    size = cache.stats()["size"]
+    cache.max_size = 2 * size
+    cache.put("b", result(stdout="b" * 100))
+    # use a, so that b is the least recently used
+    past = time.time() - 10
+    os.utime(cache._file("b"), (past, past))
+    assert cache.get("a") is not None
+    cache.put("c", result(stdout="c" * 100))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_tlc_pure_with_cache(tmp_path, jar, monkeypatch):
+    calls = []
+
+    def tlc_raw(*, cmd):
+        calls.append(cmd)
+        return subprocess.CompletedProcess("java", 12, b"stdout", b"")
+
+    monkeypatch.setattr(pure, "tlc_raw", tlc_raw)
+    cache = ResultCache(str(tmp_path / "cache"))
+    args = {"file": "A.tla", "fp": 1}
+    json = {"jar": jar, "args": args, "files": {"A.tla": "A"}}
+    first = pure.tlc_pure(json=json, cache=cache)
+    assert first["return_code"] == 12
+    # -cleanup is always given, so this is the same command
+    json["args"]["cleanup"] = True
+    second = pure.tlc_pure(json=json, cache=cache)
+    assert len(calls) == 1
+    assert second["return_code"] == 12
+    # the stored result, as returned by the run
+    assert second == first
+    pure.tlc_pure(json={**json, "files": {"A.tla": "B"}}, cache=cache)
+    assert len(calls) == 2
+
+
+def test_tlc_pure_random_runs(tmp_path, jar, monkeypatch):
+    calls = []
+
+    def tlc_raw(*, cmd):
+        calls.append(cmd)
+        return subprocess.CompletedProcess("java", 0, b"stdout", b"")
+
+    monkeypatch.setattr(pure, "tlc_raw", tlc_raw)
+    cache = ResultCache(str(tmp_path / "cache"))
+    for args in [
+        {"file": "A.tla"},
+        {"file": "A.tla", "fp": 1, "simulate": True},
+        {"file": "A.tla", "fp": 1, "workers": "auto"},
+    ]:
+        json = {"jar": jar, "args": args, "files": {"A.tla": "A"}}
+        pure.tlc_pure(json=json, cache=cache)
+        pure.tlc_pure(json=json, cache=cache)
+    assert len(calls) == 6
+    assert cache.stats()["entries"] == 0
+    args = {"file": "A.tla", "fp": 1, "simulate": True, "seed": 7}
+    assert pure.is_deterministic(TlcArgs(**args))
+
+
+def test_cli(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    cache.put("k", result())
+    app = Cache(unittest.mock.Mock())
+    s = StringIO()
+    with redirect_stdout(s):
+        app.stats(path=cache.path)
+    assert json.loads(s.getvalue())["entries"] == 1
+    app.clear(path=cache.path)
+    assert cache.get("k") is None
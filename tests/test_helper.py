@@ -0,0 +1,151 @@
+import asyncio
+import os
+import subprocess
+import time
+
+import pytest
+
+from modelator_py.helper import (
+    WorkerPool,
+    batches_by_size,
+    parallel_map,
+    parallel_map_by_size,
+    run_argv,
+    run_argv_async,
+)
+
+
+def test_worker_pool_map():
+    data = list(range(10))
+    with WorkerPool(workers=2) as pool:
+        assert pool.map(lambda x: x * x, data) == [x * x for x in data]
+        # the workers are reused by later calls
+        assert pool.map(lambda x: x + 1, data) == [x + 1 for x in data]
+    # a closed pool starts new workers when needed
+    assert pool.map(lambda x: x - 1, data) == [x - 1 for x in data]
+    pool.close()
+
+
+def test_worker_pool_serial_fast_path():
+    with WorkerPool(workers=2, serial_threshold=4) as pool:
+        assert pool.map(lambda x: os.getpid(), [1, 2, 3]) == [os.getpid()] * 3
+        assert pool._pool is None
+    with WorkerPool(workers=1) as pool:
+        assert pool.map(lambda x: os.getpid(), list(range(10))) == [os.getpid()] * 10
+
+
+def test_worker_pool_chunksize():
+    pool = WorkerPool(workers=8)
+    assert pool.chunksize(0) == 1
+    assert pool.chunksize(3) == 1
+    assert pool.chunksize(160) == 10
+
+
+def test_parallel_map():
+    data = list(range(5))
+    assert parallel_map(str, data) == [str(x) for x in data]
+    assert parallel_map(str, []) == []
+
+
+def test_batches_by_size():
+    data = list(range(8))
+    sizes = [1, 1, 1, 1, 1, 1, 1, 9]
+    batches = batches_by_size(data, sizes, 2)
+    assert batches == [[0, 1, 2, 3, 4, 5, 6, 7]]
+    batches = batches_by_size(data, [1] * 8, 4)
+    assert batches == [[0, 1], [2, 3], [4, 5], [6, 7]]
+    batches = batches_by_size(data, [9, 1, 1, 1, 1, 1, 1, 1], 2)
+    assert batches == [[0], [1, 2, 3, 4, 5, 6, 7]]
+    assert batches_by_size([], [], 3) == []
+
+
+def test_map_by_size():
+    data = ["a" * n for n in range(20)]
+    with WorkerPool(workers=2) as pool:
+        assert pool.map_by_size(len, data) == list(range(20))
+    assert parallel_map_by_size(len, data) == list(range(20))
+
+
+def test_run_argv():
+    # arguments are passed as is, without a shell to interpret them
+    result = run_argv(["printf", "%s", "a b; $HOME"], cwd="/")
+    assert result.stdout == b"a b; $HOME"
+    assert result.args == "printf %s 'a b; $HOME'"
+    # like a shell, for a missing program
+    assert run_argv(["no-such-program"], cwd="/").returncode == 127
+    result = asyncio.run(run_argv_async(["no-such-program"], cwd="/"))
+    assert result.returncode == 127
+
+
+def test_run_argv_async():
+    lines = []
+    result = asyncio.run(
+        run_argv_async(
+            ["sh", "-c", "echo a; echo b; echo c >&2; exit 3"],
+            cwd=os.getcwd(),
+            on_stdout=lines.append,
+        )
+    )
+    assert lines == [b"a\n", b"b\n"]
+    assert result.stdout == b"a\nb\n"
+    assert result.stderr == b"c\n"
+    assert result.returncode == 3
+
+
+def test_run_argv_async_concurrently():
+    async def main():
+        cmds = [
+            run_argv_async(["sh", "-c", f"sleep 0.5; echo {i}"], cwd="/")
+            for i in range(4)
+        ]
+        return await asyncio.gather(*cmds)
+
+    start = time.monotonic()
+    results = asyncio.run(main())
+    assert time.monotonic() - start < 1.5
+    assert [r.stdout for r in results] == [b"0\n", b"1\n", b"2\n", b"3\n"]
+
+
+def test_run_argv_async_timeout():
+    lines = []
+    start = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired) as e:
+        asyncio.run(
+            run_argv_async(
+                ["sh", "-c", "echo started; sleep 10"],
+                cwd="/",
+                timeout=0.5,
+                on_stdout=lines.append,
+            )
+        )
+    assert time.monotonic() - start < 5
+    assert lines == [b"started\n"]
+    assert e.value.output == b"started\n"
+
+
+def test_run_argv_async_cancel(tmp_path):
+    pid_file = tmp_path / "pid"
+
+    async def main():
+        task = asyncio.create_task(
+            run_argv_async(
+                ["sh", "-c", f"sleep 10 & echo $! > {pid_file}; wait"], cwd="/"
+            )
+        )
+        while not pid_file.exists() or not pid_file.read_text():
+            await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    # the processes started by the shell are killed too
+    pid = int(pid_file.read_text())
+    for _ in range(50):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            break
+        time.sleep(0.1)
+    else:
+        raise AssertionError(f"process {pid} is still running")
@@ -0,0 +1,92 @@
+import os
+import stat
+import subprocess
+
+import pytest
+
+from modelator_py import jvm
+from modelator_py.tlc.raw import tlc_raw
+
+# Stands in for java: writes the archive to dump, or refuses the options
+# like a JVM without class data sharing if $FAKE_JAVA_REFUSES is set.
+FAKE_JAVA = """#!/bin/sh
+if [ -n "$FAKE_JAVA_REFUSES" ] && echo "$@" | grep -q XX:; then
+    echo "Unrecognized VM option 'ArchiveClassesAtExit'" >&2
+    echo "Error: Could not create the Java Virtual Machine." >&2
+    exit 1
+fi
+for arg in "$@"; do
+    case "$arg" in
+        -XX:ArchiveClassesAtExit=*) echo archive > "${arg#*=}" ;;
+    esac
+done
+echo "java $@"
+"""
+
+
+@pytest.fixture
+def java(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    java = bin_dir / "java"
+    java.write_text(FAKE_JAVA)
+    java.chmod(java.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setattr(jvm, "_unsupported", set())
+    jar = tmp_path / "tla2tools.jar"
+    jar.write_text("jar")
+    return str(jar)
+
+
+def run(jar, cache_dir, cwd):
+    json = {"cwd": str(cwd), "jar": jar, "jvm_cache": cache_dir, "args": {}}
+    return tlc_raw(json=json).stdout.decode()
+
+
+def test_class_data_archive(java, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    stdout = run(java, cache_dir, tmp_path)
+    assert "-XX:ArchiveClassesAtExit=" in stdout
+    assert os.listdir(cache_dir) == [
+        os.path.basename(jvm.ClassDataArchive.of(java, cache_dir).path)
+    ]
+    stdout = run(java, cache_dir, tmp_path)
+    assert "-XX:SharedArchiveFile=" in stdout
+    assert "tlc2.TLC" in stdout
+
+
+def test_class_data_archive_new_jvm(java, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    run(java, cache_dir, tmp_path)
+    # e.g. an upgrade of the JDK
+    java_bin = tmp_path / "bin" / "java"
+    os.utime(java_bin, ns=(0, 0))
+    stdout = run(java, cache_dir, tmp_path)
+    assert "-XX:ArchiveClassesAtExit=" in stdout
+    assert len(os.listdir(cache_dir)) == 2
+
+
+def test_class_data_archive_killed(java, tmp_path):
+    archive = jvm.ClassDataArchive.of(java, str(tmp_path / "cache"))
+    with open(archive.dump_path, "w") as fd:
+        fd.write("partial archive")
+    assert archive.finish(subprocess.CompletedProcess("java", -9, b"", b""))
+    assert os.listdir(archive.cache_dir) == []
+
+
+def test_class_data_archive_refused(java, tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_JAVA_REFUSES", "1")
+    cache_dir = str(tmp_path / "cache")
+    stdout = run(java, cache_dir, tmp_path)
+    assert "-XX:" not in stdout
+    assert "tlc2.TLC" in stdout
+    assert os.listdir(cache_dir) == []
+    assert jvm.ClassDataArchive.of(java, cache_dir) is None
+    # other JVMs may support the options
+    os.utime(tmp_path / "bin" / "java", ns=(0, 0))
+    assert jvm.ClassDataArchive.of(java, cache_dir) is not None
+
+
+def test_class_data_archive_disabled(java, tmp_path):
+    assert jvm.ClassDataArchive.of(java, None) is None
+    assert "-XX:" not in run(java, None, tmp_path)
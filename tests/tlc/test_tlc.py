@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 import os
@@ -8,7 +9,13 @@ from io import StringIO
 import pytest
 
 from modelator_py.tlc.cli import Tlc
-from modelator_py.tlc.raw import RawCmd, TlcArgs, stringify_raw_cmd
+from modelator_py.tlc.raw import (
+    RawCmd,
+    TlcArgs,
+    raw_cmd_argv,
+    stringify_raw_cmd,
+    tlc_raw_async,
+)
 
 from ..helper import get_resource_dir, get_tlc_path
 
@@ -20,17 +27,42 @@ def test_stringify_raw_cmd():
     Use for debugging - ensure that the shell command generated is sensible.
     """
     cmd = RawCmd()
-    cmd.jar = get_tlc_path()
+    cmd.jar = "/path/to/tla2tools.jar"
     args = TlcArgs()
     args.cleanup = True
     args.workers = "auto"
     args.config = "HelloWorld.cfg"
     args.file = "HelloWorld.tla"
     cmd.args = args
-    cmd_str = stringify_raw_cmd(cmd)
-    assert cmd_str.endswith(
-        "tlc2.TLC -cleanup -config HelloWorld.cfg -workers auto HelloWorld.tla"
+    cmd_str = stringify_raw_cmd(cmd, java_temp_dir="/tmp/java")
+    assert cmd_str == (
+        'java -Djava.io.tmpdir=/tmp/java -cp "/path/to/tla2tools.jar" tlc2.TLC'
+        " -cleanup -config HelloWorld.cfg -workers auto HelloWorld.tla"
+    )
+
+
+def test_raw_cmd_argv():
+    cmd = RawCmd(jar="/path/to/tla2tools.jar")
+    cmd.args = TlcArgs(
+        cont=True, nowarning=True, depth=10, fpmem=False, file="Hello World.tla"
     )
+    argv = raw_cmd_argv(cmd, java_temp_dir="/tmp/java", java_options=["-Xss4m"])
+    assert argv == [
+        "java",
+        "-Djava.io.tmpdir=/tmp/java",
+        "-Xss4m",
+        "-cp",
+        "/path/to/tla2tools.jar",
+        "tlc2.TLC",
+        "-continue",
+        "-depth",
+        "10",
+        "-fpmem",
+        "false",
+        "-nowarning",
+        "Hello World.tla",
+    ]
+    assert stringify_raw_cmd(cmd).endswith("-nowarning Hello World.tla")
 
 
 def test_pure_with_json():
@@ -97,3 +129,9 @@ def test_raw_with_json():
     stdin.read = lambda: json.dumps(data)
     app = Tlc(stdin)
     app.raw(json=True)
+
+
+def test_raw_async_checks_cmd():
+    json = {"cwd": "relative/dir", "jar": "/abs/path.jar", "args": {}}
+    with pytest.raises(Exception, match="cwd must be absolute"):
+        asyncio.run(tlc_raw_async(json=json))
@@ -0,0 +1,176 @@
+import os
+import pickle
+import subprocess
+import sys
+
+from modelator_py.util.informal_trace_format import (
+    Interner,
+    ITFList,
+    ITFMap,
+    ITFRecord,
+    ITFSet,
+    ITFState,
+    ITFTrace,
+    JsonSerializer,
+    delta_decode,
+    delta_encode,
+    to_json,
+    with_lists,
+    with_records,
+)
+
+
+def _trace():
+    state = ITFState(
+        {
+            "x": ITFMap([[1, "a"], [2, ITFSet([True])]]),
+            "y": ITFMap([["f", -1]]),
+        }
+    )
+    return ITFTrace(["x", "y"], [state])
+
+
+def test_nodes_have_no_dict():
+    for node in [
+        ITFRecord({}),
+        ITFList([]),
+        ITFSet([]),
+        ITFMap([]),
+        ITFState({}),
+        ITFTrace([], []),
+    ]:
+        assert not hasattr(node, "__dict__")
+
+
+def test_visitors():
+    trace = with_records(with_lists(_trace()))
+    assert trace.states[0].var_value_map["x"] == ITFList(["a", ITFSet([True])])
+    assert trace.states[0].var_value_map["y"] == ITFRecord({"f": -1})
+    assert JsonSerializer().visit(trace) == {
+        "#meta": None,
+        "vars": ["x", "y"],
+        "states": [{"x": ["a", {"#set": [True]}], "y": {"f": -1}}],
+    }
+
+
+def test_pickle():
+    trace = _trace()
+    copy = pickle.loads(pickle.dumps(trace))
+    assert copy.vars == trace.vars
+    assert copy.states == trace.states
+
+
+def test_pickle_drops_hash():
+    state = Interner().visit(_trace().states[0])
+    assert hasattr(state, "_hash")
+    copy = pickle.loads(pickle.dumps(state))
+    assert not hasattr(copy, "_hash")
+    assert copy == state
+
+
+def test_hash():
+    assert hash(_trace()) == hash(_trace())
+    assert _trace() == _trace()
+    assert hash(ITFRecord({"a": 1, "b": 2})) == hash(ITFRecord({"b": 2, "a": 1}))
+    assert ITFRecord({"a": 1, "b": 2}) == ITFRecord({"b": 2, "a": 1})
+    assert ITFSet([1, 2]) != ITFList([1, 2])
+    assert ITFSet([ITFList([1])]) != ITFSet([ITFList([2])])
+    assert len({ITFList([1]), ITFList([1]), ITFList([2])}) == 2
+    other = _trace()
+    other.states[0].var_value_map["y"] = ITFMap([["f", -2]])
+    assert _trace() != other
+    # nodes are compared by their elements, even when they cannot be hashed
+    assert ITFList([[1], {"a": 2}]) == ITFList([[1], {"a": 2}])
+    assert ITFList([[1], {"a": 2}]) != ITFList([[1], {"a": 3}])
+    # the hash of nodes that are not interned follows their changes
+    hash(other)
+    other.states[0].var_value_map["y"] = ITFMap([["f", -1]])
+    assert _trace() == other
+    assert hash(_trace()) == hash(other)
+
+
+def test_digest():
+    assert _trace().digest() == _trace().digest()
+    assert ITFRecord({"a": 1, "b": 2}).digest() == ITFRecord({"b": 2, "a": 1}).digest()
+    assert ITFList([1]).digest() != ITFList([True]).digest()
+    assert ITFList([1]).digest() != ITFSet([1]).digest()
+    assert ITFList(["a", "b"]).digest() != ITFList(["ab"]).digest()
+    # the digest does not depend on the hash of strings of the process
+    code = (
+        "from modelator_py.util.informal_trace_format import ITFRecord;"
+        "print(ITFRecord({'a': 1, 'b': 'x', 'c': None}).digest())"
+    )
+    digests = {
+        subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            env={**os.environ, "PYTHONHASHSEED": seed},
+        ).stdout
+        for seed in ["1", "2"]
+    }
+    assert digests == {
+        ITFRecord({"a": 1, "b": "x", "c": None}).digest().encode() + b"\n"
+    }
+
+
+def test_interner():
+    def state(i):
+        return ITFState({"i": i, "s": ITFSet([ITFRecord({"a": ITFList([1])})])})
+
+    interner = Interner()
+    states = [interner.visit(state(i)) for i in range(3)]
+    assert states == [state(i) for i in range(3)]
+    assert states[0] is not states[1]
+    assert states[0].var_value_map["s"] is states[2].var_value_map["s"]
+    assert interner.visit(state(1)) is states[1]
+    # equal values of different types are not shared
+    one = interner.visit(ITFList([1]))
+    assert interner.visit(ITFList([True])) is not one
+    assert interner.visit(ITFList([True])).elements[0] is True
+
+
+def test_to_json():
+    def trace():
+        state = ITFState(
+            {
+                "list": ITFMap([[2, "b"], [1, "a"]]),
+                "record": ITFMap([["f", ITFMap([[1, ITFMap([["g", 0]])]])]]),
+                "map": ITFMap([[ITFMap([[1, 2]]), ITFMap([])], [0, "x"]]),
+                "empty": ITFMap([]),
+                "set": ITFSet([ITFMap([[True, 1]])]),
+            }
+        )
+        return ITFTrace(["list", "record", "map", "empty", "set"], [state])
+
+    for lists in [True, False]:
+        for records in [True, False]:
+            expected = trace()
+            if lists:
+                expected = with_lists(expected)
+            if records:
+                expected = with_records(expected)
+            expected = JsonSerializer().visit(expected)
+            assert to_json(trace(), lists=lists, records=records) == expected
+
+
+def test_delta():
+    trace = {
+        "#meta": None,
+        "vars": ["x", "y", "z"],
+        "states": [
+            {"x": 1, "y": [1, {"#set": [True]}], "z": 0},
+            {"x": 2, "y": [1, {"#set": [True]}], "z": 0},
+            {"x": 2, "y": [1, {"#set": [1]}], "z": False},
+            {"#meta": {"index": 3}, "x": 2, "y": [1, {"#set": [1]}], "z": False},
+        ],
+    }
+    delta = delta_encode(trace)
+    assert delta["#meta"] == {"delta": True}
+    assert delta["states"] == [
+        {"x": 1, "y": [1, {"#set": [True]}], "z": 0},
+        {"x": 2},
+        {"y": [1, {"#set": [1]}], "z": False},
+        {"#meta": {"index": 3}},
+    ]
+    assert delta_decode(delta) == trace
+    assert delta_decode(trace) is trace
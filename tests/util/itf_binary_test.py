@@ -0,0 +1,94 @@
+import io
+
+import pytest
+
+from modelator_py.util.informal_trace_format import (
+    ITFList,
+    ITFMap,
+    ITFRecord,
+    ITFSet,
+    ITFState,
+    ITFTrace,
+    JsonSerializer,
+    delta_encode,
+)
+from modelator_py.util.itf_binary import ITFBinaryWriter, decode, decode_all, encode
+
+
+def test_encode_msgpack():
+    assert encode(None) == b"\xc0"
+    assert encode([True, False]) == b"\x92\xc3\xc2"
+    assert encode(-1) == b"\xff"
+    assert encode(300) == b"\xcd\x01\x2c"
+    assert encode({"a": "bc"}) == b"\x81\xa1a\xa2bc"
+
+
+def test_round_trip():
+    ints = [0, 127, 128, 255, 256, 2**16, 2**32, 2**64 - 1, 2**64, 10**30]
+    ints += [-i for i in ints]
+    strings = ["", "a", "é" * 40, "x" * 300, "y" * 70000]
+    value = {
+        "ints": ints,
+        "strings": strings + strings,
+        "nested": [{"#set": [{"k": i, "v": [True, None]}]} for i in range(300)],
+    }
+    assert decode(encode(value)) == value
+
+
+def test_string_table():
+    keys = [f"key{i}" for i in range(300)]
+    value = [{k: k for k in keys} for _ in range(3)]
+    data = encode(value)
+    assert decode(data) == value
+    assert data.count(b"key299") == 1
+
+
+def test_encode_itf_nodes():
+    state = ITFState(
+        {
+            "x": ITFMap([[ITFSet([1]), ITFList(["a", True])]]),
+            "y": ITFRecord({"f": -3}),
+        }
+    )
+    trace = ITFTrace(["x", "y"], [state, state], {"source": "Test.tla"})
+    json = JsonSerializer().visit(trace)
+    assert decode(encode(trace)) == json
+    assert decode(encode(state)) == json["states"][0]
+
+
+def test_shared_objects():
+    state = {"name": "value", "other": ["value", "name"]}
+    value = {"traces": [{"states": [state, state]}, {"states": [state]}]}
+    assert decode(encode(value)) == value
+
+
+def test_decode_errors():
+    with pytest.raises(Exception):
+        decode(encode([1, 2])[:-1])
+    with pytest.raises(Exception):
+        decode(encode(1) + encode(2))
+    with pytest.raises(Exception):
+        encode(1.5)
+
+
+def test_writer():
+    traces = [
+        {"#meta": None, "vars": ["x"], "states": [{"x": i}, {"x": i + 1}]}
+        for i in range(3)
+    ]
+
+    def write(lines):
+        fd = io.BytesIO()
+        with ITFBinaryWriter(fd, lines=lines) as writer:
+            for trace in traces:
+                writer.write_trace(trace)
+        return fd.getvalue()
+
+    assert decode(write(None)) == {"traces": traces}
+    assert list(decode_all(write("trace"))) == traces
+    states = list(decode_all(write("state")))
+    assert states[3] == {"#meta": {"trace": 1, "index": 1}, "x": 2}
+
+    traces = [delta_encode(trace) for trace in traces]
+    states = list(decode_all(write("state")))
+    assert states[3] == {"#meta": {"trace": 1, "index": 1, "delta": True}, "x": 2}
@@ -0,0 +1,89 @@
+import array
+import io
+import json
+
+import pytest
+
+from modelator_py.util import itf_columns
+from modelator_py.util.informal_trace_format import (
+    ITFList,
+    ITFSet,
+    ITFState,
+    ITFTrace,
+    JsonSerializer,
+)
+from modelator_py.util.itf_columns import ITFColumns
+from modelator_py.util.itf_reader import ITFReader
+
+
+def trace():
+    states = [
+        ITFState({"x": i, "b": i % 2 == 0, "s": ITFSet([i]), "n": 2**70 + i})
+        for i in range(10)
+    ]
+    return ITFTrace(["x", "b", "s", "n"], states, {"source": "Test.tla"})
+
+
+def json_of(trace):
+    return JsonSerializer().visit(trace)
+
+
+def test_columns():
+    columns = ITFColumns.from_trace(trace())
+    assert len(columns) == 10
+    assert columns["x"] == array.array("q", range(10))
+    assert columns["b"] == array.array("b", [1, 0] * 5)
+    assert columns["s"][3] == ITFSet([3])
+    assert columns["n"][0] == 2**70
+
+
+def test_to_trace():
+    assert json_of(ITFColumns.from_trace(trace()).to_trace()) == json_of(trace())
+
+
+def test_where():
+    columns = ITFColumns.from_trace(trace())
+    assert columns.where("x", ">", 5) == [6, 7, 8, 9]
+    assert columns.where("b", "==", True) == [0, 2, 4, 6, 8]
+    assert columns.where("s", "==", ITFSet([1])) == [1]
+
+
+def test_take():
+    columns = ITFColumns.from_trace(trace())
+    taken = columns.take(columns.where("x", ">=", 8))
+    assert taken["x"] == array.array("q", [8, 9])
+    expected = ITFTrace(trace().vars, trace().states[8:], trace().meta)
+    assert json_of(taken.to_trace()) == json_of(expected)
+
+
+def test_from_states_of_reader():
+    states = [{"x": i, "y": [i]} for i in range(5)]
+    fd = io.StringIO(json.dumps({"vars": ["x", "y"], "states": states}))
+    columns = ITFColumns.from_states(ITFReader(fd).states())
+    assert columns.vars == ["x", "y"]
+    assert columns["x"] == array.array("q", range(5))
+    assert columns["y"][4] == ITFList([4])
+
+
+def test_empty():
+    columns = ITFColumns.from_trace(ITFTrace(["x"], []))
+    assert len(columns) == 0
+    assert columns.where("x", ">", 0) == []
+    assert columns.to_trace().states == []
+
+
+@pytest.mark.parametrize("vectorized", [True, False])
+def test_where_and_take_with_and_without_numpy(vectorized, monkeypatch):
+    if vectorized:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(itf_columns, "numpy", None)
+    columns = ITFColumns.from_trace(trace())
+    assert columns.where("x", ">", 5) == [6, 7, 8, 9]
+    assert columns.where("x", "<", 2.5) == [0, 1, 2]
+    assert columns.where("x", "<", 2**70) == list(range(10))
+    assert columns.where("b", "!=", True) == [1, 3, 5, 7, 9]
+    taken = columns.take([9, 0])
+    assert taken["x"] == array.array("q", [9, 0])
+    assert taken["b"] == array.array("b", [0, 1])
+    assert taken.take([])["x"] == array.array("q")
@@ -0,0 +1,107 @@
+import io
+import json
+
+import pytest
+
+from modelator_py.util.informal_trace_format import (
+    ITFList,
+    ITFMap,
+    ITFRecord,
+    ITFSet,
+    ITFState,
+    JsonSerializer,
+    delta_encode,
+    from_json,
+)
+from modelator_py.util.itf_reader import ITFReader
+
+TRACE = {
+    "#meta": {"format": "ITF", "source": "Test.tla"},
+    "params": [],
+    "vars": ["x", "y"],
+    "states": [
+        {
+            "#meta": {"index": 0},
+            "x": 1,
+            "y": {"#set": [{"#tup": ["a", {"#bigint": "123456789012345678901"}]}]},
+        },
+        {
+            "#meta": {"index": 1},
+            "x": 22,
+            "y": {"#map": [[1, {"f": [True, False]}], [2, {"#unserializable": "s"}]]},
+        },
+    ],
+    "loop": 1,
+}
+
+
+def reader(obj, **kw):
+    return ITFReader(io.StringIO(json.dumps(obj, **kw)), chunk_size=3)
+
+
+def test_from_json():
+    assert from_json(TRACE["states"][0]["y"]) == ITFSet(
+        [ITFList(["a", 123456789012345678901])]
+    )
+    assert from_json(TRACE["states"][1]["y"]) == ITFMap(
+        [[1, ITFRecord({"f": ITFList([True, False])})], [2, "s"]]
+    )
+
+
+def test_from_json_inverse_of_json_serializer():
+    state = ITFState({"x": ITFMap([[ITFSet([1]), ITFRecord({"a": ITFList([])})]])})
+    assert from_json(JsonSerializer().visit(state.var_value_map["x"])) == ITFMap(
+        [[ITFSet([1]), ITFRecord({"a": ITFList([])})]]
+    )
+
+
+@pytest.mark.parametrize("kw", [{}, {"indent": 4}, {"sort_keys": True}])
+def test_raw_states(kw):
+    r = reader(TRACE, **kw)
+    assert list(r.raw_states()) == TRACE["states"]
+    assert r.meta == TRACE["#meta"]
+    assert r.params == []
+    assert r.vars == ["x", "y"]
+    assert r.loop == 1
+
+
+def test_states():
+    states = list(reader(TRACE).states())
+    assert [s.var_value_map["x"] for s in states] == [1, 22]
+    assert states[0] == ITFState(
+        {"x": 1, "y": ITFSet([ITFList(["a", 123456789012345678901])])}
+    )
+
+
+def test_values():
+    assert list(reader(TRACE, sort_keys=True).values("x")) == [1, 22]
+
+
+def test_trace():
+    trace = reader(TRACE).trace()
+    assert trace.vars == ["x", "y"]
+    assert trace.meta == TRACE["#meta"]
+    assert len(trace.states) == 2
+
+
+def test_empty_states():
+    assert list(reader({"vars": [], "states": []}).states()) == []
+    assert list(reader({}).states()) == []
+
+
+def test_read_once():
+    r = reader(TRACE)
+    list(r.states())
+    with pytest.raises(Exception):
+        list(r.states())
+
+
+def test_truncated():
+    text = json.dumps(TRACE)
+    with pytest.raises(Exception):
+        list(ITFReader(io.StringIO(text[:-20]), chunk_size=3).states())
+
+
+def test_delta_states():
+    delta = delta_encode(TRACE)
+    assert list(reader(delta, sort_keys=True).raw_states()) == TRACE["states"]
@@ -0,0 +1,68 @@
+import io
+import json
+
+from modelator_py.util.informal_trace_format import delta_encode, undelta_states
+from modelator_py.util.itf_writer import ITFJsonWriter
+
+TRACES = [
+    {
+        "#meta": None,
+        "states": [{"x": 1, "y": {"#set": ["a"]}}, {"x": 2, "y": {"#set": []}}],
+        "vars": ["x", "y"],
+    },
+    {"#meta": {"source": "tlc"}, "states": [], "vars": []},
+]
+
+
+def _write(traces, **kw):
+    fd = io.StringIO()
+    with ITFJsonWriter(fd, **kw) as writer:
+        for trace in traces:
+            writer.write_trace(trace)
+    return fd.getvalue()
+
+
+def test_writer_same_as_json_dumps():
+    for traces in [TRACES, TRACES[:1], []]:
+        expected = json.dumps({"traces": traces}, indent=4, sort_keys=True) + "\n"
+        assert _write(traces) == expected
+        expected = json.dumps({"traces": traces}, sort_keys=True, separators=(",", ":"))
+        assert _write(traces, indent=None) == expected + "\n"
+
+
+def test_writer_state_by_state():
+    fd = io.StringIO()
+    with ITFJsonWriter(fd) as writer:
+        writer.begin_trace()
+        for state in TRACES[0]["states"]:
+            writer.write_state(state)
+            # states are written as soon as they are given
+            assert json.dumps(state["x"]) in fd.getvalue()
+        writer.end_trace(TRACES[0]["vars"])
+    assert json.loads(fd.getvalue()) == {"traces": TRACES[:1]}
+
+
+def test_writer_lines():
+    lines = _write(TRACES, lines="trace").splitlines()
+    assert [json.loads(line) for line in lines] == TRACES
+
+    lines = _write(TRACES, lines="state").splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"#meta": {"trace": 0, "index": 0}, "x": 1, "y": {"#set": ["a"]}},
+        {"#meta": {"trace": 0, "index": 1}, "x": 2, "y": {"#set": []}},
+    ]
+
+
+def test_writer_delta_state_lines():
+    trace = {
+        "#meta": None,
+        "states": [{"x": 1, "y": 1}, {"x": 2, "y": 1}, {"x": 2, "y": 3}],
+        "vars": ["x", "y"],
+    }
+    delta = delta_encode(trace)
+    lines = _write([delta, delta], lines="state").splitlines()
+    states = [json.loads(line) for line in lines]
+    assert states[1] == {"#meta": {"trace": 0, "index": 1, "delta": True}, "x": 2}
+    for i in range(2):
+        full = undelta_states([s for s in states if s["#meta"]["trace"] == i])
+        assert [{"x": s["x"], "y": s["y"]} for s in full] == trace["states"]
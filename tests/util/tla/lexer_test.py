@@ -1,5 +1,6 @@
 """Tests of module `tla.lex`."""
 import pprint
+import sys
 
 import modelator_py.util.tla.lex as lex
 
@@ -67,5 +68,51 @@ def test_lexer():
         print(token.loc)
 
 
+def test_token_locations():
+    """Test that `tokenize` locates tokens like `find_beginning_of_line`."""
+    data = lex._omit_preamble(MODULE_FOO)
+    lextokens = lex._lex(data)
+    line_starts = lex._line_starts(data)
+    for token in lextokens:
+        expected = lex._map_to_token(data, token).loc
+        loc = lex._map_to_token(data, token, line_starts=line_starts).loc
+        assert loc == expected
+        assert loc.start.column == lex.find_column(data, token)
+        assert loc.stop.column - loc.start.column == len(token.value)
+
+
+def test_lexer_reuse():
+    """Test that lexing with the shared lexer is repeatable."""
+    data = lex._omit_preamble(MODULE_FOO)
+    # leave a lexer within a multi-line comment
+    lex._lex("(* unterminated")
+    first = [(t.type, t.value, t.lineno, t.lexpos) for t in lex._lex(data)]
+    second = [(t.type, t.value, t.lineno, t.lexpos) for t in lex._lex(data)]
+    assert first == second
+    a = lex._new_lexer()
+    b = lex._new_lexer()
+    a.input("x = 1")
+    b.input('"foo"')
+    assert [t.value for t in a] == ["x", "=", "1"]
+    assert [t.value for t in b] == ['"foo"']
+
+
+def test_lexer_lextab(tmp_path):
+    """Test writing and reading the lexer tables."""
+    data = lex._omit_preamble(MODULE_FOO)
+    expected = [(t.type, t.value) for t in lex._lex(data)]
+    outputdir = str(tmp_path)
+    sys.path.insert(0, outputdir)
+    try:
+        lex.build_lexer(optimize=True, lextab="tla_lextab", outputdir=outputdir)
+        assert (tmp_path / "tla_lextab.py").exists()
+        lex.build_lexer(optimize=True, lextab="tla_lextab", outputdir=outputdir)
+        assert [(t.type, t.value) for t in lex._lex(data)] == expected
+    finally:
+        sys.path.remove(outputdir)
+        sys.modules.pop("tla_lextab", None)
+        lex.build_lexer()
+
+
 if __name__ == "__main__":
     test_lexer()
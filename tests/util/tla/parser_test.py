@@ -1,9 +1,11 @@
 """Tests for the package `tla`."""
 
+from concurrent.futures import ThreadPoolExecutor
+
 import modelator_py.util.tla._combinators as pco
 import modelator_py.util.tla._expr_parser as ep
 import modelator_py.util.tla._module_parser as mp
-from modelator_py.util.tla import _tla_combinators, lex, parser, to_str
+from modelator_py.util.tla import _optable, _tla_combinators, ast, lex, parser, to_str
 
 expr_tests = [
     " FALSE ",
@@ -470,5 +472,67 @@ def _parser_parse_expr_to_str(text):
     return r
 
 
+def test_parser_reuse():
+    """Test that reusing the parsers gives the same syntax trees."""
+    for expr in expr_tests:
+        first = parser.parse_expr(expr, nodes=to_str.Nodes).to_str(width=80)
+        # interleave a parse with other nodes
+        parser.parse_expr(expr)
+        second = parser.parse_expr(expr, nodes=to_str.Nodes).to_str(width=80)
+        assert first == second
+    for module in module_tests:
+        first = parser.parse(module, nodes=to_str.Nodes).to_str()
+        second = parser.parse(module, nodes=to_str.Nodes).to_str()
+        assert first == second
+
+
+def test_parser_context_threads():
+    """Test sharing parser contexts between threads."""
+    context = parser.ParserContext(to_str.Nodes)
+    ast_context = parser.ParserContext(ast.Nodes)
+    expected = [context.parse_expr(expr).to_str(width=80) for expr in expr_tests]
+
+    def parse(i_expr):
+        i, expr = i_expr
+        if i % 2:
+            tree = ast_context.parse_expr(expr)
+            assert not hasattr(tree, "to_str")
+            return None
+        return context.parse_expr(expr).to_str(width=80)
+
+    inputs = list(enumerate(expr_tests * 2))
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(parse, inputs))
+    for (i, _), result in zip(inputs, results):
+        if not i % 2:
+            assert result == expected[i % len(expr_tests)]
+
+
+def test_parser_context_tables():
+    """Test that contexts share the tables of their syntax tree classes."""
+    context = parser.ParserContext(to_str.Nodes)
+    other = parser.ParserContext(to_str.Nodes)
+    assert context.optable is other.optable
+    assert context.fixities is other.fixities
+    ast_context = parser.ParserContext()
+    assert ast_context.optable is not context.optable
+    assert ast_context.fixities is not context.fixities
+    assert ast_context.optable is _optable.optable
+    assert ast_context.fixities is ep.fixities
+    assert context.rules is other.rules
+    assert ast_context.rules is not context.rules
+
+
+def test_parser_reuse_nodes():
+    """Test that reused parsers create new nodes for each syntax tree."""
+    context = parser.ParserContext(to_str.Nodes)
+    for expr in ("TRUE", "FALSE", "BOOLEAN", "STRING"):
+        first = context.parse_expr(expr)
+        second = context.parse_expr("  " + expr)
+        assert first.to_str(width=80) == second.to_str(width=80)
+        assert first is not second
+        assert first.loc != second.loc
+
+
 if __name__ == "__main__":
     test_expr_parser()
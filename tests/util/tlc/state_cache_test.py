@@ -0,0 +1,107 @@
+import os
+
+import pytest
+
+from modelator_py.util.tlc import state_cache
+from modelator_py.util.tlc.itf import tlc_itf, tlc_itf_stream
+from modelator_py.util.tlc.state_cache import StateCache
+from modelator_py.util.tlc.state_to_informal_trace_format import (
+    state_to_informal_trace_format_state,
+)
+
+from ...helper import get_resource_dir
+
+
+def test_state_cache():
+    s = '/\\ x = 1\n/\\ y = <<"a", {1, 2}>>'
+    cache = StateCache()
+    state = cache.state(s)
+    assert state == state_to_informal_trace_format_state(s)
+    assert cache.stats()["misses"] == 1
+    assert cache.state(s) == state
+    assert cache.hits == 1
+    # the cached state is not shared with the caller
+    state.var_value_map["y"].elements.clear()
+    assert cache.state(s) == state_to_informal_trace_format_state(s)
+
+
+def test_state_cache_lru():
+    cache = StateCache(maxsize=2)
+    cache.states(["/\\ x = 1", "/\\ x = 2", "/\\ x = 1", "/\\ x = 3"])
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 3,
+        "disk_hits": 0,
+        "size": 2,
+        "maxsize": 2,
+    }
+    # states are stored in the order of their strings, so x = 1 was evicted
+    cache.state("/\\ x = 1")
+    assert cache.misses == 4
+
+
+def test_state_cache_disk(tmp_path):
+    s = "/\\ x = [a |-> TRUE]"
+    StateCache(path=tmp_path).state(s)
+    cache = StateCache(path=tmp_path)
+    assert cache.state(s) == state_to_informal_trace_format_state(s)
+    assert (cache.hits, cache.misses, cache.disk_hits) == (1, 0, 1)
+
+
+def test_state_cache_disk_corrupt(tmp_path):
+    s = "/\\ x = [a |-> TRUE]"
+    StateCache(path=tmp_path).state(s)
+    (file,) = (tmp_path / f"v{StateCache.FORMAT_VERSION}").iterdir()
+    file.write_bytes(file.read_bytes()[:10])
+    cache = StateCache(path=tmp_path)
+    assert cache.state(s) == state_to_informal_trace_format_state(s)
+    assert (cache.hits, cache.misses, cache.disk_hits) == (0, 1, 0)
+    # the file is written again
+    cache = StateCache(path=tmp_path)
+    cache.state(s)
+    assert cache.disk_hits == 1
+
+
+def test_tlc_itf_with_cache():
+    fn = "TlcMultipleTraceParse.txt"
+    path = os.path.join(get_resource_dir(), fn)
+    with open(path, "r") as fd:
+        content = fd.read()
+
+    expected = tlc_itf(json={"stdout": content})
+    cache = StateCache()
+    assert tlc_itf(json={"stdout": content}, cache=cache) == expected
+    misses = cache.misses
+    assert tlc_itf(json={"stdout": content}, cache=cache) == expected
+    assert cache.misses == misses
+    assert cache.hits == misses
+    with open(path, "r") as fd:
+        assert list(tlc_itf_stream(fd, cache=cache)) == expected
+    assert cache.misses == misses
+
+
+def test_state_cache_disk_write_error(tmp_path, monkeypatch):
+    def dump(obj, fd):
+        fd.write(b"partial")
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(state_cache.pickle, "dump", dump)
+    with pytest.raises(OSError):
+        StateCache(path=tmp_path).state("/\\ x = 1")
+    assert list((tmp_path / f"v{StateCache.FORMAT_VERSION}").iterdir()) == []
+
+
+def test_state_cache_disk_size(tmp_path):
+    cache = StateCache(path=tmp_path)
+    cache.state("/\\ x = 0")
+    (file,) = (tmp_path / f"v{StateCache.FORMAT_VERSION}").iterdir()
+    size = file.stat().st_size
+    cache = StateCache(path=tmp_path, max_disk_size=3 * size)
+    for i in range(1, 10):
+        cache.state(f"/\\ x = {i}")
+    files = list((tmp_path / f"v{StateCache.FORMAT_VERSION}").iterdir())
+    assert sum(f.stat().st_size for f in files) <= 3 * size
+    # the most recent state is kept
+    cache = StateCache(path=tmp_path)
+    cache.state("/\\ x = 9")
+    assert cache.disk_hits == 1
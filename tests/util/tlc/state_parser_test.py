@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+from modelator_py.util.informal_trace_format import ITFMap, ITFSet, ITFState
+from modelator_py.util.tlc.state_parser import UnsupportedSyntax, parse_state
+from modelator_py.util.tlc.state_to_informal_trace_format import (
+    state_to_informal_trace_format_state,
+    tla_state_to_informal_trace_format_state,
+)
+
+from ...helper import get_resource_dir
+
+
+def test_parse_state():
+    s = """/\\ x = (1 :> <<"a", -2>> @@ 2 :> {})
+/\\ y = [ foo |-> TRUE,
+  bar |-> {v1, FALSE} ]
+"""
+    expected = ITFState(
+        {
+            "x": ITFMap([[1, ITFMap([[1, "a"], [2, -2]])], [2, ITFSet([])]]),
+            "y": ITFMap([["foo", True], ["bar", ITFSet(["v1", False])]]),
+        }
+    )
+    assert parse_state(s) == expected
+
+
+def test_parse_state_same_as_tla_parser():
+    """
+    Test that states are read as the TLA+ parser reads them.
+    """
+
+    fns = [
+        "TlcStateExpressionExample0.txt",
+        "TlcStateExpressionExample1.txt",
+        "TlcStateExpressionExample2.txt",
+        "TlcStateExpressionExample3.txt",
+        "TlcStateExpressionExample4.txt",
+        "TlcStateExpressionExample5.txt",
+        "TlcStateExpressionExample6.txt",
+        "TlcStateExpressionExample7.txt",
+        "TlcStateExpressionExample8.txt",
+    ]
+
+    for fn in fns:
+        path = os.path.join(get_resource_dir(), fn)
+        with open(path, "r") as fd:
+            content = fd.read()
+        assert parse_state(content) == tla_state_to_informal_trace_format_state(content)
+
+
+def test_parse_state_unsupported_syntax():
+    for s in [
+        "/\\ x = 1..3",
+        "/\\ x = [y \\in {1, 2} |-> y]",
+        "/\\ x = IF TRUE THEN 1 ELSE 2",
+        "/\\ x = 1 \\* comment",
+        '/\\ x = -"a"',
+        "/\\ x = 1 :> 2 @@ 3",
+        "/\\ x = <<1, 2",
+    ]:
+        with pytest.raises(UnsupportedSyntax):
+            parse_state(s)
+
+
+def test_state_to_informal_trace_format_state_fallback():
+    """
+    Test that states with syntax other than TLC values
+    are parsed with the TLA+ parser.
+    """
+    s = "/\\ x = 1\n/\\ y = -(2)"
+    with pytest.raises(UnsupportedSyntax):
+        parse_state(s)
+    expected = ITFState({"x": 1, "y": -2})
+    assert state_to_informal_trace_format_state(s) == expected
@@ -1,9 +1,16 @@
+import json as stdjson
 import os
 
-from modelator_py.util.informal_trace_format import with_lists, with_records
-from modelator_py.util.tlc.itf import TlcITFCmd, tlc_itf
+from modelator_py.helper import WorkerPool
+from modelator_py.util.informal_trace_format import (
+    delta_decode,
+    with_lists,
+    with_records,
+)
+from modelator_py.util.tlc.itf import TlcITFCmd, tlc_itf, tlc_itf_stream
 from modelator_py.util.tlc.stdout_to_informal_trace_format import (
     extract_traces,
+    iter_traces,
     tlc_trace_to_informal_trace_format_trace,
 )
 
@@ -188,3 +195,96 @@ def test_extract_informal_trace_format_traces_from_tlc_real_world_example():
     cmd.lists = True
     cmd.records = True
     tlc_itf(cmd=cmd)
+
+
+def test_iter_traces():
+    fns = [
+        "TlcMultipleTraceParse.txt",
+        "TlcMultipleTraceParseCutoff0.txt",
+        "TlcMultipleTraceParseSimulationMode.txt",
+        "TlcTraceAbsenceParse.txt",
+        "TlcTraceParseInitStateContinue.txt",
+        "TlcTraceParseSimulationMode.txt",
+    ]
+
+    for fn in fns:
+        path = os.path.join(get_resource_dir(), fn)
+        with open(path, "r") as fd:
+            content = fd.read()
+        with open(path, "r") as fd:
+            assert list(iter_traces(fd)) == extract_traces(content)
+
+
+def test_iter_traces_yields_before_end_of_stdout():
+    fn = "TlcMultipleTraceParse.txt"
+    path = os.path.join(get_resource_dir(), fn)
+    with open(path, "r") as fd:
+        lines = fd.readlines()
+    expected = extract_traces("".join(lines))
+
+    read = []
+
+    def pipe():
+        for line in lines:
+            read.append(line)
+            yield line
+
+    traces = iter_traces(pipe())
+    assert next(traces) == expected[0]
+    assert len(read) < len(lines)
+
+
+def test_tlc_itf_stream():
+    fn = "TlcMultipleTraceParse.txt"
+    path = os.path.join(get_resource_dir(), fn)
+    with open(path, "r") as fd:
+        content = fd.read()
+
+    cmd = TlcITFCmd()
+    cmd.stdout = content
+    cmd.lists = True
+    cmd.records = True
+    expected = tlc_itf(cmd=cmd)
+
+    with open(path, "r") as fd:
+        assert list(tlc_itf_stream(fd, lists=True, records=True)) == expected
+
+
+def test_tlc_itf_reuses_pool():
+    fn = "TlcMultipleTraceParse.txt"
+    path = os.path.join(get_resource_dir(), fn)
+    with open(path, "r") as fd:
+        content = fd.read()
+
+    expected = tlc_itf(json={"stdout": content})
+    with WorkerPool(workers=2) as pool:
+        for _ in range(2):
+            assert tlc_itf(json={"stdout": content}, pool=pool) == expected
+
+
+def test_tlc_itf_shares_equal_states():
+    fn = "TlcMultipleTraceParse.txt"
+    path = os.path.join(get_resource_dir(), fn)
+    with open(path, "r") as fd:
+        content = fd.read()
+
+    traces = tlc_itf(json={"stdout": content})
+    with open(path, "r") as fd:
+        assert list(tlc_itf_stream(fd)) == traces
+    first, second = traces[0]["states"], traces[1]["states"]
+    assert first[0] == second[0]
+    assert first[0] is second[0]
+
+
+def test_tlc_itf_delta():
+    fn = "TlcMultipleTraceParse_RealWorld0.txt"
+    path = os.path.join(get_resource_dir(), fn)
+    with open(path, "r") as fd:
+        content = fd.read()
+
+    traces = tlc_itf(json={"stdout": content})
+    deltas = tlc_itf(json={"stdout": content, "delta": True})
+    assert [delta_decode(trace) for trace in deltas] == traces
+    assert len(stdjson.dumps(deltas)) < len(stdjson.dumps(traces))
+    with open(path, "r") as fd:
+        assert list(tlc_itf_stream(fd, delta=True)) == deltas